@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+
+# Name: benchEffectKeys.py
+# Purpose: Micro-benchmark effect media key extraction, find/slice versus compiled single pass matcher
+# Author: Bill Jenkins
+# Version: v2.1
+# Date: 08/24/2023
+
+###########################
+# Imports                 #
+###########################
+
+import argparse
+import random
+import sys
+import time
+
+###########################
+# From Imports            #
+###########################
+
+from checkSeqMedia import EffectKeyList, compileEffectKeys, effectMediaFiles
+
+###############################
+# findSliceMediaFiles         #
+###############################
+
+def findSliceMediaFiles(EffectKeys, EffectText):
+
+    # Previous checkSeqMedia find/slice approach, first key found wins
+    lenEffectText = len(EffectText)
+    for i in range(len(EffectKeys)):
+        beginKey = EffectText.find(EffectKeys[i])
+        if (beginKey > -1):
+            endKey = EffectText[beginKey:lenEffectText].find("=")
+            beginValue = beginKey + endKey + 1
+            endValue = beginValue + EffectText[beginValue:lenEffectText].find(",")
+            return([(EffectKeys[i], EffectText[beginValue:endValue])])
+    return([])
+
+###############################
+# syntheticEffectDB           #
+###############################
+
+def syntheticEffectDB(effects, seed):
+
+    # Effect settings strings shaped like xLights EffectDB entries
+    rnd = random.Random(seed)
+    fillers = ["B_CHOICE_BufferStyle=Default", "B_CHOICE_BufferTransform=None", "C_BUTTON_Palette1=#FF0000",
+               "C_CHECKBOX_Palette1=1", "E_SLIDER_Bars_BarCount=%s", "E_CHOICE_Bars_Direction=up",
+               "E_CHECKBOX_Bars_Highlight=0", "T_CHOICE_LayerMethod=Normal", "T_SLIDER_EffectLayerMix=%s"]
+    EffectDB = []
+    for i in range(effects):
+        settings = [rnd.choice(fillers).replace("%s", str(rnd.randint(0, 100))) for j in range(rnd.randint(4, 30))]
+        kind = rnd.random()
+        if (kind < 0.15):
+            settings.insert(rnd.randint(0, len(settings)), "E_FILEPICKER_Pictures_Filename=C:\\xLights\\Show\\Images\\image%s.png" % rnd.randint(0, 500))
+        elif (kind < 0.20):
+            settings.insert(rnd.randint(0, len(settings)), "E_0FILEPICKERCTRL_IFS=C:\\xLights\\Show\\Shaders\\shader%s.fs" % rnd.randint(0, 50))
+        elif (kind < 0.25):
+            settings.insert(rnd.randint(0, len(settings)), "E_FILEPICKERCTRL_Video_Filename=C:\\xLights\\Show\\Videos\\video%s.mp4" % rnd.randint(0, 50))
+        elif (kind < 0.28):
+            # Several media keys in one effect, only the first key of EffectKeyList is counted
+            settings.insert(rnd.randint(0, len(settings)), "E_FILEPICKERCTRL_Video_Filename=C:\\xLights\\Show\\Videos\\video%s.mp4" % rnd.randint(0, 50))
+            settings.insert(rnd.randint(0, len(settings)), "E_FILEPICKER_Pictures_Filename=C:\\xLights\\Show\\Images\\image%s.png" % rnd.randint(0, 500))
+            if (rnd.random() < 0.5):
+                settings.insert(rnd.randint(0, len(settings)), "E_FILEPICKER_Pictures_Filename=C:\\xLights\\Show\\Images\\image%s.png" % rnd.randint(0, 500))
+        # Settings always end with a comma separated key in xLights
+        settings.append("T_CHOICE_In_Transition_Type=Fade")
+        EffectDB.append(",".join(settings))
+    return(EffectDB)
+
+###############################
+# main                        #
+###############################
+
+def main():
+
+    cli_parser = argparse.ArgumentParser(prog = 'benchEffectKeys',
+        description = '''%(prog)s is a micro-benchmark of effect media key extraction on a synthetic EffectDB,''')
+
+    ### Define Arguments
+
+    cli_parser.add_argument('-n', '--effects', help = 'Number of synthetic EffectDB entries', type = int, default = 100000,
+        required = False)
+
+    cli_parser.add_argument('-r', '--repeat', help = 'Timing repeats, best time is reported', type = int, default = 5,
+        required = False)
+
+    cli_parser.add_argument('-x', '--extrakeys', help = 'Additional configured media keys that never match', type = int, default = 0,
+        required = False)
+
+    cli_parser.add_argument('--seed', help = 'Random seed', type = int, default = 2023,
+        required = False)
+
+    ### Get Arguments
+    args = cli_parser.parse_args()
+
+    EffectDB = syntheticEffectDB(args.effects, args.seed)
+    effectKeyList = list(EffectKeyList)
+    for i in range(args.extrakeys):
+        effectKeyList.append(("E_FILEPICKERCTRL_Extra%s_Filename" % i, "Image"))
+    EffectKeys = [key for (key, mediaType) in effectKeyList]
+    pEffectKeys = compileEffectKeys(effectKeyList)
+
+    # Both approaches must agree before timing them
+    for EffectText in EffectDB:
+        if (findSliceMediaFiles(EffectKeys, EffectText) != effectMediaFiles(pEffectKeys, EffectText)):
+            print ("Error: results differ for %s" % EffectText)
+            sys.exit(-1)
+
+    timings = {}
+    for name, func, keys in (("find/slice", findSliceMediaFiles, EffectKeys), ("compiled", effectMediaFiles, pEffectKeys)):
+        best = None
+        for r in range(args.repeat):
+            starttime = time.perf_counter()
+            found = 0
+            for EffectText in EffectDB:
+                found += len(func(keys, EffectText))
+            elapsed = time.perf_counter() - starttime
+            if (best is None) or (elapsed < best):
+                best = elapsed
+        timings[name] = best
+        print ("%-12s effects=%s keys=%s media=%s best=%.4fs per effect=%.3fus" % (name, len(EffectDB), len(EffectKeys), found, best, best * 1e6 / len(EffectDB)))
+    print ("speedup = %.2fx" % (timings["find/slice"] / timings["compiled"]))
+
+if __name__ == "__main__":
+    main()
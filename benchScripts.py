@@ -0,0 +1,410 @@
+#!/usr/bin/env python
+
+# Name: benchScripts.py
+# Purpose: End-to-end throughput benchmark of the scripts against xlMockServer, with history and regression thresholds
+# Author: Bill Jenkins
+# Version: v2.1
+# Date: 08/24/2023
+
+###########################
+# Imports                 #
+###########################
+
+import argparse
+import sys
+import os
+import time
+import json
+import datetime
+import shutil
+import statistics
+import subprocess
+import tempfile
+
+###########################
+# From Imports            #
+###########################
+
+from xlclient import *
+from seqindex import getSequenceIndex
+from xlMockServer import loadNetworks
+
+###############################
+# Benchmark Globals           #
+###############################
+
+# Benchmark Cases, script and headless arguments, {show} is the show folder
+BENCH_CASES = [
+    ("renderAll", "renderAll.py", ["-s", "{show}", "--all", "-f"]),
+    ("checkSequences", "checkSequences.py", ["-s", "{show}", "--all", "-f"]),
+    ("uploadSequences", "uploadSequences.py", ["-s", "{show}", "--all", "-f", "-j", "4"]),
+    ("exportControllers", "exportControllers.py", ["-s", "{show}", "-wbname", "benchControllers"]),
+    ("checkSeqMedia", "checkSeqMedia.py", ["-s", "{show}"]),
+]
+
+# Seconds between peak RSS samples of a case
+BENCH_RSS_SAMPLE = 0.02
+
+# Benchmark History in the working directory
+BENCH_HISTORY = "benchScripts_history.json"
+
+# Metrics compared with the baseline, (metric, threshold argument)
+BENCH_METRICS = [("wall", "wallthreshold"), ("restcalls", "callsthreshold"), ("restbytes", "bytesthreshold"), ("peakrss", "rssthreshold")]
+
+###############################
+# benchWorkFolder             #
+###############################
+
+def benchWorkFolder(xlightsshowfolder, port, verbose):
+
+    # Working folder with the parm files the scripts read, pointing at the mock port
+    scriptfolder = os.path.dirname(os.path.abspath(__file__))
+    workfolder = tempfile.mkdtemp(prefix = "benchScripts_")
+    xlightsparms = {"xlightsipaddress": "127.0.0.1", "xlightsport": str(port), "xlightsprogram": sys.executable,
+                    "xlightsnetworksxmlfile": "xlights_networks.xml", "xlightsrgbeffectsxmlFile": "xlights_rgbeffects.xml",
+                    "xlightspoolsize": DEFAULT_POOL_SIZE}
+    with open(os.path.join(workfolder, "xlightsparms.json"), "w") as f:
+        json.dump(xlightsparms, f, indent=2)
+    # Upload every controller in the networks XML file
+    (controllers, controllerIPs) = loadNetworks(os.path.join(xlightsshowfolder, "xlights_networks.xml"), verbose)
+    with open(os.path.join(workfolder, "uploadsequences.json"), "w") as f:
+        json.dump({"controllers": [{"ip": ip, "media": "false", "format": "v2std"} for ip in controllerIPs]}, f, indent=2)
+    # Workbook Formats & Header Image for exportControllers
+    shutil.copy(os.path.join(scriptfolder, "wbfmts.json"), os.path.join(workfolder, "wbFmts.json"))
+    shutil.copy(os.path.join(scriptfolder, "default-image.png"), os.path.join(workfolder, "default-image.png"))
+    if (verbose):
+        print ("Work Folder = %s" % workfolder)
+
+    return(workfolder)
+
+###############################
+# startMockServer             #
+###############################
+
+def startMockServer(xlightsshowfolder, port, latencyconfig, scale, workfolder, verbose):
+
+    scriptfolder = os.path.dirname(os.path.abspath(__file__))
+    cmd = [sys.executable, os.path.join(scriptfolder, "xlMockServer.py"), "-s", xlightsshowfolder, "-p", str(port),
+           "-l", latencyconfig, "-x", str(scale)]
+    if (verbose):
+        print ("##### Start xlMockServer")
+        print ("cmd = ", cmd)
+    mocklog = open(os.path.join(workfolder, "xlMockServer.log"), "w")
+    try:
+        mockprocess = subprocess.Popen(cmd, cwd = workfolder, stdout = mocklog, stderr = subprocess.STDOUT)
+    except OSError as e:
+        sys.exit("*** Error in starting xlMockServer %s" % e)
+    baseURL = "http://127.0.0.1:%s/" % port
+    (ret_code, status_code, result, elapsed) = waitxLightsReady(baseURL, 30, verbose)
+    if (ret_code < 0):
+        mockprocess.kill()
+        print("Unable to connect to xlMockServer %s" % baseURL)
+        print ("result = ", result)
+        sys.exit(ret_code)
+
+    return(mockprocess, baseURL)
+
+###############################
+# mockTotals                  #
+###############################
+
+def mockTotals(baseURL):
+
+    # Server side REST calls & bytes since the last mockReset
+    (ret_code, status_code, result) = doRequestsGet(baseURL + "mockStats", 30, False)
+    if (ret_code < 0):
+        return(None, None)
+    stats = json.loads(result)
+    return(sum(endpoint["calls"] for endpoint in stats.values()), sum(endpoint["bytes"] for endpoint in stats.values()))
+
+###############################
+# procPeakRSS                 #
+###############################
+
+def procPeakRSS(pid):
+
+    # VmHWM, the peak RSS of the process itself in kB, 0 once it has exited
+    try:
+        with open("/proc/%s/status" % pid, "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return(int(line.split()[1]) * 1024)
+    except (OSError, ValueError):
+        pass
+
+    return(0)
+
+###############################
+# childPeakRSS                #
+###############################
+
+def childPeakRSS(process, verbose):
+
+    # Sampled while the child runs, os.wait4 ru_maxrss includes the high-water mark the child inherits from benchScripts
+    if os.path.isfile("/proc/%s/status" % process.pid):
+        sample = lambda: procPeakRSS(process.pid)
+    else:
+        # psutil is only needed where there is no /proc, e.g. Windows and macOS, without it the peak RSS is not measured
+        try:
+            import psutil
+            child = psutil.Process(process.pid)
+        except ImportError:
+            if (verbose):
+                print ("psutil not installed, peak RSS not measured")
+            process.wait()
+            return(None)
+        except psutil.Error:
+            process.wait()
+            return(None)
+        def sample():
+            try:
+                memory = child.memory_info()
+            except psutil.Error:
+                return(0)
+            # peak_wset is the peak working set on Windows, elsewhere the largest rss seen
+            return(getattr(memory, "peak_wset", memory.rss))
+    peak = sample()
+    while process.poll() is None:
+        time.sleep(BENCH_RSS_SAMPLE)
+        peak = max(peak, sample())
+
+    return(peak / (1024 * 1024) if (peak > 0) else None)
+
+###############################
+# runCase                     #
+###############################
+
+def runCase(name, script, args, baseURL, workfolder, verbose):
+
+    scriptfolder = os.path.dirname(os.path.abspath(__file__))
+    cmd = [sys.executable, os.path.join(scriptfolder, script)] + args
+    if (verbose):
+        print ("cmd = ", cmd)
+    doRequestsGet(baseURL + "mockReset", 30, False)
+    caselog = open(os.path.join(workfolder, name + ".log"), "a")
+    starttime = time.perf_counter()
+    process = subprocess.Popen(cmd, cwd = workfolder, stdout = caselog, stderr = subprocess.STDOUT)
+    # Peak RSS of this child only
+    peakrss = childPeakRSS(process, verbose)
+    wall = time.perf_counter() - starttime
+    caselog.close()
+    (restcalls, restbytes) = mockTotals(baseURL)
+
+    return({"wall": round(wall, 3), "restcalls": restcalls, "restbytes": restbytes,
+            "peakrss": None if peakrss is None else round(peakrss, 1), "exit": process.returncode})
+
+###############################
+# loadBenchHistory            #
+###############################
+
+def loadBenchHistory(verbose):
+
+    history = []
+    if os.path.isfile(BENCH_HISTORY):
+        try:
+            with open(BENCH_HISTORY, "r") as f:
+                history = json.load(f)
+        except (OSError, ValueError) as e:
+            print ("*** Benchmark history %s ignored: %s" % (BENCH_HISTORY, e))
+    if (verbose):
+        print ("Benchmark History = %s runs = %s" % (BENCH_HISTORY, len(history)))
+
+    return(history)
+
+###############################
+# baselineMetric              #
+###############################
+
+def baselineMetric(history, run, name, metric, baselineruns):
+
+    # Median of the last passed runs on the same show folder, sequence count and latency settings
+    values = []
+    for previous in history:
+        if (not previous.get("passed")) or (previous.get("showfolder") != run["showfolder"]) or (previous.get("sequences") != run["sequences"]):
+            continue
+        if (previous.get("latencyconfig") != run["latencyconfig"]) or (previous.get("scale") != run["scale"]):
+            continue
+        value = previous.get("cases", {}).get(name, {}).get(metric)
+        if (value is not None):
+            values.append(value)
+    values = values[-baselineruns:]
+    if (len(values) == 0):
+        return(None)
+    return(round(statistics.median(values), 3))
+
+###############################
+# compareRun                  #
+###############################
+
+def compareRun(history, run, thresholds, baselineruns):
+
+    print ("##### Benchmark Results")
+    print ("%-18s %5s %10s %10s %8s %10s %10s %10s %10s %10s %10s" % ("Case", "Exit", "Wall", "Baseline", "Delta", "REST", "Baseline",
+        "Bytes", "Baseline", "RSS MB", "Baseline"))
+    regressions = []
+    for name, result in run["cases"].items():
+        if (result["exit"] != 0):
+            regressions.append("%s exit %s" % (name, result["exit"]))
+        baselines = {}
+        for metric, thresholdname in BENCH_METRICS:
+            baselines[metric] = baselineMetric(history, run, name, metric, baselineruns)
+            value = result.get(metric)
+            # Regression when the value is more than the threshold fraction above the baseline
+            if (value is not None) and (baselines[metric] is not None) and (value > baselines[metric] * (1 + thresholds[thresholdname])):
+                regressions.append("%s %s %s > baseline %s +%.0f%%" % (name, metric, value, baselines[metric], thresholds[thresholdname] * 100))
+        if (baselines["wall"]):
+            delta = "%+.1f%%" % ((result["wall"] / baselines["wall"] - 1) * 100)
+        else:
+            delta = "-"
+        shown = dict((metric, "-" if value is None else value) for metric, value in baselines.items())
+        print ("%-18s %5s %9.3fs %10s %8s %10s %10s %10s %10s %10s %10s" % (name, result["exit"], result["wall"], shown["wall"], delta,
+            result["restcalls"], shown["restcalls"], result["restbytes"], shown["restbytes"], result["peakrss"], shown["peakrss"]))
+    for regression in regressions:
+        print ("*** Regression: %s" % regression)
+
+    return(regressions)
+
+###############################
+# main                        #
+###############################
+
+def main():
+
+    print ("#" *5 + " benchScripts Begin")
+
+    cli_parser = argparse.ArgumentParser(prog = 'benchScripts',
+        description = '''%(prog)s is an end-to-end throughput benchmark of the scripts against xlMockServer,''')
+
+    ### Define Arguments
+
+    cli_parser.add_argument('-s', '--xlightsshowfolder', help = 'xLights Show Folder to benchmark with',
+        required = True)
+
+    cli_parser.add_argument('-k', '--cases', help = 'Comma separated cases, ' + ",".join(name for (name, script, args) in BENCH_CASES), default = "ALL",
+        required = False)
+
+    cli_parser.add_argument('-r', '--repeat', help = 'Runs per case, the best wall time is kept', type = int, default = 1,
+        required = False)
+
+    cli_parser.add_argument('-p', '--port', help = 'xlMockServer Port', type = int, default = 49990,
+        required = False)
+
+    cli_parser.add_argument('-l', '--latencyconfig', help = 'xlMockServer Latency Config json File', default = "NONE",
+        required = False)
+
+    cli_parser.add_argument('-x', '--scale', help = 'xlMockServer Latency Scale', type = float, default = 1.0,
+        required = False)
+
+    cli_parser.add_argument('--label', help = 'Label recorded with the run, e.g. a git commit', default = "",
+        required = False)
+
+    cli_parser.add_argument('--wallthreshold', help = 'Allowed wall time increase over the baseline, fraction', type = float, default = 0.10,
+        required = False)
+
+    cli_parser.add_argument('--callsthreshold', help = 'Allowed REST call increase over the baseline, fraction', type = float, default = 0.0,
+        required = False)
+
+    cli_parser.add_argument('--bytesthreshold', help = 'Allowed REST response bytes increase over the baseline, fraction', type = float, default = 0.05,
+        required = False)
+
+    cli_parser.add_argument('--rssthreshold', help = 'Allowed peak RSS increase over the baseline, fraction', type = float, default = 0.20,
+        required = False)
+
+    cli_parser.add_argument('--baselineruns', help = 'Previous passed runs in the baseline median', type = int, default = 5,
+        required = False)
+
+    cli_parser.add_argument('--nohistory', help = 'Do not record this run in the history', action='store_true',
+        required = False)
+
+    cli_parser.add_argument('-v', '--verbose', help = 'Verbose Logging', action='store_true',
+        required = False)
+
+    ### Get Arguments
+    args = cli_parser.parse_args()
+
+    xlightsshowfolder = os.path.abspath(args.xlightsshowfolder)
+    repeat = max(1, args.repeat)
+    verbose = args.verbose
+    thresholds = {"wallthreshold": args.wallthreshold, "callsthreshold": args.callsthreshold, "bytesthreshold": args.bytesthreshold,
+                  "rssthreshold": args.rssthreshold}
+    latencyconfig = args.latencyconfig
+    if (latencyconfig != "NONE"):
+        latencyconfig = os.path.abspath(latencyconfig)
+
+    # Verify Show Folder
+    if not os.path.isdir(xlightsshowfolder):
+        print("Error: xLights Show Folder not found %s" % xlightsshowfolder)
+        sys.exit(-1)
+
+    # Cases
+    if (args.cases == "ALL"):
+        cases = BENCH_CASES
+    else:
+        names = [name.strip() for name in args.cases.split(",")]
+        cases = [case for case in BENCH_CASES if case[0] in names]
+        for name in names:
+            if name not in [case[0] for case in BENCH_CASES]:
+                print("Error: Invalid case %s, valid cases are %s" % (name, ",".join(case[0] for case in BENCH_CASES)))
+                sys.exit(-1)
+
+    # Sequence Count, also warms the sequence index so every case sees the same index
+    sequences = len(getSequenceIndex(xlightsshowfolder, verbose))
+    if (verbose):
+        print ("xLights Show Folder = %s" % xlightsshowfolder)
+        print ("Sequences = %s" % sequences)
+        print ("Cases = %s" % [case[0] for case in cases])
+        print ("Repeat = %s" % repeat)
+        print ("Thresholds = %s" % thresholds)
+
+    workfolder = benchWorkFolder(xlightsshowfolder, args.port, verbose)
+    (mockprocess, baseURL) = startMockServer(xlightsshowfolder, args.port, latencyconfig, args.scale, workfolder, verbose)
+
+    # Run Cases
+    run = {"date": datetime.datetime.now().isoformat(timespec="seconds"), "label": args.label, "showfolder": xlightsshowfolder,
+           "sequences": sequences, "latencyconfig": latencyconfig, "scale": args.scale, "repeat": repeat, "cases": {}}
+    try:
+        for (name, script, caseargs) in cases:
+            caseargs = [arg.replace("{show}", xlightsshowfolder) for arg in caseargs]
+            print ("##### Case %s" % name)
+            best = None
+            for r in range(repeat):
+                result = runCase(name, script, caseargs, baseURL, workfolder, verbose)
+                if (verbose):
+                    print (result)
+                if (best is None) or (result["exit"] != 0) or ((best["exit"] == 0) and (result["wall"] < best["wall"])):
+                    best = result
+                if (result["exit"] != 0):
+                    print ("*** Case %s exit %s, see %s" % (name, result["exit"], os.path.join(workfolder, name + ".log")))
+                    break
+            run["cases"][name] = best
+    finally:
+        mockprocess.terminate()
+        mockprocess.wait()
+
+    # Compare with the Baseline
+    history = loadBenchHistory(verbose)
+    regressions = compareRun(history, run, thresholds, args.baselineruns)
+    run["passed"] = (len(regressions) == 0)
+    run["regressions"] = regressions
+
+    # Record Run
+    if not (args.nohistory):
+        history.append(run)
+        with open(BENCH_HISTORY, "w") as f:
+            json.dump(history, f, indent=2)
+        print ("Benchmark History = %s" % BENCH_HISTORY)
+
+    # Work Folder kept when a case failed
+    if any(result["exit"] != 0 for result in run["cases"].values()):
+        print ("Work Folder = %s" % workfolder)
+    else:
+        shutil.rmtree(workfolder, ignore_errors = True)
+
+    print ("#" *5 + " benchScripts End")
+
+    # Fail the run on a regression
+    if not (run["passed"]):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
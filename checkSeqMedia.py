@@ -15,12 +15,16 @@ import argparse
 import os
 import sys
 import re
+import contextlib
 
 ###########################
 # From Imports            #
 ###########################
 
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from seqindex import getSequenceIndex
 
 ###############################
 # path_exists_case_sensitive  #
@@ -47,6 +51,184 @@ def path_exists_case_sensitive(path, verbose) -> bool:
             return False
         p = p.parent
 
+###############################
+# iterSequence                #
+###############################
+
+def iterSequence(fullsequence):
+
+    # Stream the sequence XML and yield the head and each EffectDB/Effect
+    # element as it completes, then clear it so memory stays flat
+    stack = []
+    for event, elem in ET.iterparse(fullsequence, events=("start", "end")):
+        if (event == "start"):
+            stack.append(elem)
+            continue
+        # Depth below the xsequence root
+        depth = len(stack) - 1
+        if (depth == 1) and (elem.tag == "head"):
+            yield ("head", elem)
+        elif (depth == 2) and (elem.tag == "Effect") and (stack[1].tag == "EffectDB"):
+            yield ("Effect", elem)
+        stack.pop()
+        # Keep head children until the head completes
+        if (depth >= 2) and (stack[1].tag == "head"):
+            continue
+        elem.clear()
+        if (stack):
+            stack[-1].remove(elem)
+
+###############################
+# Effect Media Keys           #
+###############################
+
+# Effect Setting Key, Media Type
+EffectKeyList = [("E_FILEPICKER_Pictures_Filename", "Image"),
+                 ("E_0FILEPICKERCTRL_IFS", "Shader"),
+                 ("E_FILEPICKERCTRL_Video_Filename", "Video")]
+
+# Media Types counted in the sequence summary
+MediaTypeList = ["Image", "Shader", "Video"]
+
+###############################
+# compileEffectKeys           #
+###############################
+
+def compileEffectKeys(EffectKeyList):
+
+    # Effect settings are "key=value" pairs separated by commas, match any
+    # media key that starts a setting and capture its value
+    keys = "|".join(re.escape(key) for (key, mediaType) in EffectKeyList)
+    # Key order, an effect with several media keys counts the first key of EffectKeyList only
+    keyOrder = dict((key, i) for i, (key, mediaType) in reversed(list(enumerate(EffectKeyList))))
+    return(re.compile(r",(" + keys + r")=([^,]*)"), keyOrder)
+
+###############################
+# effectMediaFiles            #
+###############################
+
+def effectMediaFiles(pEffectKeys, EffectText):
+
+    # Single pass over the effect settings, [(key, mediafile)] or []
+    # Leading comma so the first setting matches like the others
+    (pKeys, keyOrder) = pEffectKeys
+    matches = pKeys.findall("," + EffectText)
+    # Several media keys? The first key of EffectKeyList wins, its first occurrence
+    if (len(matches) > 1):
+        matches = [min(matches, key=lambda match: keyOrder[match[0]])]
+    return(matches)
+
+###############################
+# Media Exists Cache          #
+###############################
+
+# Normalized media file path: exists
+mediaExistsCache = {}
+# Normalized folders whose complete listing is in the cache
+mediaListedFolders = set()
+mediaCacheStats = {"lookups": 0, "stats": 0, "listed": 0}
+
+###############################
+# mediaCacheKey               #
+###############################
+
+def mediaCacheKey(fullmediafile):
+
+    return(os.path.normcase(os.path.normpath(fullmediafile)))
+
+###############################
+# listMediaFolder             #
+###############################
+
+def listMediaFolder(mediafolder, verbose):
+
+    # Pre-populate the cache from one directory listing of a media folder and its sub folders
+    for root, dirs, files in os.walk(mediafolder):
+        mediaListedFolders.add(mediaCacheKey(root))
+        for file in files:
+            mediaExistsCache[mediaCacheKey(os.path.join(root, file))] = True
+            mediaCacheStats["listed"] += 1
+    if (verbose):
+        print ("Media Folder = %s files listed = %s" % (mediafolder, mediaCacheStats["listed"]))
+
+###############################
+# mediaExists                 #
+###############################
+
+def mediaExists(fullmediafile):
+
+    # Each distinct media file is checked once for the whole scan
+    mediaCacheStats["lookups"] += 1
+    key = mediaCacheKey(fullmediafile)
+    exists = mediaExistsCache.get(key)
+    if (exists is None):
+        # Folder listed? Anything not in its listing does not exist
+        if (os.path.dirname(key) in mediaListedFolders):
+            exists = False
+        else:
+            exists = os.path.isfile(fullmediafile)
+            mediaCacheStats["stats"] += 1
+        mediaExistsCache[key] = exists
+
+    return(exists)
+
+###############################
+# scanSequenceMedia           #
+###############################
+
+def scanSequenceMedia(fullsequence, EffectKeyList):
+
+    # Output Lines & Media References are returned so pool workers can be
+    # checked against one shared media cache and printed in order
+    output = []
+    mediaRefs = []
+    pEffectKeys = compileEffectKeys(EffectKeyList)
+    mediaTypes = dict(EffectKeyList)
+    output.append("*" * 5)
+    output.append("Sequence=%s" % fullsequence)
+    refCtr = 0
+    for (elemType, elem) in iterSequence(fullsequence):
+        # Sequence Head?
+        if (elemType == "head"):
+            sequenceType = elem.find("sequenceType")
+            output.append(" " * 2 + "sequenceType=%s" % sequenceType.text)
+            if (sequenceType.text == "Media"):
+                mediaFile = elem.find("mediaFile")
+                output.append(" " * 2 + "mediaFile=%s" % mediaFile.text)
+            continue
+        Effect = elem
+        if (Effect is not None):
+            EffectText = str(Effect.text)
+            refCtr += 1
+            for (key, fullmediafile) in effectMediaFiles(pEffectKeys, EffectText):
+                mediaRefs.append((mediaTypes[key], fullmediafile, refCtr))
+
+    return(output, mediaRefs)
+
+###############################
+# checkSequenceMedia          #
+###############################
+
+def checkSequenceMedia(output, mediaRefs, verbose):
+
+    mediaCtrs = dict.fromkeys(MediaTypeList, 0)
+    errorsCtr = 0
+    for (mediaType, fullmediafile, refCtr) in mediaRefs:
+        if mediaExists(fullmediafile):
+            if (verbose):
+                output.append(" "* 4 + "%s=%s ref=%s" % (mediaType, fullmediafile, refCtr))
+        else:
+            output.append(" "* 4 + "ERROR: %s %s not Found" % (mediaType, fullmediafile))
+            errorsCtr += 1
+        mediaCtrs[mediaType] = mediaCtrs.get(mediaType, 0) + 1
+    imagesCtr = mediaCtrs["Image"]
+    shadersCtr = mediaCtrs["Shader"]
+    videosCtr = mediaCtrs["Video"]
+    output.append(" " * 4 + "Total Images=%s Total Shaders=%s Total Videos=%s" % (imagesCtr, shadersCtr, videosCtr))
+    output.append("*" * 5)
+
+    return(output, imagesCtr, shadersCtr, videosCtr, errorsCtr)
+
 ###############################
 # main                        #
 ###############################
@@ -61,6 +243,15 @@ def main():
     cli_parser.add_argument('-s', '--showFolder' , help = 'xLights Show Folder',
         required = True)
 
+    cli_parser.add_argument('-k', '--effectkey', help = 'Additional effect media key as KEY=Image|Shader|Video', action = 'append', default = [],
+        required = False)
+
+    cli_parser.add_argument('-m', '--mediafolder', help = 'Media folder to list once and pre-populate the media cache', action = 'append', default = [],
+        required = False)
+
+    cli_parser.add_argument('-j', '--jobs', help = 'Number of sequences to check in parallel', type = int, default = 1,
+        required = False)
+
     cli_parser.add_argument('-v', '--verbose', help = 'Verbose Logging', action='store_true',
         required = False)
 
@@ -68,9 +259,13 @@ def main():
     args = cli_parser.parse_args()
 
     showFolder = os.path.abspath(args.showFolder)
+    effectkeys = args.effectkey
+    mediafolders = args.mediafolder
+    jobs = args.jobs
     verbose = args.verbose
     if (verbose):
         print ("Show Folder = %s" % showFolder)
+        print ("Jobs = %s" % jobs)
 
     if not os.path.isdir(showFolder):
         print ("Show folder not found %s" % showFolder)
@@ -81,80 +276,48 @@ def main():
         print("Error: xLights Show Folder case does not match %s" % showFolder)
         sys.exit(-1)
 
-    EffectKeyList = ["E_FILEPICKER_Pictures_Filename", "E_0FILEPICKERCTRL_IFS" ,"E_FILEPICKERCTRL_Video_Filename"]
-    lenEffectKeyList = len(EffectKeyList)
+    # Additional Effect Media Keys
+    effectKeyList = list(EffectKeyList)
+    for effectkey in effectkeys:
+        (key, sep, mediaType) = effectkey.partition("=")
+        if (not sep) or (not key) or (mediaType not in MediaTypeList):
+            print ("Error: Effect key %s must be KEY=Image, KEY=Shader or KEY=Video" % effectkey)
+            sys.exit(-1)
+        effectKeyList.append((key, mediaType))
+    if (verbose):
+        print ("Effect Keys = %s" % effectKeyList)
+
+    # Pre-populate Media Cache
+    for mediafolder in mediafolders:
+        if not os.path.isdir(mediafolder):
+            print ("Error: Media folder not found %s" % mediafolder)
+            sys.exit(-1)
+        listMediaFolder(os.path.abspath(mediafolder), verbose)
 
-    for root, dir, files in os.walk(showFolder):
-        for file in files:
-            # xLights Sequence File?
-            if (file.endswith(".xsq")):
-                fullsequence = os.path.join(root, file)
-                found = fullsequence.find("Backup\\")
-                # xLights Sequence File not in the Backup folder?
-                if (found < 0):
-                    print ("*" * 5)
-                    print ("Sequence=%s" % fullsequence)
-                    xsqtree = ET.parse(fullsequence)
-                    xsqroot = xsqtree.getroot()
-                    sequenceType = xsqroot.find("head/sequenceType")
-                    print (" " * 2 + "sequenceType=%s" % sequenceType.text)
-                    if (sequenceType.text == "Media"):
-                        mediaFile = xsqroot.find("head/mediaFile")
-                        print (" " * 2 + "mediaFile=%s" % mediaFile.text)
-                    imagesCtr = 0
-                    shadersCtr = 0
-                    videosCtr = 0
-                    refCtr = 0
-                    for Effect in xsqroot.findall("EffectDB/Effect"):
-                        if (Effect is not None):
-                            EffectText = str(Effect.text)
-                            lenEffectText = len(EffectText)
-                            refCtr += 1
-                            for i in range(lenEffectKeyList):
-                                beginKey = EffectText.find(EffectKeyList[i])
-                                if (beginKey > -1):
-                                    endKey = EffectText[beginKey:lenEffectText].find("=")
-                                    beginValue = beginKey + endKey + 1
-                                    endValue = beginValue + EffectText[beginValue:lenEffectText].find(",")
-                                    #if (verbose):
-                                    #    print (" "* 4  + "EffectText=%s" % EffectText)
-                                    #    print (" "* 4  + "i=%s beginKey=%s endKey=%s beginValue=%s endValue=%s" % (i, beginKey, endKey, beginValue, endValue))
-                                    fullmediafile = EffectText[beginValue:endValue]
-                                    splitfullmediafile = fullmediafile.split("\\")
-                                    mediafile = splitfullmediafile[-1]
-                                    #if (verbose):
-                                    #    print (" "* 4  + "fullmediafile=%s" % fullmediafile)
-                                    #    print (" "* 4  + "mediafile=%s" % mediafile)
-                                    match i:
-                                        # Images?
-                                            case 0:
-                                                if os.path.isfile(fullmediafile):
-                                                    if (verbose):
-                                                        print (" "* 4 + "Image=%s ref=%s" % (fullmediafile, refCtr))
-                                                else:
-                                                    print (" "* 4 + "ERROR: Image %s not Found" % (fullmediafile))
-                                                imagesCtr += 1
-                                                break
-                                        # Shaders?
-                                            case 1:
-                                                if os.path.isfile(fullmediafile):
-                                                    if (verbose):
-                                                        print (" "* 4 + "Shader=%s ref=%s" % (fullmediafile, refCtr))
-                                                else:
-                                                    print (" "* 4 + "ERROR: Shader %s not Found" % (fullmediafile))
-                                                shadersCtr += 1
-                                                break
-                                        # Videos?
-                                            case 2:
-                                                if os.path.isfile(fullmediafile):
-                                                    if (verbose):
-                                                        print (" "* 4 + "Video=%s ref=%s" % (fullmediafile, refCtr))
-                                                else:
-                                                    print (" "* 4 + "ERROR: Video %s not Found" % (fullmediafile))
-                                                videosCtr += 1
-                                                break
-                    print (" " * 4 + "Total Images=%s Total Shaders=%s Total Videos=%s" % (imagesCtr, shadersCtr, videosCtr))
-                    print ("*" * 5)
+    # Build Sequence List
+    SEQlist = [seqentry["path"] for seqentry in getSequenceIndex(showFolder, verbose)]
+
+    # Scan Sequences, in parallel when jobs > 1, results checked and printed in sequence list order
+    scanSeq = partial(scanSequenceMedia, EffectKeyList=effectKeyList)
+    totalImages = 0
+    totalShaders = 0
+    totalVideos = 0
+    totalErrors = 0
+    # The with block shuts the pool down even when a worker raises
+    parallel = (jobs > 1) and (len(SEQlist) > 1)
+    with (ProcessPoolExecutor(max_workers=jobs) if (parallel) else contextlib.nullcontext()) as executor:
+        results = executor.map(scanSeq, SEQlist) if (parallel) else map(scanSeq, SEQlist)
+        for (output, mediaRefs) in results:
+            (output, imagesCtr, shadersCtr, videosCtr, errorsCtr) = checkSequenceMedia(output, mediaRefs, verbose)
+            for line in output:
+                print (line)
+            totalImages += imagesCtr
+            totalShaders += shadersCtr
+            totalVideos += videosCtr
+            totalErrors += errorsCtr
+
+    print ("Total Sequences=%s Total Images=%s Total Shaders=%s Total Videos=%s Total Errors=%s" % (len(SEQlist), totalImages, totalShaders, totalVideos, totalErrors))
+    print ("Media Checks=%s Stat Calls=%s Stat Calls Saved=%s Media Files Listed=%s" % (mediaCacheStats["lookups"], mediaCacheStats["stats"], mediaCacheStats["lookups"] - mediaCacheStats["stats"], mediaCacheStats["listed"]))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
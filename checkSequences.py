@@ -16,17 +16,21 @@ import subprocess
 import os
 import time
 import re
-import requests
 import json
+import csv
+import datetime
+import hashlib
 
 ###########################
 # From Imports            #
 ###########################
 
-from shutil import copy
 from functools import partial
-from tkinter import *
+from shutil import copy, copy2
 from pathlib import Path
+from xlclient import *
+from seqindex import getSequenceList
+from xlselect import *
 
 ###############################
 # path_exists_case_sensitive  #
@@ -54,96 +58,187 @@ def path_exists_case_sensitive(path, verbose) -> bool:
         p = p.parent
 
 ###############################
-# doRequestsGet               #
+# Check Cache                 #
 ###############################
 
-def doRequestsGet(request, timeout, verbose):
+# Check Result Cache File in the Show Folder
+CHECK_CACHE = "checkSequences_cache.json"
+# Copies of the check output files next to the Check Result Cache File, the xLights output is overwritten by the next check
+CHECK_CACHE_OUTPUT = "checkSequences_cache"
+# Sequences checked between Check Result Cache saves, the rest are saved at the end of the run
+CHECK_SAVE_EVERY = 10
 
-    try:
-        r = requests.get(request, timeout=(timeout))
-        ret_code = 0
-        status_code = r.status_code
-        result = r.text
-
-    # HTTP Error?
-    except requests.exceptions.HTTPError as e:
-        ret_code = -1
-        status_code = ""
-        result = "##### Request HTTP Error: " + format(str(e))
-
-    # HTTP Connection Error?    
-    except requests.exceptions.ConnectionError as e:
-        ret_code = -2
-        status_code = ""
-        result = "##### Request Connection Error: " + format(str(e))
-
-    # HTTP Timeout?
-    except requests.exceptions.Timeout as e:
-        ret_code = -3
-        status_code = ""
-        result = "##### Request Timeout Error: " + format(str(e))
-    
-    # HTTP Other?
-    except requests.exceptions.RequestException as e:
-        ret_code = -4
-        status_code = ""
-        result = "##### Request Exception Error: " + format(str(e))
+# Check Sequence Output Lines, one combined search per line
+# Summary lines are printed, ERR/WARN lines are the issues counted in the report
+CHECK_LINE = re.compile(r"^(?:(?P<summary>Show folder:|Sequence:|Errors:)|\s*(?P<issue>ERR|WARN):)")
+# Totals at the end of the output, "Errors: 1. Warnings: 2"
+CHECK_TOTALS = re.compile(r"^Errors:\s*(?P<errors>\d+)\D+?Warnings:\s*(?P<warnings>\d+)")
+
+# Report CSV Columns
+REPORT_COLUMNS = ["sequence", "errors", "warnings", "cached", "outputfile"]
+
+###############################
+# fileSignature               #
+###############################
 
-    return(ret_code, status_code, result)
+def fileSignature(filename, cached):
+
+    # File Missing?
+    if (filename is None) or not os.path.isfile(filename):
+        return(None)
+    st = os.stat(filename)
+    # Size & Modified Time unchanged? Reuse cached content hash
+    if (cached is not None) and (cached.get("size") == st.st_size) and (cached.get("mtime") == st.st_mtime_ns):
+        return(cached)
+    # Content Hash
+    sha = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for chunk in iter(partial(f.read, 1024 * 1024), b""):
+            sha.update(chunk)
+    return({"hash": sha.hexdigest(), "size": st.st_size, "mtime": st.st_mtime_ns})
 
 ###############################
-# startxLights                  #
+# loadCheckCache              #
 ###############################
 
-def startxLights(baseURL, xlightsprogram, verbose):
+def loadCheckCache(xlightsshowfolder, layoutfiles, verbose):
 
-    # xLights Running?
-    request = baseURL + "getVersion"
+    cachefile = os.path.join(xlightsshowfolder, CHECK_CACHE)
+    sequences = {}
+    layout = {}
+    if os.path.isfile(cachefile):
+        try:
+            with open(cachefile, "r") as f:
+                d1 = json.load(f)
+            sequences = d1.get("sequences", {})
+            layout = d1.get("layout", {})
+        except (OSError, ValueError) as e:
+            print ("*** Check cache %s ignored: %s" % (cachefile, e))
+
+    # Layout File Content Hashes
+    layouthashes = {}
+    for layoutfile in layoutfiles:
+        sig = fileSignature(os.path.join(xlightsshowfolder, layoutfile), layout.get(layoutfile))
+        layout[layoutfile] = sig
+        layouthashes[layoutfile] = None if sig is None else sig["hash"]
     if (verbose):
-        print ("##### Get Version")
-        print ("request=", request)
-    startloop = True
-    started = False
-    retryctr = 0
-    while (startloop):
-        (ret_code, status_code, result) = doRequestsGet(request, 30, verbose)
-        match ret_code:
-            # REST API Connection Successful
-            case 0:
-                startloop = False
-                if (verbose):
-                    print ("status_code = ", status_code)
-                    print ("result = ", result)
-            # REST API Connection Error?
-            case -2:
-                if (not started):
-                    # Start xLights
-                    cmd = "\"" + xlightsprogram + "\""
-                    if (verbose):
-                        print ("##### Start xLights")
-                        print ("cmd = ", cmd)
-                    try:
-                        cp = subprocess.Popen(cmd)
-                    except:
-                        sys.exit("*** Error in starting xLights %s" % sys.exc_info()[0])
-                
-                    started = True
-                    retryctr = retryctr + 1
-                    if (retryctr <= 10):
-                        time.sleep(3)
-                    else:
-                        startloop = False
-            # REST API Error?
-            case _:
-                startloop = False
-            
-    return(ret_code, status_code, result)
+        print ("Check Cache = %s" % cachefile)
+        print ("Layout Hashes = %s" % layouthashes)
+
+    return({"file": cachefile, "outputfolder": os.path.join(xlightsshowfolder, CHECK_CACHE_OUTPUT), "layout": layout, "unsaved": 0,
+            "layouthashes": layouthashes, "sequences": sequences})
 
 ###############################
-# checkSequence               #
+# saveCheckCache              #
+###############################
+
+def saveCheckCache(cache):
+
+    # Write to a temporary file first so an interrupted run keeps the old cache
+    tmpfile = cache["file"] + ".tmp"
+    with open(tmpfile, "w") as f:
+        json.dump({"layout": cache["layout"], "sequences": cache["sequences"]}, f, indent=2)
+    os.replace(tmpfile, cache["file"])
+    cache["unsaved"] = 0
+
+###############################
+# flushCheckCache             #
+###############################
+
+def flushCheckCache(cache):
+
+    # Save the sequences recorded since the last save
+    if (cache["unsaved"] > 0):
+        saveCheckCache(cache)
+
+    return()
+
+###############################
+# cachedCheck                 #
 ###############################
 
-def checkSequence(baseURL, fullsequence, xlightsshowfolder, outputfolder, notepadopen, verbose):
+def cachedCheck(cache, fullsequence, outputfolder, verbose):
+
+    # Cached summary when the sequence, layout and output folder are unchanged and the cached output copy is still there
+    entry = cache["sequences"].get(fullsequence)
+    if (entry is None) or (entry.get("result") is None):
+        return(None)
+    if (entry.get("layout") != cache["layouthashes"]) or (entry.get("outputfolder") != outputfolder):
+        return(None)
+    xsq = fileSignature(fullsequence, entry.get("xsq"))
+    if (xsq is None) or (entry.get("xsq") is None) or (xsq["hash"] != entry["xsq"]["hash"]):
+        return(None)
+    output = fileSignature(entry.get("cachedoutput"), entry.get("output"))
+    if (output is None) or (entry.get("output") is None) or (output["hash"] != entry["output"]["hash"]):
+        return(None)
+    if (verbose):
+        print ("Unchanged sequence %s xsq=%s" % (fullsequence, xsq["hash"]))
+
+    return(entry)
+
+###############################
+# recordCheck                 #
+###############################
+
+def recordCheck(cache, fullsequence, outputfolder, outputfile, checkresult):
+
+    # Copy the output file under the cache, one copy per sequence path, size and modified time kept for fileSignature
+    if not os.path.isdir(cache["outputfolder"]):
+        os.mkdir(cache["outputfolder"])
+    cachedoutput = os.path.join(cache["outputfolder"], hashlib.sha1(fullsequence.encode("utf-8")).hexdigest()[:16] + "_" +
+        re.sub(".xsq", ".txt", os.path.basename(fullsequence)))
+    copy2(outputfile, cachedoutput)
+    cache["sequences"][fullsequence] = {"xsq": fileSignature(fullsequence, None), "layout": cache["layouthashes"],
+        "outputfolder": outputfolder, "outputfile": outputfile, "cachedoutput": cachedoutput,
+        "output": fileSignature(cachedoutput, None), "result": checkresult}
+    # Save every CHECK_SAVE_EVERY sequences rather than rewriting the cache after each one
+    cache["unsaved"] += 1
+    if (cache["unsaved"] >= CHECK_SAVE_EVERY):
+        saveCheckCache(cache)
+
+    return()
+
+###############################
+# parseCheckOutput            #
+###############################
+
+def parseCheckOutput(outputfile):
+
+    # Read the Check Sequence Output File once, one combined search per line
+    summary = []
+    issues = []
+    errors = 0
+    warnings = 0
+    totals = None
+    with open(outputfile, "r", errors="replace") as FINPUT:
+        for line in FINPUT:
+            s1 = CHECK_LINE.search(line)
+            if (not s1):
+                continue
+            # Strip Trailing Newline
+            line = line.strip()
+            if (s1.group("summary")):
+                summary.append(line)
+                s2 = CHECK_TOTALS.search(line)
+                if (s2):
+                    totals = (int(s2.group("errors")), int(s2.group("warnings")))
+            else:
+                issues.append(line)
+                if (s1.group("issue") == "ERR"):
+                    errors += 1
+                else:
+                    warnings += 1
+    # xLights totals win over the counted ERR/WARN lines
+    if (totals is not None):
+        (errors, warnings) = totals
+
+    return({"summary": summary, "errors": errors, "warnings": warnings, "issues": issues})
+
+###############################
+# runCheckSequence            #
+###############################
+
+def runCheckSequence(baseURL, fullsequence, xlightsshowfolder, outputfolder, verbose):
 
     # Check Sequence
     sequence = os.path.basename(fullsequence).split('/')[-1]
@@ -181,32 +276,37 @@ def checkSequence(baseURL, fullsequence, xlightsshowfolder, outputfolder, notepa
         # Copy File
         copy(outputfile, newoutputfile)
 
-    # Check Sequence Output File Searches
-    p1 = re.compile(r"^Show folder:")
-    p2 = re.compile(r"^Sequence:")
-    p3 = re.compile(r"^Errors:")
-    
-    print ("##### Check Sequence Summary")
+    return(newoutputfile)
+
+###############################
+# checkSequence               #
+###############################
+
+def checkSequence(baseURL, fullsequence, xlightsshowfolder, outputfolder, notepadopen, cache, force, verbose):
+
+    # Unchanged since the last check? Cached result, no REST API call
+    entry = None
+    if (not force):
+        entry = cachedCheck(cache, fullsequence, outputfolder, verbose)
+    if (entry is not None):
+        # Output file gone or overwritten since, e.g. the xLights output with -o NONE? Use the cached copy
+        newoutputfile = entry["outputfile"]
+        output = fileSignature(newoutputfile, entry["output"])
+        if (output is None) or (output["hash"] != entry["output"]["hash"]):
+            newoutputfile = entry["cachedoutput"]
+        checkresult = entry["result"]
+        print ("##### Check Sequence Summary (cached)")
+    else:
+        newoutputfile = runCheckSequence(baseURL, fullsequence, xlightsshowfolder, outputfolder, verbose)
+        checkresult = parseCheckOutput(newoutputfile)
+        recordCheck(cache, fullsequence, outputfolder, newoutputfile, checkresult)
+        print ("##### Check Sequence Summary")
     print ("Check Sequence Output File: %s" % newoutputfile)    
-    
-    # Open Check Sequence Output File 
-    FINPUT = open(newoutputfile, "r")
-    for line in FINPUT:
-        s1 = p1.search(line)
-        # Strip Trailing Newline
-        line = line.rstrip()
-        if (s1):
-            print (line)
-        else:
-            s2 = p2.search(line)
-            if (s2):
-                print (line)
-            else:
-                s3 = p3.search(line)
-                if (s3):
-                    print (line)
-    # Close INPUT File
-    FINPUT.close()
+    for line in checkresult["summary"]:
+        print (line)
+    if (verbose):
+        for line in checkresult["issues"]:
+            print ("   %s" % line)
 
     # Open Check Sequence Output in Notepad?
     if (notepadopen):
@@ -215,37 +315,115 @@ def checkSequence(baseURL, fullsequence, xlightsshowfolder, outputfolder, notepa
             cp = subprocess.Popen(cmd)
         except:
             sys.exit("*** Error in starting notepad %s" % sys.exc_info()[0])
+
+    # Report Row
+    return({"sequence": fullsequence, "errors": checkresult["errors"], "warnings": checkresult["warnings"],
+            "cached": (entry is not None), "outputfile": newoutputfile, "issues": checkresult["issues"]})
+
+###############################
+# printCheckReport            #
+###############################
+
+def printCheckReport(reportrows):
+
+    print ("##### Check Sequences Report")
+    for row in reportrows:
+        print ("%-60s errors = %-5s warnings = %-5s%s" % (row["sequence"], row["errors"], row["warnings"], " (cached)" if row["cached"] else ""))
+    print ("Total sequences = %s errors = %s warnings = %s" % (len(reportrows), sum(row["errors"] for row in reportrows), sum(row["warnings"] for row in reportrows)))
+
     return()
 
 ###############################
-# selectAll                   #
+# writeCheckReport            #
 ###############################
 
-def selectAll(lb):
-    lb.select_set(0, END)
+def writeCheckReport(reportfile, xlightsshowfolder, reportrows, verbose):
+
+    # CSV by file extension, otherwise JSON
+    if reportfile.lower().endswith(".csv"):
+        with open(reportfile, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=REPORT_COLUMNS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(reportrows)
+    else:
+        report = {"date": datetime.datetime.now().isoformat(timespec="seconds"), "showfolder": xlightsshowfolder,
+                  "totals": {"sequences": len(reportrows), "errors": sum(row["errors"] for row in reportrows),
+                             "warnings": sum(row["warnings"] for row in reportrows)},
+                  "sequences": reportrows}
+        with open(reportfile, "w") as f:
+            json.dump(report, f, indent=2)
+    print ("Check Sequences Report = %s" % reportfile)
+
+    return()
 
 ###############################
-# clearAll                    #
+# loadCheckReport             #
 ###############################
 
-def clearAll(lb):
-    lb.select_clear(0, END)
+def loadCheckReport(reportfile):
+
+    # Previous JSON report rows by sequence
+    if not os.path.isfile(reportfile):
+        print("Error: Previous Check Sequences Report not found %s" % reportfile)
+        sys.exit(-1)
+    try:
+        with open(reportfile, "r") as f:
+            report = json.load(f)
+    except (OSError, ValueError) as e:
+        print("Error: Previous Check Sequences Report %s not a JSON report: %s" % (reportfile, e))
+        sys.exit(-1)
+
+    return({row["sequence"]: row for row in report.get("sequences", [])})
+
+###############################
+# diffCheckReport             #
+###############################
+
+def diffCheckReport(previousrows, reportrows):
+
+    print ("##### Check Sequences Report Differences")
+    changed = 0
+    for row in reportrows:
+        previous = previousrows.get(row["sequence"])
+        if (previous is None):
+            print ("%s new errors = %s warnings = %s" % (row["sequence"], row["errors"], row["warnings"]))
+            changed += 1
+            continue
+        newissues = [issue for issue in row["issues"] if issue not in previous.get("issues", [])]
+        resolved = [issue for issue in previous.get("issues", []) if issue not in row["issues"]]
+        if (row["errors"] == previous["errors"]) and (row["warnings"] == previous["warnings"]) and (len(newissues) == 0) and (len(resolved) == 0):
+            continue
+        changed += 1
+        print ("%s errors = %s (%+d) warnings = %s (%+d)" % (row["sequence"], row["errors"], row["errors"] - previous["errors"],
+            row["warnings"], row["warnings"] - previous["warnings"]))
+        for issue in newissues:
+            print ("   + %s" % issue)
+        for issue in resolved:
+            print ("   - %s" % issue)
+    print ("Changed sequences = %s of %s" % (changed, len(reportrows)))
+
+    return()
 
 ###############################
 # selectSequences             #
 ###############################
 
-def selectSequences(window, listSEQ, baseURL, xlightsshowfolder, outputfolder, notepadopen, verbose):
+def selectSequences(SEQsel, baseURL, xlightsshowfolder, outputfolder, notepadopen, cache, force, verbose):
     if (verbose):
-        print(listSEQ)
+        print(SEQsel)
         print(baseURL)
-    seqSel = listSEQ.curselection()
-    for i in seqSel:
-        fullsequence = str(listSEQ.get(i))
-    # Check Sequence
-        checkSequence(baseURL, fullsequence, xlightsshowfolder, outputfolder, notepadopen, verbose) 
-    # Close Window
-    window.quit()
+    reportrows = []
+    # Checked sequences are saved to the cache even when a request error ends the run
+    try:
+        for fullsequence in SEQsel:
+        # Check Sequence
+            reportrows.append(checkSequence(baseURL, fullsequence, xlightsshowfolder, outputfolder, notepadopen, cache, force, verbose))
+    finally:
+        flushCheckCache(cache)
+    cached = len([row for row in reportrows if row["cached"]])
+    print ("##### Checked %s sequences, %s unchanged from the check cache" % (len(SEQsel), cached))
+
+    return(reportrows)
 ###############################
 # Main                        #
 ###############################    
@@ -268,12 +446,24 @@ def main():
     cli_parser.add_argument('-n', '--notepadopen' , help = 'Notepad Open', action='store_true',
         required = False)
 
+    cli_parser.add_argument('-f', '--force', help = 'Check unchanged sequences', action='store_true',
+        required = False)
+
+    cli_parser.add_argument('-r', '--report', help = 'Report File, .csv for CSV otherwise JSON', default = "NONE",
+        required = False)
+
+    cli_parser.add_argument('--diff', help = 'Previous JSON Report File to compare with', default = "NONE",
+        required = False)
+
     cli_parser.add_argument('-c', '--closexlights' , help = 'Close xLights', action='store_true',
         required = False)    
 
     cli_parser.add_argument('-v', '--verbose', help = 'Verbose Logging', action='store_true',
         required = False)
 
+    ### Selection Arguments
+    addSelectArguments(cli_parser)
+
     ### Get Arguments
 
     args = cli_parser.parse_args()
@@ -281,6 +471,9 @@ def main():
     xlightsshowfolder = os.path.abspath(args.xlightsshowfolder)
     outputfolder = args.outputfolder
     notepadopen = args.notepadopen
+    force = args.force
+    reportfile = args.report
+    difffile = args.diff
     closexlights = args.closexlights
     verbose = args.verbose
     
@@ -299,12 +492,18 @@ def main():
     ### Get xLights Parms
     xlightsipaddress = xlightsparms.get("xlightsipaddress")
     xlightsport = xlightsparms.get("xlightsport")
-    # Replace xlightsport with real port value
-    if (xlightsport == "A"):
-        xlightsport = "49913"
-    elif (xlightsport == "B"):
-        xlightsport = "49914"
+    # Replace xlightsport with real port value (first port of a list)
+    xlightsport = getxLightsPorts(xlightsport)[0]
     xlightsprogram = xlightsparms.get("xlightsprogram")
+    xlightsnetworksxmlfile = xlightsparms.get("xlightsnetworksxmlfile")
+    xlightsrgbeffectsxmlfile = xlightsparms.get("xlightsrgbeffectsxmlFile")
+    xlightspoolsize = xlightsparms.get("xlightspoolsize", DEFAULT_POOL_SIZE)
+    xlightsmetricsfolder = xlightsparms.get("xlightsmetricsfolder")
+    # Init xLights REST API Session
+    initSession(xlightspoolsize, verbose)
+    # Write REST API Metrics at exit, only when xlightsparms.json has a metrics folder
+    if (xlightsmetricsfolder is not None):
+        startRequestMetrics(xlightsmetricsfolder, verbose)
     
     if (verbose):
         print ("Xlights Show Folder = %s" % xlightsshowfolder)
@@ -313,6 +512,9 @@ def main():
         print ("xLights Program = %s" % xlightsprogram)
         print ("Output Folder = %s" % outputfolder)
         print ("Notepad Open = %s" % notepadopen)
+        print ("Force Check = %s" % force)
+        print ("Report File = %s" % reportfile)
+        print ("Diff Report File = %s" % difffile)
         print ("Close xLights = %s" % closexlights)
         print ("CWD = %s" % CWD)        
     
@@ -374,58 +576,34 @@ def main():
         if (verbose):
             print ("status_code = ", status_code)
             print ("result = ", result)
+    # Load Previous Report before it may be overwritten by this run
+    if (difffile != "NONE"):
+        previousrows = loadCheckReport(difffile)
+
+    # Load Check Cache
+    cache = loadCheckCache(xlightsshowfolder, [xlightsnetworksxmlfile, xlightsrgbeffectsxmlfile], verbose)
+
     # Build Sequence List
-    SEQlist = []
-    ### OS Walk Show Folder Recursively
-    for root, dir, files in os.walk(xlightsshowfolder):
-        for file in files:
-            # xLights Sequence File?
-            if (file.endswith(".xsq")):
-                fullsequence = os.path.join(root, file)
-                found = fullsequence.find("Backup\\")
-                # xLights Sequence File not in the Backup folder?
-                if (found < 0):
-                    sequence = file
-                    if (verbose):
-                        print ("sequence = ", sequence)
-                        print ("fullsequence = ", fullsequence)
-                    SEQlist.append(fullsequence)
-
-    # Check Sequences Selection Window
-    window = Tk()
-    window.title('Check Sequences')
-    window.geometry("520x520")
-
-    Label(window, text="Select Sequences to Check").pack()
-
-    frame = Frame(window)
-    frame.pack()
-
-    listSEQ = Listbox(frame, width=50, height=20, font=("Helvetica", 12), selectmode = "multiple")
-    listSEQ.pack(padx = 10, pady = 10, expand = YES, fill = "both")
-    # Vertical Scrollbar
-    scroll_V = Scrollbar(frame, orient="vertical")
-    scroll_V.config(command=listSEQ.yview)
-    scroll_V.pack(side="right", fill="y")
-    # Horizontal Scrollbar
-    scroll_H = Scrollbar(frame, orient="horizontal")
-    scroll_H.config(command=listSEQ.xview)
-    scroll_H.pack(side= BOTTOM, fill= "x")
-    # List Config
-    listSEQ.config(yscrollcommand=scroll_V.set, xscrollcommand=scroll_H.set)
-    # Load Sequence List
-    for i in range(len(SEQlist)):
-        listSEQ.insert(END, SEQlist[i])
-    
-    allButton = Button(window, text="Select All", command = partial(selectAll, listSEQ)).pack(side = LEFT, padx=10)
-    clearButton = Button(window, text="Clear All", command = partial(clearAll, listSEQ)).pack(side = LEFT, padx=10)
-    checkButton = Button(window, text="Check", command = lambda: selectSequences(window, listSEQ, baseURL, xlightsshowfolder, outputfolder, notepadopen, verbose)).pack(side = LEFT, padx=10)
-    cancelButton = Button(window, text="Cancel", command = window.destroy).pack(side = LEFT, padx=10)
+    SEQlist = getSequenceList(xlightsshowfolder, verbose)
 
-    window.mainloop()
+    # Sequence Selection, headless with --all/--select otherwise a selection window
+    if isHeadless(args):
+        SEQsel = selectMatching(SEQlist, [sequenceKeys(fullsequence, xlightsshowfolder) for fullsequence in SEQlist], args.all, args.select, verbose)
+    else:
+        SEQsel = selectListbox('Check Sequences', "Select Sequences to Check", "520x520", SEQlist, "Check", verbose)
+    # Selection Cancelled?
+    if (SEQsel is not None):
+        reportrows = selectSequences(SEQsel, baseURL, xlightsshowfolder, outputfolder, notepadopen, cache, force, verbose)
+        printCheckReport(reportrows)
+        if (reportfile != "NONE"):
+            writeCheckReport(reportfile, xlightsshowfolder, reportrows, verbose)
+        if (difffile != "NONE"):
+            diffCheckReport(previousrows, reportrows)
 
     ### Close xLights
-    if (closexlights):
+    if (closexlights) and (baseURL in supervisedURLs(verbose)):
+        print ("##### xLights %s left running for the xLights Supervisor" % baseURL)
+    elif (closexlights):
         request = baseURL + "closexLights"
         if (verbose):
             print("##### closexLights")
@@ -437,6 +615,10 @@ def main():
             print("result = ", result)
             sys.exit(ret_code)
 
+    # REST API Timings
+    if (verbose):
+        printRequestTimings()
+
     print ("#" *5 + " checkSequences End")      
 
 if __name__ == "__main__":
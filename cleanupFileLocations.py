@@ -12,11 +12,9 @@
 
 import argparse
 import sys
-import subprocess
 import os
 import time
 import re
-import requests
 import json
 import urllib.parse
 
@@ -24,9 +22,10 @@ import urllib.parse
 # From Imports            #
 ###########################
 
-from functools import partial
-from tkinter import *
 from pathlib import Path
+from xlclient import *
+from seqindex import getSequenceList
+from xlselect import *
 
 ###############################
 # path_exists_case_sensitive  #
@@ -53,92 +52,6 @@ def path_exists_case_sensitive(path, verbose) -> bool:
             return False
         p = p.parent
 
-###############################
-# doRequestsGet               #
-###############################
-
-def doRequestsGet(request, timeout, verbose):
-
-    try:
-        r = requests.get(request, timeout=(timeout))
-        ret_code = 0
-        status_code = r.status_code
-        result = r.text
-
-    # HTTP Error?
-    except requests.exceptions.HTTPError as e:
-        ret_code = -1
-        status_code = ""
-        result = "##### Request HTTP Error: " + format(str(e))
-
-    # HTTP Connection Error?
-    except requests.exceptions.ConnectionError as e:
-        ret_code = -2
-        status_code = ""
-        result = "##### Request Connection Error: " + format(str(e))
-
-    # HTTP Timeout?
-    except requests.exceptions.Timeout as e:
-        ret_code = -3
-        status_code = ""
-        result = "##### Request Timeout Error: " + format(str(e))
-    
-    # HTTP Other?
-    except requests.exceptions.RequestException as e:
-        ret_code = -4
-        status_code = ""
-        result = "##### Request Exception Error: " + format(str(e))
-
-    return(ret_code, status_code, result)
-
-###############################
-# startxLights                #
-###############################
-
-def startxLights(baseURL, xlightsprogram, verbose):
-
-    # xLights Running?
-    request = baseURL + "getVersion"
-    if (verbose):
-        print ("##### Get Version")
-        print ("request=", request)
-    startloop = True
-    started = False
-    retryctr = 0
-    while (startloop):
-        (ret_code, status_code, result) = doRequestsGet(request, 30, verbose)
-        match ret_code:
-            # REST API Connection Successful
-            case 0:
-                startloop = False
-                if (verbose):
-                    print ("status_code = ", status_code)
-                    print ("result = ", result)
-            # REST API Connection Error?
-            case -2:
-                if (not started):
-                    # Start xLights
-                    cmd = "\"" + xlightsprogram + "\""
-                    if (verbose):
-                        print ("##### Start xLights")
-                        print ("cmd = ", cmd)
-                    try:
-                        cp = subprocess.Popen(cmd)
-                    except:
-                        sys.exit("*** Error in starting xLights %s" % sys.exc_info()[0])
-                
-                    started = True
-                    retryctr = retryctr + 1
-                    if (retryctr <= 10):
-                        time.sleep(3)
-                    else:
-                        startloop = False
-            # REST API Error?
-            case _:
-                startloop = False
-            
-    return(ret_code, status_code, result)
-
 ###############################
 # createParamsStr              #
 ###############################
@@ -245,35 +158,17 @@ def cleanupFileLocations(baseURL, fullsequence, verbose):
 
     return()
 
-###############################
-# selectAll                   #
-###############################
-
-def selectAll(lb):
-    lb.select_set(0, END)
-
-###############################
-# clearAll                    #
-###############################
-
-def clearAll(lb):
-    lb.select_clear(0, END)
-
 ###############################
 # selectSequences             #
 ###############################
 
-def selectSequences(window, listSEQ, baseURL, verbose):
+def selectSequences(SEQsel, baseURL, verbose):
     if (verbose):
-        print(listSEQ)
+        print(SEQsel)
         print(baseURL)
-    seqSel = listSEQ.curselection()
-    for i in seqSel:
-        fullsequence = str(listSEQ.get(i))
-        # Package Sequence
+    for fullsequence in SEQsel:
+        # Clean Up File Locations
         cleanupFileLocations(baseURL, fullsequence, verbose)
-    # Close Window
-    window.quit()
 ###############################
 # main                        #
 ###############################
@@ -296,6 +191,9 @@ def main():
     cli_parser.add_argument('-v', '--verbose', help = 'Verbose Logging', action='store_true',
         required = False)
 
+    ### Selection Arguments
+    addSelectArguments(cli_parser)
+
     ### Get Arguments
     args = cli_parser.parse_args()
     
@@ -313,12 +211,16 @@ def main():
     ### Get xLights Parms
     xlightsipaddress = xlightsparms.get("xlightsipaddress")
     xlightsport = xlightsparms.get("xlightsport")
-    # Replace xlightsport with real port value
-    if (xlightsport == "A"):
-        xlightsport = "49913"
-    elif (xlightsport == "B"):
-        xlightsport = "49914"
+    # Replace xlightsport with real port value (first port of a list)
+    xlightsport = getxLightsPorts(xlightsport)[0]
     xlightsprogram = xlightsparms.get("xlightsprogram")   
+    xlightspoolsize = xlightsparms.get("xlightspoolsize", DEFAULT_POOL_SIZE)
+    xlightsmetricsfolder = xlightsparms.get("xlightsmetricsfolder")
+    # Init xLights REST API Session
+    initSession(xlightspoolsize, verbose)
+    # Write REST API Metrics at exit, only when xlightsparms.json has a metrics folder
+    if (xlightsmetricsfolder is not None):
+        startRequestMetrics(xlightsmetricsfolder, verbose)
     
     if (verbose):
         print ("xLights Show Folder = %s" % xlightsshowfolder)
@@ -389,55 +291,17 @@ def main():
             print ("result = ", result)
 
     # Build Sequence List
-    SEQlist = []
-    ### OS Walk Show Folder Recursively
-    for root, dir, files in os.walk(xlightsshowfolder):
-        for file in files:
-            # xLights Sequence File?
-            if (file.endswith(".xsq")):
-                fullsequence = os.path.join(root, file)
-                found = fullsequence.find("Backup\\")
-                # xLights Sequence File not in the Backup folder?
-                if (found < 0):
-                    sequence = file
-                    if (verbose):
-                        print ("sequence = ", sequence)
-                        print ("fullsequence = ", fullsequence)
-                    SEQlist.append(fullsequence)
-
-
-# Check Sequences Selection Window
-    window = Tk()
-    window.title('Clean Up File Locations')
-    window.geometry("520x520")
-
-    Label(window, text="Select Sequences to Clean Up File Locations").pack()
-
-    frame = Frame(window)
-    frame.pack()
-
-    listSEQ = Listbox(frame, width=50, height=20, font=("Helvetica", 12), selectmode = "multiple")
-    listSEQ.pack(padx = 10, pady = 10, expand = YES, fill = "both")
-    # Vertical Scrollbar
-    scroll_V = Scrollbar(frame, orient="vertical")
-    scroll_V.config(command=listSEQ.yview)
-    scroll_V.pack(side="right", fill="y")
-    # Horizontal Scrollbar
-    scroll_H = Scrollbar(frame, orient="horizontal")
-    scroll_H.config(command=listSEQ.xview)
-    scroll_H.pack(side= BOTTOM, fill= "x")
-    # List Config
-    listSEQ.config(yscrollcommand=scroll_V.set, xscrollcommand=scroll_H.set)
-    # Load Sequence List
-    for i in range(len(SEQlist)):
-        listSEQ.insert(END, SEQlist[i])
-    
-    allButton = Button(window, text="Select All", command = partial(selectAll, listSEQ)).pack(side = LEFT, padx=10)
-    clearButton = Button(window, text="Clear All", command = partial(clearAll, listSEQ)).pack(side = LEFT, padx=10)
-    cleanupButton = Button(window, text="Clean Up", command = lambda: selectSequences(window, listSEQ, baseURL, verbose)).pack(side = LEFT, padx=10)
-    cancelButton = Button(window, text="Cancel", command = window.destroy).pack(side = LEFT, padx=10)
+    SEQlist = getSequenceList(xlightsshowfolder, verbose)
 
-    window.mainloop()
+
+    # Sequence Selection, headless with --all/--select otherwise a selection window
+    if isHeadless(args):
+        SEQsel = selectMatching(SEQlist, [sequenceKeys(fullsequence, xlightsshowfolder) for fullsequence in SEQlist], args.all, args.select, verbose)
+    else:
+        SEQsel = selectListbox('Clean Up File Locations', "Select Sequences to Clean Up File Locations", "520x520", SEQlist, "Clean Up", verbose)
+    # Selection Cancelled?
+    if (SEQsel is not None):
+        selectSequences(SEQsel, baseURL, verbose)
                   
 
 
@@ -459,7 +323,9 @@ def main():
         
     
     ### Close xLights
-    if (closexlights):
+    if (closexlights) and (baseURL in supervisedURLs(verbose)):
+        print ("##### xLights %s left running for the xLights Supervisor" % baseURL)
+    elif (closexlights):
         request = baseURL + "closexLights"
         if (verbose):
             print("##### closexLights")
@@ -471,6 +337,10 @@ def main():
             print("result = ", result)
             sys.exit(ret_code)
     
+    # REST API Timings
+    if (verbose):
+        printRequestTimings()
+
     print ("#" *5 + " cleanupFileLocations End")
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -13,11 +13,9 @@
 import argparse
 import xml.etree.ElementTree as ET
 import sys
-import subprocess
 import os
 import platform
 import re
-import requests
 import json
 import datetime
 import time
@@ -27,6 +25,7 @@ import xlsxwriter
 ### Imports From    ###
 #######################
 from istools import *
+from xlclient import *
 from pathlib import Path
 
 ###############################
@@ -54,92 +53,6 @@ def path_exists_case_sensitive(path, verbose) -> bool:
             return False
         p = p.parent
 
-###############################
-# doRequestsGet               #
-###############################
-
-def doRequestsGet(request, timeout, verbose):
-
-    try:
-        r = requests.get(request, timeout=(timeout))
-        ret_code = 0
-        status_code = r.status_code
-        result = r.text
-
-    # HTTP Error?
-    except requests.exceptions.HTTPError as e:
-        ret_code = -1
-        status_code = ""
-        result = "##### Request HTTP Error: " + format(str(e))
-
-    # HTTP Connection Error?
-    except requests.exceptions.ConnectionError as e:
-        ret_code = -2
-        status_code = ""
-        result = "##### Request Connection Error: " + format(str(e))
-
-    # HTTP Timeout?
-    except requests.exceptions.Timeout as e:
-        ret_code = -3
-        status_code = ""
-        result = "##### Request Timeout Error: " + format(str(e))
-    
-    # HTTP Other?
-    except requests.exceptions.RequestException as e:
-        ret_code = -4
-        status_code = ""
-        result = "##### Request Exception Error: " + format(str(e))
-
-    return(ret_code, status_code, result)
-
-###############################
-# startxLights                #
-###############################
-
-def startxLights(baseURL, xlightsprogram, verbose):
-
-    # xLights Running?
-    request = baseURL + "getVersion"
-    if (verbose):
-        print ("##### Get Version")
-        print ("request=", request)
-    startloop = True
-    started = False
-    retryctr = 0
-    while (startloop):
-        (ret_code, status_code, result) = doRequestsGet(request, 30, verbose)
-        match ret_code:
-            # REST API Connection Successful
-            case 0:
-                startloop = False
-                if (verbose):
-                    print ("status_code = ", status_code)
-                    print ("result = ", result)
-            # REST API Connection Error?
-            case -2:
-                if (not started):
-                    # Start xLights
-                    cmd = "\"" + xlightsprogram + "\""
-                    if (verbose):
-                        print ("##### Start xLights")
-                        print ("cmd = ", cmd)
-                    try:
-                        cp = subprocess.Popen(cmd)
-                    except:
-                        sys.exit("*** Error in starting xLights %s" % sys.exc_info()[0])
-                
-                    started = True
-                    retryctr = retryctr + 1
-                    if (retryctr <= 10):
-                        time.sleep(3)
-                    else:
-                        startloop = False
-            # REST API Error?
-            case _:
-                startloop = False
-            
-    return(ret_code, status_code, result)
-
 ###############################
 # createParamsStr              #
 ###############################
@@ -173,6 +86,18 @@ def createParamsStr(params_dict, verbose):
     
     return(params_str)
 
+#########################
+### Globals           ###
+#########################
+
+# Streaming Worksheet Column Widths {worksheet: [width, ...]}, replaces autofit in constant_memory mode
+wsColWidths = {}
+# Excel Maximum Column Width
+WS_MAX_COL_WIDTH = 255
+# Streaming Worksheet Limit, constant_memory keeps a temporary file open per worksheet until the workbook
+# is closed, above this many controllers they are written to one combined worksheet
+WS_MAX_STREAMING_SHEETS = 100
+
 #########################
 ### wsOutputRow       ###
 #########################
@@ -182,6 +107,8 @@ def wsOutputRow(worksheet, wsRow, wsCol, wsCellList, wsFmtList, wbFmts, verbose)
         print ("wsOutput: (000) *** Begin ***")
           # Workbook Format for Cell
 
+    # Streaming Worksheet? Track Column Widths
+    colWidths = wsColWidths.get(worksheet)
     for wsCellwsCol, wsCell in enumerate(wsCellList):
         if (verbose):
             print ("wsOutput: (010) , wsCellList[%s] = %s, wsRow = %s, wsCol = %s" % (wsCellwsCol, wsCell, wsRow, wsCol))
@@ -198,11 +125,28 @@ def wsOutputRow(worksheet, wsRow, wsCol, wsCellList, wsFmtList, wbFmts, verbose)
             worksheet.write_number(wsRow, wsCol, Number, wbFmt)       
         else:    
             worksheet.write_string(wsRow, wsCol, wsCell, wbFmt)       
+        if (colWidths is not None):
+            while (len(colWidths) <= wsCol):
+                colWidths.append(0)
+            colWidths[wsCol] = max(colWidths[wsCol], len(str(wsCell)))
         # Increment Column
         wsCol += 1
     if (verbose):
         print ("wsOutput: (000) *** End ***")
 
+#########################
+### wsSetColumnWidths ###
+#########################
+def wsSetColumnWidths(worksheet, verbose):
+
+    # Set Column Widths from the tracked string lengths, autofit needs every cell in memory
+    colWidths = wsColWidths.pop(worksheet, [])
+    for wsCol, colWidth in enumerate(colWidths):
+        if (colWidth > 0):
+            worksheet.set_column(wsCol, wsCol, min(colWidth + 1, WS_MAX_COL_WIDTH))
+    if (verbose):
+        print ("wsSetColumnWidths: colWidths = %s" % colWidths)
+
 #########################
 ### createWorksheet   ###
 #########################
@@ -283,13 +227,16 @@ def createWorksheet(workbook, worksheetname, wspaper, wsorientation, wsmleft, ws
 ### createWorkbook    ###
 #########################
 
-def createWorkbook(workbookfile, dwbFmts, verbose):
+def createWorkbook(workbookfile, dwbFmts, streaming, verbose):
 
     if (verbose):
         print ("createWorkbook: (000) *** Begin ***")
 
-    # Create Workbook
-    workbook = xlsxwriter.Workbook(workbookfile)
+    # Create Workbook, streaming rows to disk in constant_memory mode?
+    if (streaming):
+        workbook = xlsxwriter.Workbook(workbookfile, {'constant_memory': True})
+    else:
+        workbook = xlsxwriter.Workbook(workbookfile)
     # Set Workbook Properties
     workbook.set_properties({
         'title': 'Export Controllers',
@@ -340,10 +287,106 @@ def nested_dict_pairs_iterator(dict_obj):
             # If value is not dict type then yield the value
             yield (key, value)
 
+###############################
+### getControllersDict      ###
+###############################
+def getControllersDict(baseURL, verbose):
+    if (verbose):
+        print ("getControllersDict: (000) *** Begin ***")
+
+    #
+    # Get Controllers Information from xLights REST API getControllers, once for all controllers
+    #
+    request = baseURL + "getControllers"
+    if (verbose):
+        print ("##### Get Controllers %s" % request)
+        print ("request = ", request)
+    (ret_code, status_code, result) = doRequestsGet(request, 30, verbose)
+    # Request Error?
+    if (ret_code < 0):
+        print("Unable to connect to xLights REST API %s" % baseURL)
+        print ("ret_code = ", ret_code)
+        print ("result = ", result) 
+        sys.exit(ret_code)
+    if (verbose):
+        print ("status_code = ", status_code)
+        print ("result = ", result)
+    # getControllers result
+    getControllers = json.loads(result)
+    if (verbose):
+        print ("Controllers Length = ", len(getControllers))
+    # Index getControllers by Controller Name
+    getControllersDict = {}
+    for getController in getControllers:
+        if (verbose):
+            print (getController)
+        getControllersDict.setdefault(getController.get("name"), []).append(getController)
+
+    if (verbose):
+        print ("getControllersDict: (999) *** End ***")
+
+    return(getControllersDict)
+
+###############################
+### wsOutputGetController   ###
+###############################
+def wsOutputGetController(worksheet, wsRow, getController, wbFmts, verbose):
+
+    #Loop through all key-value pairs of a nested dictionary
+    for dictPair in nested_dict_pairs_iterator(getController):
+        dictPairType = type(dictPair)
+        lendictPair = len(dictPair)
+        if (verbose):
+            print ("dictPairType =", dictPairType)
+            print("dictPair =", dictPair)
+            print ("lendictPair =", lendictPair)
+        wsColList = []
+        wsFmtList = []
+        # List Value?
+        if (type(dictPair[-1]) == list):
+            ListFound = True
+            ListdictPair = dictPair[-1]
+        else:
+            ListFound = False
+            ListdictPair = []
+        if not (ListFound):
+            wsCol = 0
+            iSTOP = lendictPair
+            for i in range(iSTOP):
+                if (i < iSTOP - 1): 
+                    wsColList.append(dictPair[i])
+                    wsFmtList.append("boldLeft")
+                else:
+                    wsColList.append(dictPair[i])
+                    wsFmtList.append("strLeft")            
+            # Output Worksheet Row
+            wsOutputRow(worksheet, wsRow, wsCol, wsColList, wsFmtList, wbFmts, verbose)
+            wsRow += 1
+        else:
+            wsCol = 0                          
+            iSTOP = lendictPair - 1      
+            for i in range(iSTOP):
+                wsColList.append(dictPair[i])
+                wsFmtList.append("boldLeft")                          
+            jSTOP = len(ListdictPair)
+            for j in range(jSTOP):
+                if (j < 1):
+                    wsColList.append(ListdictPair[j])
+                    wsFmtList.append("strLeft")
+                else:    
+                    wsColList[-1] = (ListdictPair[j])
+                    wsFmtList[-1] = ("strLeft")        
+                # Output Worksheet Row
+                wsCol = 0
+                wsOutputRow(worksheet, wsRow, wsCol, wsColList, wsFmtList, wbFmts, verbose)
+                wsRow += 1
+
+    return(wsRow)
+
 ###############################
 ### exportControllers  ###
 ###############################
-def exportControllers(baseURL, xlightsshowfolder, xlightsnetworksxmlfull, workbook, wbFmts, wbHeaderImage, verbose):
+def exportControllers(baseURL, xlightsshowfolder, xlightsnetworksxmlfull, workbook, wbFmts, wbHeaderImage, streaming, verbose):
     if (verbose):
         print ("exportControllers: (000) *** Begin ***")
 
@@ -354,11 +397,21 @@ def exportControllers(baseURL, xlightsshowfolder, xlightsnetworksxmlfull, workbo
         print ("wbFmtsKeys =", wbFmtsKeys)
     # 
 
+    #
+    ###################################################################
+    # Get Controllers Information from xLights REST API getControllers
+    ###################################################################
+    #
+    starttime = time.perf_counter()
+    dgetControllers = getControllersDict(baseURL, verbose)
+    restTime = time.perf_counter() - starttime
+
     #
     ###################################################################
     # Get Controllers Information from xLights Networks Xml File
     ###################################################################
     #
+    starttime = time.perf_counter()
 
     # Networks XML Tree
     xmlNetTree = ET.parse(xlightsnetworksxmlfull)
@@ -366,34 +419,54 @@ def exportControllers(baseURL, xlightsshowfolder, xlightsnetworksxmlfull, workbo
     xmlNetRoot = xmlNetTree.getroot()
     # Get Network XML Root Attributes
     xmlNetKeys = ([*xmlNetRoot.attrib])
+    Controllers = xmlNetRoot.findall('Controller')
+    # Streaming with too many controllers for a worksheet each? One combined worksheet, a page per controller
+    combined = (streaming) and (len(Controllers) > WS_MAX_STREAMING_SHEETS)
+    if (combined):
+        print ("##### %s controllers > %s, streaming to one combined Controllers worksheet" % (len(Controllers), WS_MAX_STREAMING_SHEETS))
+        worksheet = createWorksheet(workbook, "Controllers", 1, "landscape", 0.7, 0.7, 1.5, 0.7, "NONE", 100,
+            "Controllers", "Show Folder: " + xlightsshowfolder, wbHeaderImage, verbose)
+        wsColWidths[worksheet] = []
+        wsPageBreak = []
+        wsRow = 0
     #   
-    for Controller in xmlNetRoot.findall('Controller'):
+    for Controller in Controllers:
         #
         # Create Worksheet for Controller
         # 
         ControllerName = Controller.get("Name")
-        worksheetname = ControllerName
-        wspaper = 1
-        wsorientation = "landscape"
-        wsmleft = 0.7
-        wsmright = 0.7
-        wsmtop = 1.5
-        wsmbottom = 0.7
-        wsrepeatrow = "NONE"
-        wsprintscale = 100
-        wstitle1 = "Controller: " + ControllerName
-        wstitle2 = "Show Folder: " + xlightsshowfolder
-        wsPageBreak = []
-        worksheet = createWorksheet(workbook, worksheetname, wspaper, wsorientation, wsmleft, wsmright, wsmtop, wsmbottom, wsrepeatrow, wsprintscale, wstitle1, wstitle2, wbHeaderImage, verbose)           
-        
-        # Init Worksheet Row & Column
-        wsRow = 0
+        if (combined):
+            # Page Break before each controller after the first
+            if (wsRow > 0):
+                wsRow += 1
+                wsPageBreak.append(wsRow)
+        else:
+            worksheetname = ControllerName
+            wspaper = 1
+            wsorientation = "landscape"
+            wsmleft = 0.7
+            wsmright = 0.7
+            wsmtop = 1.5
+            wsmbottom = 0.7
+            wsrepeatrow = "NONE"
+            wsprintscale = 100
+            wstitle1 = "Controller: " + ControllerName
+            wstitle2 = "Show Folder: " + xlightsshowfolder
+            wsPageBreak = []
+            worksheet = createWorksheet(workbook, worksheetname, wspaper, wsorientation, wsmleft, wsmright, wsmtop, wsmbottom, wsrepeatrow, wsprintscale, wstitle1, wstitle2, wbHeaderImage, verbose)           
+            # Streaming Worksheet? Rows are written in order and column widths tracked
+            if (streaming):
+                wsColWidths[worksheet] = []
+            # Init Worksheet Row
+            wsRow = 0
+
+        # Init Worksheet Column
         wsCol = 0
         # Init Worksheet Column & Format List
         wsColList = []
         wsFmtList = []
         # 
-        wsColList.append("Networks XML Controller Information")
+        wsColList.append("Networks XML Controller Information" + (": " + ControllerName if (combined) else ""))
         wsFmtList.append("boldLeft")
         wsOutputRow(worksheet, wsRow, wsCol, wsColList, wsFmtList, wbFmts, verbose)
         wsColList = []
@@ -427,27 +500,6 @@ def exportControllers(baseURL, xlightsshowfolder, xlightsnetworksxmlfull, workbo
             wsColList = []
             wsFmtList = []
 
-        #
-        # Get Controllers Information from xLights REST API getControllers
-        #
-        request = baseURL + "getControllers"
-        if (verbose):
-            print ("##### Get Controllers %s" % request)
-            print ("request = ", request)
-        (ret_code, status_code, result) = doRequestsGet(request, 30, verbose)
-        # Request Error?
-        if (ret_code < 0):
-            print("Unable to connect to xLights REST API %s" % baseURL)
-            print ("ret_code = ", ret_code)
-            print ("result = ", result) 
-            sys.exit(ret_code)
-        if (verbose):
-            print ("status_code = ", status_code)
-            print ("result = ", result)
-        # getControllers result
-        getControllers = json.loads(result)
-        if (verbose):
-            print ("Controllers Length = ", len(getControllers))
         # Increment Row
         wsRow += 1
         wsCol = 0
@@ -464,70 +516,26 @@ def exportControllers(baseURL, xlightsshowfolder, xlightsnetworksxmlfull, workbo
         wsRow += 1
         wsCol = 0       
         #        
-        for i in range(len(getControllers)):
-            if (verbose):
-                print (getControllers[i])
-            # getCtlName
-            getCtlName = getControllers[i].get("name")
-            if (ControllerName == getCtlName):
-                #Loop through all key-value pairs of a nested dictionary
-                for dictPair in nested_dict_pairs_iterator(getControllers[i]):
-                    dictPairType = type(dictPair)
-                    lendictPair = len(dictPair)
-                    if (verbose):
-                        print ("dictPairType =", dictPairType)
-                        print("dictPair =", dictPair)
-                        print ("lendictPair =", lendictPair)
-                    wsColList = []
-                    wsFmtList = []
-                    # List Value?
-                    if (type(dictPair[-1]) == list):
-                        ListFound = True
-                        ListdictPair = dictPair[-1]
-                    else:
-                        ListFound = False
-                        ListdictPair = []
-                    if not (ListFound):
-                        wsCollList = []
-                        wsFmtList = []
-                        wsCol = 0
-                        iSTOP = lendictPair
-                        for i in range(iSTOP):
-                            if (i < iSTOP - 1): 
-                                wsColList.append(dictPair[i])
-                                wsFmtList.append("boldLeft")
-                            else:
-                                wsColList.append(dictPair[i])
-                                wsFmtList.append("strLeft")            
-                        # Output Worksheet Row
-                        wsOutputRow(worksheet, wsRow, wsCol, wsColList, wsFmtList, wbFmts, verbose)
-                        wsRow += 1
-                    else:
-                        wsCollList = []
-                        wsFmtList = []
-                        wsCol = 0                          
-                        iSTOP = lendictPair - 1      
-                        for i in range(iSTOP):
-                            wsColList.append(dictPair[i])
-                            wsFmtList.append("boldLeft")                          
-                        jSTOP = len(ListdictPair)
-                        for j in range(jSTOP):
-                            if (j < 1):
-                                wsColList.append(ListdictPair[j])
-                                wsFmtList.append("strLeft")
-                            else:    
-                                wsColList[-1] = (ListdictPair[j])
-                                wsFmtList[-1] = ("strLeft")        
-                            # Output Worksheet Row
-                            wsCol = 0
-                            wsOutputRow(worksheet, wsRow, wsCol, wsColList, wsFmtList, wbFmts, verbose)
-                            wsRow += 1
+        for getController in dgetControllers.get(ControllerName, []):
+            wsRow = wsOutputGetController(worksheet, wsRow, getController, wbFmts, verbose)
         # Autofit Controller Worksheet
-        worksheet.autofit()
+        if (combined):
+            pass
+        elif (streaming):
+            wsSetColumnWidths(worksheet, verbose)
+        else:
+            worksheet.autofit()
+    # Combined Worksheet Column Widths & Page Breaks
+    if (combined):
+        wsSetColumnWidths(worksheet, verbose)
+        worksheet.set_h_pagebreaks(wsPageBreak)
+
+    wbTime = time.perf_counter() - starttime
 
     if (verbose):
        print ("exportControllers: (999) *** End ***")
 
+    return(restTime, wbTime)
 
 #########################
 ### main              ###
@@ -557,6 +565,9 @@ def main():
     cli_parser.add_argument('-wbname', '--wbName', help = 'Excel Workbook Name - Optional', default = "DEFAULT",
         required = False)        
         
+    cli_parser.add_argument('-m', '--streaming', help = 'Streaming constant memory workbook, one combined worksheet above 100 controllers - Optional', action='store_true',
+        required = False)
+
     cli_parser.add_argument('-v', '--verbose', help = 'Verbose logging - Optional', action='store_true',
         required = False)
 
@@ -567,6 +578,7 @@ def main():
     closexlights = args.closexlights
     wbFmtsFileName = args.wbFmtsFileName
     wbName = args.wbName
+    streaming = args.streaming
     verbose = args.verbose
     
     ### Current Working Directory
@@ -584,12 +596,16 @@ def main():
     ### Get xLights Parms
     xlightsipaddress = xlightsparms.get("xlightsipaddress")
     xlightsport = xlightsparms.get("xlightsport")
-    # Replace xlightsport with real port value
-    if (xlightsport == "A"):
-        xlightsport = "49913"
-    elif (xlightsport == "B"):
-        xlightsport = "49914"
+    # Replace xlightsport with real port value (first port of a list)
+    xlightsport = getxLightsPorts(xlightsport)[0]
     xlightsprogram = xlightsparms.get("xlightsprogram")
+    xlightspoolsize = xlightsparms.get("xlightspoolsize", DEFAULT_POOL_SIZE)
+    xlightsmetricsfolder = xlightsparms.get("xlightsmetricsfolder")
+    # Init xLights REST API Session
+    initSession(xlightspoolsize, verbose)
+    # Write REST API Metrics at exit, only when xlightsparms.json has a metrics folder
+    if (xlightsmetricsfolder is not None):
+        startRequestMetrics(xlightsmetricsfolder, verbose)
     xlightsnetworksxmlfile = xlightsparms.get("xlightsnetworksxmlfile")
 
     ### Verbose Logging?
@@ -602,6 +618,7 @@ def main():
         print ("Close xLights = %s" % closexlights)
         print ("wbFmtsFileName = %s" % wbFmtsFileName)
         print ("wbName = %s" % wbName)
+        print ("streaming = %s" % streaming)
         print ("CWD = %s" % CWD)
         
 
@@ -620,7 +637,7 @@ def main():
         sys.exit(-1)
         
     # Verify Network XML File
-    xlightsnetworksxmlfull = xlightsshowfolder + "\\" + xlightsnetworksxmlfile
+    xlightsnetworksxmlfull = os.path.join(xlightsshowfolder, xlightsnetworksxmlfile)
     if not os.path.isfile(xlightsnetworksxmlfull):
         print("Error: xLights Networks XML File not found %s" % xlightsnetworksxmlfull)
         sys.exit(-1)
@@ -695,13 +712,15 @@ def main():
     else:
         workbookfile = wbName + ".xlsx"
     # Create Workbook
-    (workbook, wbFmts, wbHeaderImage) = createWorkbook(workbookfile, dwbFmts, verbose)
+    (workbook, wbFmts, wbHeaderImage) = createWorkbook(workbookfile, dwbFmts, streaming, verbose)
     
     # exportControllers
-    exportControllers(baseURL, xlightsshowfolder, xlightsnetworksxmlfull, workbook, wbFmts, wbHeaderImage, verbose)
+    (restTime, wbTime) = exportControllers(baseURL, xlightsshowfolder, xlightsnetworksxmlfull, workbook, wbFmts, wbHeaderImage, streaming, verbose)
    
     ### Close xLights?
-    if (closexlights):
+    if (closexlights) and (baseURL in supervisedURLs(verbose)):
+        print ("##### xLights %s left running for the xLights Supervisor" % baseURL)
+    elif (closexlights):
         request = baseURL + "closexLights"
         if (verbose):
             print("##### closexLights")
@@ -714,10 +733,17 @@ def main():
             sys.exit(ret_code)
    
     # Close Workbook
+    starttime = time.perf_counter()
     workbook.close()
+    wbTime = wbTime + time.perf_counter() - starttime
     #
     print ("*" * 50)
     print ("main: (900) Exported Controllers to Workbook: %s" % workbookfile)
+    print ("main: (910) REST API Time = %.3fs Workbook Time = %.3fs" % (restTime, wbTime))
+
+    # REST API Timings
+    if (verbose):
+        printRequestTimings()
 
     print ("*" * 50)
     print ("main: (999) *** Export Controllers End ***")
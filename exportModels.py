@@ -12,11 +12,9 @@
 
 import argparse
 import sys
-import subprocess
 import os
 import time
 import re
-import requests
 import json
 import datetime
 
@@ -24,6 +22,7 @@ import datetime
 # From Imports            #
 ###########################
 from pathlib import Path
+from xlclient import *
 
 ###############################
 # path_exists_case_sensitive  #
@@ -50,91 +49,6 @@ def path_exists_case_sensitive(path, verbose) -> bool:
             return False
         p = p.parent
 
-###############################
-# doRequestsGet               #
-###############################
-def doRequestsGet(request, timeout, verbose):
-
-    try:
-        r = requests.get(request, timeout=(timeout))
-        ret_code = 0
-        status_code = r.status_code
-        result = r.text
-
-    # HTTP Error?
-    except requests.exceptions.HTTPError as e:
-        ret_code = -1
-        status_code = ""
-        result = "##### Request HTTP Error: " + format(str(e))
-
-    # HTTP Connection Error?
-    except requests.exceptions.ConnectionError as e:
-        ret_code = -2
-        status_code = ""
-        result = "##### Request Connection Error: " + format(str(e))
-
-    # HTTP Timeout?
-    except requests.exceptions.Timeout as e:
-        ret_code = -3
-        status_code = ""
-        result = "##### Request Timeout Error: " + format(str(e))
-    
-    # HTTP Other?
-    except requests.exceptions.RequestException as e:
-        ret_code = -4
-        status_code = ""
-        result = "##### Request Exception Error: " + format(str(e))
-
-    return(ret_code, status_code, result)
-
-###############################
-# startxLights                #
-###############################
-
-def startxLights(baseURL, xlightsprogram, verbose):
-
-    # xLights Running?
-    request = baseURL + "getVersion"
-    if (verbose):
-        print ("##### Get Version")
-        print ("request=", request)
-    startloop = True
-    started = False
-    retryctr = 0
-    while (startloop):
-        (ret_code, status_code, result) = doRequestsGet(request, 30, verbose)
-        match ret_code:
-            # REST API Connection Successful
-            case 0:
-                startloop = False
-                if (verbose):
-                    print ("status_code = ", status_code)
-                    print ("result = ", result)
-            # REST API Connection Error?
-            case -2:
-                if (not started):
-                    # Start xLights
-                    cmd = "\"" + xlightsprogram + "\""
-                    if (verbose):
-                        print ("##### Start xLights")
-                        print ("cmd = ", cmd)
-                    try:
-                        cp = subprocess.Popen(cmd)
-                    except:
-                        sys.exit("*** Error in starting xLights %s" % sys.exc_info()[0])
-                
-                    started = True
-                    retryctr = retryctr + 1
-                    if (retryctr <= 10):
-                        time.sleep(3)
-                    else:
-                        startloop = False
-            # REST API Error?
-            case _:
-                startloop = False
-            
-    return(ret_code, status_code, result)
-
 ###############################
 # exportModels                #
 ###############################
@@ -220,12 +134,16 @@ def main():
     ### Get xLights Parms
     xlightsipaddress = xlightsparms.get("xlightsipaddress")
     xlightsport = xlightsparms.get("xlightsport")
-    # Replace xlightsport with real port value
-    if (xlightsport == "A"):
-        xlightsport = "49913"
-    elif (xlightsport == "B"):
-        xlightsport = "49914"
+    # Replace xlightsport with real port value (first port of a list)
+    xlightsport = getxLightsPorts(xlightsport)[0]
     xlightsprogram = xlightsparms.get("xlightsprogram")
+    xlightspoolsize = xlightsparms.get("xlightspoolsize", DEFAULT_POOL_SIZE)
+    xlightsmetricsfolder = xlightsparms.get("xlightsmetricsfolder")
+    # Init xLights REST API Session
+    initSession(xlightspoolsize, verbose)
+    # Write REST API Metrics at exit, only when xlightsparms.json has a metrics folder
+    if (xlightsmetricsfolder is not None):
+        startRequestMetrics(xlightsmetricsfolder, verbose)
 	    
     
     if (verbose):
@@ -302,7 +220,9 @@ def main():
     exportModels(baseURL, xlightsshowfolder, exportfolder, exportfile, verbose)
 
     ### Close xLights
-    if (closexlights):
+    if (closexlights) and (baseURL in supervisedURLs(verbose)):
+        print ("##### xLights %s left running for the xLights Supervisor" % baseURL)
+    elif (closexlights):
         request = baseURL + "closexLights"
         if (verbose):
             print("##### closexLights")
@@ -314,6 +234,10 @@ def main():
             print("result = ", result)
             sys.exit(ret_code)
 
+    # REST API Timings
+    if (verbose):
+        printRequestTimings()
+
     print ("#" *5 + " exportModels End")
 
 if __name__ == "__main__":
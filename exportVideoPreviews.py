@@ -12,20 +12,19 @@
 
 import argparse
 import sys
-import subprocess
 import os
 import time
 import re
-import requests
 import json
 
 ###########################
 # From Imports            #
 ###########################
 
-from functools import partial
-from tkinter import *
 from pathlib import Path
+from xlclient import *
+from seqindex import getSequenceList
+from xlselect import *
 
 ###############################
 # path_exists_case_sensitive  #
@@ -53,90 +52,25 @@ def path_exists_case_sensitive(path, verbose) -> bool:
         p = p.parent
         
 ###############################
-# doRequestsGet               #
+# exportVideoFile             #
 ###############################
 
-def doRequestsGet(request, timeout, verbose):
-
-    try:
-        r = requests.get(request, timeout=(timeout))
-        ret_code = 0
-        status_code = r.status_code
-        result = r.text
-
-    # HTTP Error?
-    except requests.exceptions.HTTPError as e:
-        ret_code = -1
-        status_code = ""
-        result = "##### Request HTTP Error: " + format(str(e))
-
-    # HTTP Connection Error?    
-    except requests.exceptions.ConnectionError as e:
-        ret_code = -2
-        status_code = ""
-        result = "##### Request Connection Error: " + format(str(e))
-
-    # HTTP Timeout?
-    except requests.exceptions.Timeout as e:
-        ret_code = -3
-        status_code = ""
-        result = "##### Request Timeout Error: " + format(str(e))
-    
-    # HTTP Other?
-    except requests.exceptions.RequestException as e:
-        ret_code = -4
-        status_code = ""
-        result = "##### Request Exception Error: " + format(str(e))
-
-    return(ret_code, status_code, result)
+def exportVideoFile(fullsequence, xlightsshowfolder, outputfolder):
 
-###############################
-# startxLights                #
-###############################
+    # Full Output Folder
+    if (outputfolder == "DEFAULT"):
+        outputfolder = xlightsshowfolder + "\\exportVideoPreview"
 
-def startxLights(baseURL, xlightsprogram, verbose):
+    # Output Folder does not exist?
+    outputfolder = os.path.abspath(outputfolder)
+    if not os.path.isdir(outputfolder):
+        # Make Output Folder
+        os.mkdir(outputfolder)
 
-    # xLights Running?
-    request = baseURL + "getVersion"
-    if (verbose):
-        print ("##### Get Version")
-        print ("request=", request)
-    startloop = True
-    started = False
-    retryctr = 0
-    while (startloop):
-        (ret_code, status_code, result) = doRequestsGet(request, 30, verbose)
-        match ret_code:
-            # REST API Connection Successful
-            case 0:
-                startloop = False
-                if (verbose):
-                    print ("status_code = ", status_code)
-                    print ("result = ", result)
-            # REST API Connection Error?
-            case -2:
-                if (not started):
-                    # Start xLights
-                    cmd = "\"" + xlightsprogram + "\""
-                    if (verbose):
-                        print ("##### Start xLights")
-                        print ("cmd = ", cmd)
-                    try:
-                        cp = subprocess.Popen(cmd)
-                    except:
-                        sys.exit("*** Error in starting xLights %s" % sys.exc_info()[0])
-                
-                    started = True
-                    retryctr = retryctr + 1
-                    if (retryctr <= 10):
-                        time.sleep(3)
-                    else:
-                        startloop = False
-            # REST API Error?
-            case _:
-                startloop = False
-            
-    return(ret_code, status_code, result)
+    # outputfile
+    sequence = os.path.basename(fullsequence).split('/')[-1]
+    outputfile = outputfolder + "\\" + re.sub(".xsq", ".mp4", sequence)
+    return(re.sub(" ", r"%20", outputfile))
 
 ###############################
 # exportVideoPreview          #
@@ -160,19 +94,8 @@ def exportVideoPreview(baseURL, fullsequence, xlightsshowfolder, outputfolder, v
         print ("status_code = ", status_code)
         print ("result = ", result)
         
-    # Full Output Folder
-    if (outputfolder == "DEFAULT"):
-        outputfolder = xlightsshowfolder + "\\exportVideoPreview"
-
-    # Output Folder does not exist?
-    outputfolder = os.path.abspath(outputfolder)
-    if not os.path.isdir(outputfolder):
-        # Make Output Folder
-        os.mkdir(outputfolder)
-
     # outputfile
-    outputfile = outputfolder + "\\" + re.sub(".xsq", ".mp4", sequence)
-    outputfile = re.sub(" ", r"%20", outputfile)
+    outputfile = exportVideoFile(fullsequence, xlightsshowfolder, outputfolder)
     # Export Video Preview
     request = baseURL + "exportVideoPreview?filename=" + outputfile 
     print ("##### Export Video Preview %s" % sequence)
@@ -207,32 +130,16 @@ def exportVideoPreview(baseURL, fullsequence, xlightsshowfolder, outputfolder, v
     return()
 
 ###############################
-# selectAll                   #
-###############################
-
-def selectAll(lb):
-    lb.select_set(0, END)
-
-###############################
-# clearAll                    #
-###############################
-
-def clearAll(lb):
-    lb.select_clear(0, END)
-###############################
 # selectSequences             #
 ###############################
 
-def selectSequences(window, listSEQ, baseURL, xlightsshowfolder, outputfolder, verbose):
+def selectSequences(SEQsel, baseURL, xlightsshowfolder, outputfolder, verbose):
     if (verbose):
-        print(listSEQ)
+        print(SEQsel)
         print(baseURL)
-    seqSel = listSEQ.curselection()
-    for i in seqSel:
-        fullsequence = str(listSEQ.get(i))
-        exportVideoPreview(baseURL, fullsequence, xlightsshowfolder, outputfolder, verbose)
-    # Close Window
-    window.quit()
+    for fullsequence in SEQsel:
+        with traceSpan(os.path.basename(fullsequence), "sequence", {"sequence": fullsequence}):
+            exportVideoPreview(baseURL, fullsequence, xlightsshowfolder, outputfolder, verbose)
 
 ###############################
 # main                        #
@@ -265,15 +172,22 @@ def main():
     cli_parser.add_argument('-c', '--closexlights' , help = 'Close xLights', action='store_true',
         required = False)
 
+    cli_parser.add_argument('-t', '--tracefile', help = 'Write a Chrome trace-event JSON timeline of the run', type = str, default = None,
+        required = False)
+
     cli_parser.add_argument('-v', '--verbose', help = 'Verbose Logging', action='store_true',
         required = False)
 
+    ### Selection Arguments
+    addSelectArguments(cli_parser)
+
     ### Get Arguments
     args = cli_parser.parse_args()
     
     xlightsshowfolder = os.path.abspath(args.xlightsshowfolder)
     outputfolder = args.outputfolder
     closexlights = args.closexlights
+    tracefile = args.tracefile
     verbose = args.verbose
 
     ### Current Working Directory
@@ -286,12 +200,16 @@ def main():
     ### Get xLights Parms
     xlightsipaddress = xlightsparms.get("xlightsipaddress")
     xlightsport = xlightsparms.get("xlightsport")
-    # Replace xlightsport with real port value
-    if (xlightsport == "A"):
-        xlightsport = "49913"
-    elif (xlightsport == "B"):
-        xlightsport = "49914"
+    # Replace xlightsport with real port value (first port of a list)
+    xlightsport = getxLightsPorts(xlightsport)[0]
     xlightsprogram = xlightsparms.get("xlightsprogram")
+    xlightspoolsize = xlightsparms.get("xlightspoolsize", DEFAULT_POOL_SIZE)
+    xlightsmetricsfolder = xlightsparms.get("xlightsmetricsfolder")
+    # Init xLights REST API Session
+    initSession(xlightspoolsize, verbose)
+    # Write REST API Metrics at exit, only when xlightsparms.json has a metrics folder
+    if (xlightsmetricsfolder is not None):
+        startRequestMetrics(xlightsmetricsfolder, verbose)
 
     if (verbose):
         print ("xLights Show Folder = %s" % xlightsshowfolder)
@@ -300,6 +218,11 @@ def main():
         print ("xLights Program = %s" % xlightsprogram)
         print ("Output Folder = %s" % outputfolder)
         print ("Close xLights = %s" % closexlights)
+        print ("Trace File = %s" % tracefile)
+
+    # Trace run -> sequence -> REST call spans
+    if (tracefile is not None):
+        startTrace(tracefile, "exportVideoPreviews", verbose)
     
     # Base URL
     baseURL = "http://" + xlightsipaddress + ":" + xlightsport + "/"
@@ -362,58 +285,21 @@ def main():
             print ("result = ", result)
 
     # Build Sequence List
-    SEQlist = []
-    ### OS Walk Show Folder Recursively
-    for root, dir, files in os.walk(xlightsshowfolder):
-        for file in files:
-            # xLights Sequence File?
-            if (file.endswith(".xsq")):
-                fullsequence = os.path.join(root, file)
-                found = fullsequence.find("Backup\\")
-                # xLights Sequence File not in the Backup folder?
-                if (found < 0):
-                    sequence = file
-                    if (verbose):
-                        print ("sequence = ", sequence)
-                        print ("fullsequence = ", fullsequence)
-                    SEQlist.append(fullsequence)
-
-    # Export Video Preview Selection Window
-    window = Tk()
-    window.title('Export Video Previews')
-    window.geometry("520x520")
-
-    Label(window, text="Select Sequences to Export Video Preview").pack()
-
-    frame = Frame(window)
-    frame.pack()
-
-    listSEQ = Listbox(frame, width=50, height=20, font=("Helvetica", 12), selectmode = "multiple")
-    listSEQ.pack(padx = 10, pady = 10, expand = YES, fill = "both")
-
-    # Vertical Scrollbar
-    scroll_V = Scrollbar(frame, orient="vertical")
-    scroll_V.config(command=listSEQ.yview)
-    scroll_V.pack(side="right", fill="y")
-    # Horizontal Scrollbar
-    scroll_H = Scrollbar(frame, orient="horizontal")
-    scroll_H.config(command=listSEQ.xview)
-    scroll_H.pack(side= BOTTOM, fill= "x")
-    # List Config
-    listSEQ.config(yscrollcommand=scroll_V.set, xscrollcommand=scroll_H.set)
-    # Load Sequence List
-    for i in range(len(SEQlist)):
-        listSEQ.insert(END, SEQlist[i])
-    
-    allButton = Button(window, text="Select ALL", command = partial(selectAll, listSEQ)).pack(side = LEFT, padx=10)
-    clearButton = Button(window, text="Clear All", command = partial(clearAll, listSEQ)).pack(side = LEFT, padx=10)
-    exportButton = Button(window, text="Export", command = lambda: selectSequences(window, listSEQ, baseURL, xlightsshowfolder, outputfolder, verbose)).pack(side = LEFT, padx=10)
-    cancelButton = Button(window, text="Cancel", command = window.destroy).pack(side = LEFT, padx=10)
+    SEQlist = getSequenceList(xlightsshowfolder, verbose)
 
-    window.mainloop()
+    # Sequence Selection, headless with --all/--select otherwise a selection window
+    if isHeadless(args):
+        SEQsel = selectMatching(SEQlist, [sequenceKeys(fullsequence, xlightsshowfolder) for fullsequence in SEQlist], args.all, args.select, verbose)
+    else:
+        SEQsel = selectListbox('Export Video Previews', "Select Sequences to Export Video Preview", "520x520", SEQlist, "Export", verbose)
+    # Selection Cancelled?
+    if (SEQsel is not None):
+        selectSequences(SEQsel, baseURL, xlightsshowfolder, outputfolder, verbose)
 
     ### Close xLights
-    if (closexlights):
+    if (closexlights) and (baseURL in supervisedURLs(verbose)):
+        print ("##### xLights %s left running for the xLights Supervisor" % baseURL)
+    elif (closexlights):
         request = baseURL + "closexLights"
         if (verbose):
             print("##### closexLights")
@@ -425,6 +311,10 @@ def main():
             print("result = ", result)
             sys.exit(ret_code)
 
+    # REST API Timings
+    if (verbose):
+        printRequestTimings()
+
     print ("#" *5 + " exportVideoPreviews End")
 
 if __name__ == "__main__":
@@ -0,0 +1,387 @@
+#!/usr/bin/env python
+
+# Name: genShowFolder.py
+# Purpose: Generate a synthetic xLights show folder for scale testing of the scripts
+# Author: Bill Jenkins
+# Version: v2.1
+# Date: 08/24/2023
+
+###############################
+# Imports                     #
+###############################
+
+import argparse
+import sys
+import os
+import json
+import math
+import random
+import shutil
+
+###############################
+# From Imports                #
+###############################
+
+from xml.sax.saxutils import escape, quoteattr
+
+###############################
+# Generator Globals           #
+###############################
+
+# Current show size, --scale multiplies the sequences, controllers & models
+BASE_SEQUENCES = 50
+BASE_CONTROLLERS = 10
+BASE_MODELS = 200
+
+# Media Folders, Effect Setting Key, Media File Name & Extension
+MEDIA_TYPES = [("Images", "E_FILEPICKER_Pictures_Filename", "image%s.png"),
+               ("Shaders", "E_0FILEPICKERCTRL_IFS", "shader%s.fs"),
+               ("Videos", "E_FILEPICKERCTRL_Video_Filename", "video%s.mp4")]
+
+# Effect names & settings without media, %s is replaced with a random value
+EFFECT_NAMES = ["Bars", "Butterfly", "Color Wash", "Fire", "Meteors", "On", "Pinwheel", "Shockwave", "Spirals", "Twinkle"]
+EFFECT_FILLERS = ["B_CHOICE_BufferStyle=Default", "B_CHOICE_BufferTransform=None", "C_BUTTON_Palette1=#FF0000",
+                  "C_CHECKBOX_Palette1=1", "E_SLIDER_Bars_BarCount=%s", "E_CHOICE_Bars_Direction=up",
+                  "E_CHECKBOX_Bars_Highlight=0", "T_CHOICE_LayerMethod=Normal", "T_SLIDER_EffectLayerMix=%s"]
+
+# Model DisplayAs, parm1 strings, parm2 nodes per string
+MODEL_TYPES = [("Arches", 1, 50), ("Candy Canes", 1, 25), ("Matrix", 16, 50), ("Single Line", 1, 100),
+               ("Star", 1, 100), ("Tree 360", 16, 50)]
+
+# Controller Vendor, Model, Protocol
+CONTROLLER_TYPES = [("Falcon", "F16V4", "E131"), ("FPP", "Pi Hat", "DDP"), ("HinksPix", "PRO V3", "E131"),
+                    ("Kulp", "K32A-B", "DDP")]
+
+# Channels per E1.31 universe
+UNIVERSE_CHANNELS = 510
+
+###############################
+# genModels                   #
+###############################
+
+def genModels(models, controllers, rnd):
+
+    # Models are spread round robin over the controllers, channels are packed per controller
+    modelList = []
+    controllerChannels = [0] * controllers
+    for i in range(models):
+        (displayAs, parm1, parm2) = rnd.choice(MODEL_TYPES)
+        controller = i % controllers
+        channels = parm1 * parm2 * 3
+        modelList.append({"name": "%s %s" % (displayAs, i + 1), "displayAs": displayAs, "parm1": parm1, "parm2": parm2,
+                          "controller": controller, "startChannel": controllerChannels[controller] + 1})
+        controllerChannels[controller] += channels
+
+    return(modelList, controllerChannels)
+
+###############################
+# writeNetworks               #
+###############################
+
+def writeNetworks(networksxmlfile, controllerChannels, verbose):
+
+    # Ethernet controllers sized to the models on them, IPs are unique 10.x.y.z addresses
+    controllerList = []
+    with open(networksxmlfile, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<Networks computer="genShowFolder">\n')
+        for (i, channels) in enumerate(controllerChannels):
+            (vendor, model, protocol) = CONTROLLER_TYPES[i % len(CONTROLLER_TYPES)]
+            name = "Controller %s" % (i + 1)
+            ip = "10.%s.%s.%s" % (50 + (i + 1) // 65536, ((i + 1) // 256) % 256, (i + 1) % 256)
+            controllerList.append({"name": name, "ip": ip})
+            f.write('  <Controller Name=%s Description="" Type="Ethernet" IP="%s" Protocol="%s" Vendor="%s" Model="%s" Variant="" Id="%s" Active="1" AutoSize="1">\n'
+                % (quoteattr(name), ip, protocol, vendor, model, i + 1))
+            channels = max(channels, 1)
+            if (protocol == "E131"):
+                for universe in range(math.ceil(channels / UNIVERSE_CHANNELS)):
+                    f.write('    <network NetworkType="E131" MaxChannels="%s" Universe="%s"/>\n' % (UNIVERSE_CHANNELS, universe + 1))
+            else:
+                f.write('    <network NetworkType="DDP" MaxChannels="%s"/>\n' % channels)
+            f.write('  </Controller>\n')
+        f.write('</Networks>\n')
+    if (verbose):
+        print ("Networks XML File = %s controllers = %s" % (networksxmlfile, len(controllerList)))
+
+    return(controllerList)
+
+###############################
+# writeRGBEffects             #
+###############################
+
+def writeRGBEffects(rgbeffectsxmlfile, modelList, controllerList, verbose):
+
+    with open(rgbeffectsxmlfile, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<xrgb>\n  <models>\n')
+        for model in modelList:
+            controller = controllerList[model["controller"]]["name"]
+            f.write('    <model name=%s DisplayAs="%s" StringType="RGB Nodes" parm1="%s" parm2="%s" parm3="1" Controller=%s StartChannel=%s/>\n'
+                % (quoteattr(model["name"]), model["displayAs"], model["parm1"], model["parm2"], quoteattr(controller),
+                   quoteattr("!%s:%s" % (controller, model["startChannel"]))))
+        f.write('  </models>\n  <modelGroups/>\n</xrgb>\n')
+    if (verbose):
+        print ("RGB Effects XML File = %s models = %s" % (rgbeffectsxmlfile, len(modelList)))
+
+    return()
+
+###############################
+# genMediaPool                #
+###############################
+
+def genMediaPool(mediafolder, poolsize, missing, rnd, verbose):
+
+    # Media files the effects pick from, a missing fraction is referenced but never written
+    mediaPool = []
+    written = 0
+    for (folder, key, filename) in MEDIA_TYPES:
+        os.makedirs(os.path.join(mediafolder, folder), exist_ok=True)
+        for i in range(poolsize):
+            fullmediafile = os.path.join(mediafolder, folder, filename % i)
+            if (rnd.random() >= missing):
+                with open(fullmediafile, "wb") as f:
+                    f.write(b"genShowFolder")
+                written += 1
+            mediaPool.append((key, fullmediafile))
+    if (verbose):
+        print ("Media Folder = %s referenced = %s written = %s" % (mediafolder, len(mediaPool), written))
+
+    return(mediaPool)
+
+###############################
+# writeSequence               #
+###############################
+
+def writeSequence(fullsequence, mediaFile, effects, mediarate, mediaPool, modelList, rnd):
+
+    # Written a line at a time so 1000x shows do not build the XML in memory
+    with open(fullsequence, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<xsequence BaseChannel="0" ChanCtrlBasic="0" ChanCtrlColor="0" FixedPointTiming="1" ModelBlending="true">\n')
+        f.write('  <head>\n    <version>2023.11</version>\n    <author>genShowFolder</author>\n')
+        if (mediaFile is None):
+            f.write('    <sequenceType>Animation</sequenceType>\n    <mediaFile/>\n')
+        else:
+            f.write('    <sequenceType>Media</sequenceType>\n    <mediaFile>%s</mediaFile>\n' % escape(mediaFile))
+        duration = rnd.randint(60, 300)
+        f.write('    <sequenceDuration>%s</sequenceDuration>\n    <imageDir/>\n  </head>\n' % duration)
+        f.write('  <nextid>%s</nextid>\n  <EffectDB>\n' % (effects + 1))
+        for i in range(effects):
+            settings = [rnd.choice(EFFECT_FILLERS).replace("%s", str(rnd.randint(0, 100))) for j in range(rnd.randint(4, 30))]
+            if (rnd.random() < mediarate):
+                (key, fullmediafile) = rnd.choice(mediaPool)
+                settings.insert(rnd.randint(0, len(settings)), "%s=%s" % (key, fullmediafile))
+            settings.append("T_CHOICE_In_Transition_Type=Fade")
+            f.write('    <Effect>%s</Effect>\n' % escape(",".join(settings)))
+        f.write('  </EffectDB>\n')
+        # Timeline, a sample of the models each with effects pointing into the EffectDB
+        elements = rnd.sample(modelList, min(len(modelList), 20))
+        f.write('  <DisplayElements>\n')
+        for model in elements:
+            f.write('    <Element collapsed="0" type="model" name=%s visible="1"/>\n' % quoteattr(model["name"]))
+        f.write('  </DisplayElements>\n  <ElementEffects>\n')
+        for model in elements:
+            f.write('    <Element type="model" name=%s>\n      <EffectLayer>\n' % quoteattr(model["name"]))
+            startTime = 0
+            for j in range(rnd.randint(1, 10)):
+                endTime = startTime + rnd.randint(500, 5000)
+                f.write('        <Effect ref="%s" name="%s" startTime="%s" endTime="%s" palette="0"/>\n'
+                    % (rnd.randrange(max(effects, 1)), rnd.choice(EFFECT_NAMES), startTime, endTime))
+                startTime = endTime
+            f.write('      </EffectLayer>\n    </Element>\n')
+        f.write('  </ElementEffects>\n</xsequence>\n')
+
+    return()
+
+###############################
+# genSequences                #
+###############################
+
+def genSequences(xlightsshowfolder, sequences, subfolders, effects, mediarate, missing, fseqbytes, mediaPool, modelList, rnd, verbose):
+
+    # Sequences go in the show folder and subfolders, like a show sorted by year
+    folders = [xlightsshowfolder] + [os.path.join(xlightsshowfolder, "Songs %s" % (2015 + i)) for i in range(subfolders)]
+    audiofolder = os.path.join(xlightsshowfolder, "Media", "Audio")
+    os.makedirs(audiofolder, exist_ok=True)
+    sequenceList = []
+    for i in range(sequences):
+        folder = folders[i % len(folders)]
+        os.makedirs(folder, exist_ok=True)
+        fullsequence = os.path.join(folder, "Sequence %05d.xsq" % (i + 1))
+        # Most sequences are Media sequences, a missing fraction of the audio files is never written
+        mediaFile = None
+        if (rnd.random() < 0.8):
+            mediaFile = os.path.join(audiofolder, "song%05d.mp3" % (i + 1))
+            if (rnd.random() >= missing):
+                with open(mediaFile, "wb") as f:
+                    f.write(b"ID3genShowFolder")
+        writeSequence(fullsequence, mediaFile, effects, mediarate, mediaPool, modelList, rnd)
+        if (fseqbytes > 0):
+            with open(fullsequence[:-4] + ".fseq", "wb") as f:
+                f.write(b"PSEQ" + rnd.randbytes(fseqbytes))
+        sequenceList.append(fullsequence)
+        if (verbose) and ((i + 1) % 1000 == 0):
+            print ("Sequences = %s" % (i + 1))
+
+    return(sequenceList)
+
+###############################
+# genBackups                  #
+###############################
+
+def genBackups(xlightsshowfolder, sequenceList, backups, verbose):
+
+    # xLights Backup folders hold dated copies of the show, the sequence walkers must skip them
+    copies = 0
+    for i in range(backups):
+        backupfolder = os.path.join(xlightsshowfolder, "Backup", "2023-%02d-%02d-0000" % (i // 28 + 1, i % 28 + 1))
+        for fullsequence in sequenceList:
+            relsequence = os.path.relpath(fullsequence, xlightsshowfolder)
+            fullbackup = os.path.join(backupfolder, relsequence)
+            os.makedirs(os.path.dirname(fullbackup), exist_ok=True)
+            shutil.copyfile(fullsequence, fullbackup)
+            copies += 1
+    if (verbose):
+        print ("Backup Folders = %s sequences = %s" % (backups, copies))
+
+    return()
+
+###############################
+# writeConfigs                #
+###############################
+
+def writeConfigs(configfolder, controllerList, verbose):
+
+    # uploadSequences & uploadFPPConfigs parms for every generated controller
+    uploadsequencesfile = os.path.join(configfolder, "uploadsequences.json")
+    with open(uploadsequencesfile, "w") as f:
+        json.dump({"controllers": [{"ip": controller["ip"], "media": "false", "format": "v2stdsparse"}
+                                   for controller in controllerList]}, f, indent=2)
+    uploadfppconfigsfile = os.path.join(configfolder, "uploadfppconfigs.json")
+    with open(uploadfppconfigsfile, "w") as f:
+        json.dump({"controllers": [{"ip": controller["ip"], "udp": "none", "models": "true", "map": "false"}
+                                   for controller in controllerList]}, f, indent=2)
+    if (verbose):
+        print ("Upload Sequences File = %s" % uploadsequencesfile)
+        print ("Upload FPP Configs File = %s" % uploadfppconfigsfile)
+
+    return()
+
+###############################
+# main                        #
+###############################
+
+def main():
+
+    print ("#" *5 + " genShowFolder Begin")
+
+    cli_parser = argparse.ArgumentParser(prog = 'genShowFolder',
+        description = '''%(prog)s is a tool to generate a synthetic xLights show folder for scale testing,''')
+
+    ### Define Arguments
+
+    cli_parser.add_argument('-s', '--xlightsshowfolder', help = 'Show Folder to generate, must not exist or be empty', type = str, default = None,
+        required = True)
+
+    cli_parser.add_argument('-x', '--scale', help = 'Multiply the current show size (%s sequences, %s controllers, %s models)'
+        % (BASE_SEQUENCES, BASE_CONTROLLERS, BASE_MODELS), type = float, default = 1.0,
+        required = False)
+
+    cli_parser.add_argument('-n', '--sequences', help = 'Number of sequences, overrides --scale', type = int, default = None,
+        required = False)
+
+    cli_parser.add_argument('-k', '--controllers', help = 'Number of controllers, overrides --scale', type = int, default = None,
+        required = False)
+
+    cli_parser.add_argument('-m', '--models', help = 'Number of models, overrides --scale', type = int, default = None,
+        required = False)
+
+    cli_parser.add_argument('-e', '--effects', help = 'EffectDB entries per sequence', type = int, default = 500,
+        required = False)
+
+    cli_parser.add_argument('--mediarate', help = 'Fraction of effects with a media reference', type = float, default = 0.25,
+        required = False)
+
+    cli_parser.add_argument('--missing', help = 'Fraction of media files referenced but not written', type = float, default = 0.05,
+        required = False)
+
+    cli_parser.add_argument('--mediapool', help = 'Media files per media type', type = int, default = 200,
+        required = False)
+
+    cli_parser.add_argument('-d', '--subfolders', help = 'Sequence subfolders', type = int, default = 4,
+        required = False)
+
+    cli_parser.add_argument('-b', '--backups', help = 'Backup folders with a copy of every sequence', type = int, default = 2,
+        required = False)
+
+    cli_parser.add_argument('--fseqbytes', help = 'Write an fseq of this many bytes per sequence, 0 for none', type = int, default = 4096,
+        required = False)
+
+    cli_parser.add_argument('-o', '--configfolder', help = 'Folder for uploadsequences.json & uploadfppconfigs.json, default is the show folder', type = str, default = None,
+        required = False)
+
+    cli_parser.add_argument('--seed', help = 'Random seed, the same seed generates the same show folder', type = int, default = 0,
+        required = False)
+
+    cli_parser.add_argument('-v', '--verbose', help = 'Verbose Logging', action='store_true',
+        required = False)
+
+    ### Get Arguments
+    args = cli_parser.parse_args()
+
+    xlightsshowfolder = os.path.abspath(args.xlightsshowfolder)
+    scale = args.scale
+    sequences = args.sequences if (args.sequences is not None) else max(1, round(BASE_SEQUENCES * scale))
+    controllers = args.controllers if (args.controllers is not None) else max(1, round(BASE_CONTROLLERS * scale))
+    models = args.models if (args.models is not None) else max(1, round(BASE_MODELS * scale))
+    effects = args.effects
+    mediarate = args.mediarate
+    missing = args.missing
+    mediapool = args.mediapool
+    subfolders = args.subfolders
+    backups = args.backups
+    fseqbytes = args.fseqbytes
+    configfolder = args.configfolder if (args.configfolder is not None) else xlightsshowfolder
+    seed = args.seed
+    verbose = args.verbose
+
+    if (verbose):
+        print ("Show Folder = %s" % xlightsshowfolder)
+        print ("Scale = %s" % scale)
+        print ("Sequences = %s" % sequences)
+        print ("Controllers = %s" % controllers)
+        print ("Models = %s" % models)
+        print ("Effects per Sequence = %s" % effects)
+        print ("Media Rate = %s" % mediarate)
+        print ("Missing Media = %s" % missing)
+        print ("Media Pool = %s" % mediapool)
+        print ("Subfolders = %s" % subfolders)
+        print ("Backups = %s" % backups)
+        print ("fseq Bytes = %s" % fseqbytes)
+        print ("Config Folder = %s" % configfolder)
+        print ("Seed = %s" % seed)
+
+    # Never generate over a real show folder
+    if os.path.isdir(xlightsshowfolder) and (len(os.listdir(xlightsshowfolder)) > 0):
+        print("Error: Show Folder is not empty %s" % xlightsshowfolder)
+        sys.exit(-1)
+    if (controllers < 1) or (models < 1) or (sequences < 0) or (effects < 0):
+        print("Error: controllers & models must be at least 1, sequences & effects at least 0")
+        sys.exit(-1)
+    os.makedirs(xlightsshowfolder, exist_ok=True)
+    os.makedirs(configfolder, exist_ok=True)
+
+    rnd = random.Random(seed)
+    (modelList, controllerChannels) = genModels(models, controllers, rnd)
+    controllerList = writeNetworks(os.path.join(xlightsshowfolder, "xlights_networks.xml"), controllerChannels, verbose)
+    writeRGBEffects(os.path.join(xlightsshowfolder, "xlights_rgbeffects.xml"), modelList, controllerList, verbose)
+    mediaPool = genMediaPool(os.path.join(xlightsshowfolder, "Media"), mediapool, missing, rnd, verbose)
+    sequenceList = genSequences(xlightsshowfolder, sequences, subfolders, effects, mediarate, missing, fseqbytes,
+                                mediaPool, modelList, rnd, verbose)
+    genBackups(xlightsshowfolder, sequenceList, backups, verbose)
+    writeConfigs(configfolder, controllerList, verbose)
+
+    print ("Show Folder %s sequences = %s controllers = %s models = %s" % (xlightsshowfolder, len(sequenceList),
+        len(controllerList), len(modelList)))
+
+    print ("#" *5 + " genShowFolder End")
+
+if __name__ == "__main__":
+    main()
@@ -12,19 +12,22 @@
 
 import argparse
 import sys
-import subprocess
 import os
 import time
 import re
-import requests
 import json
+import threading
+import queue
+import hashlib
 
 ###########################
 # From Imports            #
 ###########################
 from functools import partial
-from tkinter import *
 from pathlib import Path
+from xlclient import *
+from seqindex import getSequenceList
+from xlselect import *
 
 ##############################
 # path_exists_case_sensitive  #
@@ -51,92 +54,6 @@ def path_exists_case_sensitive(path, verbose) -> bool:
             return False
         p = p.parent
 
-###############################
-# doRequestsGet               #
-###############################
-
-def doRequestsGet(request, timeout, verbose):
-
-    try:
-        r = requests.get(request, timeout=(timeout))
-        ret_code = 0
-        status_code = r.status_code
-        result = r.text
-
-    # HTTP Error?
-    except requests.exceptions.HTTPError as e:
-        ret_code = -1
-        status_code = ""
-        result = "##### Request HTTP Error: " + format(str(e))
-
-    # HTTP Connection Error?
-    except requests.exceptions.ConnectionError as e:
-        ret_code = -2
-        status_code = ""
-        result = "##### Request Connection Error: " + format(str(e))
-
-    # HTTP Timeout?
-    except requests.exceptions.Timeout as e:
-        ret_code = -3
-        status_code = ""
-        result = "##### Request Timeout Error: " + format(str(e))
-    
-    # HTTP Other?
-    except requests.exceptions.RequestException as e:
-        ret_code = -4
-        status_code = ""
-        result = "##### Request Exception Error: " + format(str(e))
-
-    return(ret_code, status_code, result)
-
-###############################
-# startxLights                #
-###############################
-
-def startxLights(baseURL, xlightsprogram, verbose):
-
-    # xLights Running?
-    request = baseURL + "getVersion"
-    if (verbose):
-        print ("##### Get Version")
-        print ("request=", request)
-    startloop = True
-    started = False
-    retryctr = 0
-    while (startloop):
-        (ret_code, status_code, result) = doRequestsGet(request, 30, verbose)
-        match ret_code:
-            # REST API Connection Successful
-            case 0:
-                startloop = False
-                if (verbose):
-                    print ("status_code = ", status_code)
-                    print ("result = ", result)
-            # REST API Connection Error?
-            case -2:
-                if (not started):
-                    # Start xLights
-                    cmd = "\"" + xlightsprogram + "\""
-                    if (verbose):
-                        print ("##### Start xLights")
-                        print ("cmd = ", cmd)
-                    try:
-                        cp = subprocess.Popen(cmd)
-                    except:
-                        sys.exit("*** Error in starting xLights %s" % sys.exc_info()[0])
-                
-                    started = True
-                    retryctr = retryctr + 1
-                    if (retryctr <= 10):
-                        time.sleep(3)
-                    else:
-                        startloop = False
-            # REST API Error?
-            case _:
-                startloop = False
-            
-    return(ret_code, status_code, result)
-
 import urllib.parse
 
 ###############################
@@ -175,6 +92,8 @@ def createParamsStr(params_dict, verbose):
 
 def renderAll(baseURL, fullsequence, highdef, verbose):
 
+    # Rendered only when every call returns status 200, an HTTP error must not be recorded in the manifest
+    rendered = True
     # Open sequence
     sequence = os.path.basename(fullsequence).split('/')[-1]
     params_dict =  {"seq": fullsequence}
@@ -193,36 +112,47 @@ def renderAll(baseURL, fullsequence, highdef, verbose):
     if (verbose):
         print ("status_code = ", status_code)
         print ("result = ", result)
-    # Render ALL sequence
-    params_dict =  {"highdef": highdef}
-    fppparams = createParamsStr(params_dict, verbose)
-    request = baseURL + "renderAll/" + fppparams
-    print ("##### Render ALL sequence %s" % sequence)
-    print ("request = ", request)
-    (ret_code, status_code, result) = doRequestsGet(request, 900, verbose)
-    # Request Error?
-    if (ret_code < 0):
-        print("Unable to connect to xLights REST API %s" % baseURL)
-        print ("ret_code = ", ret_code)
-        print ("result = ", result) 
-        sys.exit(ret_code)
-    print ("status_code = ", status_code)
-    print ("result = ", result)
-    # Save sequence
-    request = baseURL + "saveSequence"
-    if (verbose):
-        print ("##### Save sequence %s" % sequence)
+    if (status_code != 200):
+        print ("*** Open sequence %s failed status_code = %s result = %s" % (sequence, status_code, result))
+        rendered = False
+    # Render ALL sequence, not when the open failed
+    if (rendered):
+        params_dict =  {"highdef": highdef}
+        fppparams = createParamsStr(params_dict, verbose)
+        request = baseURL + "renderAll/" + fppparams
+        print ("##### Render ALL sequence %s" % sequence)
         print ("request = ", request)
-    (ret_code, status_code, result) = doRequestsGet(request, 30, verbose)
-    # Request Error?
-    if (ret_code < 0):
-        print("Unable to connect to xLights REST API %s" % baseURL)
-        print ("ret_code = ", ret_code)
-        print ("result = ", result) 
-        sys.exit(ret_code)
-    if (verbose):
+        (ret_code, status_code, result) = doRequestsGet(request, 900, verbose)
+        # Request Error?
+        if (ret_code < 0):
+            print("Unable to connect to xLights REST API %s" % baseURL)
+            print ("ret_code = ", ret_code)
+            print ("result = ", result) 
+            sys.exit(ret_code)
         print ("status_code = ", status_code)
         print ("result = ", result)
+        if (status_code != 200):
+            print ("*** Render ALL sequence %s failed status_code = %s" % (sequence, status_code))
+            rendered = False
+    # Save sequence, not after a failed render
+    if (rendered):
+        request = baseURL + "saveSequence"
+        if (verbose):
+            print ("##### Save sequence %s" % sequence)
+            print ("request = ", request)
+        (ret_code, status_code, result) = doRequestsGet(request, 30, verbose)
+        # Request Error?
+        if (ret_code < 0):
+            print("Unable to connect to xLights REST API %s" % baseURL)
+            print ("ret_code = ", ret_code)
+            print ("result = ", result) 
+            sys.exit(ret_code)
+        if (verbose):
+            print ("status_code = ", status_code)
+            print ("result = ", result)
+        if (status_code != 200):
+            print ("*** Save sequence %s failed status_code = %s result = %s" % (sequence, status_code, result))
+            rendered = False
     # Close sequence
     request = baseURL + "closeSequence"
     if (verbose):
@@ -238,39 +168,318 @@ def renderAll(baseURL, fullsequence, highdef, verbose):
     if (verbose):
         print ("status_code = ", status_code)
         print ("result = ", result)
+    if (status_code != 200):
+        print ("*** Close sequence %s failed status_code = %s result = %s" % (sequence, status_code, result))
+        rendered = False
         
+    return(rendered)
+
+
+###############################
+# startShowFolder             #
+###############################
+
+def startShowFolder(baseURL, xlightsprogram, xlightsshowfolder, verbose):
+
+    # Start xLights
+    (ret_code, status_code, result) = startxLights(baseURL, xlightsprogram, verbose)
+    # xLights Start Error?
+    if (ret_code < 0):
+        print("Unable to connect to xLights REST API %s" % baseURL)
+        print ("ret_code = ", ret_code)
+        print ("result = ", result)
+        sys.exit(ret_code)    
+    
+    # Get Current Show Folder
+    request = baseURL + "getShowFolder"
+    if (verbose):
+        print ("##### Get Show Folder")
+        print ("request = ", request)    
+    (ret_code, status_code, result) = doRequestsGet(request, 30, verbose)
+    if (ret_code < 0):    
+        print("Unable to connect to xLights REST API %s" % baseURL)
+        print ("ret_code = ", ret_code)
+        print ("result = ", result)
+        sys.exit(-1)
+    if (verbose):
+        print ("status_code = ", status_code)
+        print ("result = ", result)
+    getshowfolder = os.path.abspath(result)
+    # Change Show Folder?
+    if (xlightsshowfolder != getshowfolder):
+        request = baseURL + "changeShowFolder?folder=" + re.sub(" ", r"%20", xlightsshowfolder)    
+        if (verbose):
+            print ("##### Change Show Folder")
+            print ("request = ", request)    
+        (ret_code, status_code, result) = doRequestsGet(request, 30, verbose)
+        if (ret_code < 0):    
+            print("Unable to connect to xLights REST API %s" % baseURL)
+            print ("ret_code = ", ret_code)
+            print ("result = ", result)
+            sys.exit(-1)
+        if (verbose):
+            print ("status_code = ", status_code)
+            print ("result = ", result)
+
     return()
 
+###############################
+# Render Manifest             #
+###############################
+
+# Render Manifest File in the Show Folder
+RENDER_MANIFEST = "renderAll_manifest.json"
+# Rendered sequences recorded between manifest saves, the rest are saved at the end of the run
+RENDER_SAVE_EVERY = 10
+
+###############################
+# fileSignature               #
+###############################
+
+def fileSignature(filename, cached):
+
+    # File Missing?
+    if not os.path.isfile(filename):
+        return(None)
+    st = os.stat(filename)
+    # Size & Modified Time unchanged? Reuse cached content hash
+    if (cached is not None) and (cached.get("size") == st.st_size) and (cached.get("mtime") == st.st_mtime_ns):
+        return(cached)
+    # Content Hash
+    sha = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for chunk in iter(partial(f.read, 1024 * 1024), b""):
+            sha.update(chunk)
+    return({"hash": sha.hexdigest(), "size": st.st_size, "mtime": st.st_mtime_ns})
 
 ###############################
-# selectAll                   #
+# loadRenderManifest          #
 ###############################
 
-def selectAll(lb):
-    lb.select_set(0, END)
+def loadRenderManifest(xlightsshowfolder, layoutfiles, highdef, verbose):
+
+    manifestfile = os.path.join(xlightsshowfolder, RENDER_MANIFEST)
+    sequences = {}
+    layout = {}
+    if os.path.isfile(manifestfile):
+        try:
+            with open(manifestfile, "r") as f:
+                d1 = json.load(f)
+            sequences = d1.get("sequences", {})
+            layout = d1.get("layout", {})
+        except (OSError, ValueError) as e:
+            print ("*** Render manifest %s ignored: %s" % (manifestfile, e))
+
+    # Layout File Content Hashes
+    layouthashes = {}
+    for layoutfile in layoutfiles:
+        sig = fileSignature(os.path.join(xlightsshowfolder, layoutfile), layout.get(layoutfile))
+        layout[layoutfile] = sig
+        layouthashes[layoutfile] = None if sig is None else sig["hash"]
+    if (verbose):
+        print ("Render Manifest = %s" % manifestfile)
+        print ("Layout Hashes = %s" % layouthashes)
+
+    return({"file": manifestfile, "lock": threading.Lock(), "layout": layout, "unsaved": 0,
+            "layouthashes": layouthashes, "highdef": highdef, "sequences": sequences})
 
 ###############################
-# clearAll                    #
+# saveRenderManifest          #
 ###############################
 
-def clearAll(lb):
-    lb.select_clear(0, END)
+def saveRenderManifest(manifest):
+
+    # Called with the manifest lock held
+    # Write to a temporary file first so an interrupted run keeps the old manifest
+    tmpfile = manifest["file"] + ".tmp"
+    with open(tmpfile, "w") as f:
+        json.dump({"layout": manifest["layout"], "sequences": manifest["sequences"]}, f, indent=2)
+    os.replace(tmpfile, manifest["file"])
+    manifest["unsaved"] = 0
+
+###############################
+# flushRenderManifest         #
+###############################
+
+def flushRenderManifest(manifest):
+
+    # Save the sequences recorded since the last save
+    with manifest["lock"]:
+        if (manifest["unsaved"] > 0):
+            saveRenderManifest(manifest)
+
+    return()
+
+###############################
+# fseqFileName                #
+###############################
+
+def fseqFileName(fullsequence):
+
+    return(os.path.splitext(fullsequence)[0] + ".fseq")
+
+###############################
+# renderUnchanged             #
+###############################
+
+def renderUnchanged(manifest, fullsequence, verbose):
+
+    entry = manifest["sequences"].get(fullsequence)
+    if (entry is None):
+        return(False)
+    # Layout or High Definition changed?
+    if (entry.get("layout") != manifest["layouthashes"]) or (entry.get("highdef") != manifest["highdef"]):
+        return(False)
+    # Sequence changed?
+    xsq = fileSignature(fullsequence, entry.get("xsq"))
+    if (xsq is None) or (entry.get("xsq") is None) or (xsq["hash"] != entry["xsq"]["hash"]):
+        return(False)
+    # Rendered fseq missing or changed?
+    fseq = fileSignature(fseqFileName(fullsequence), entry.get("fseq"))
+    if (fseq is None) or (entry.get("fseq") is None) or (fseq["hash"] != entry["fseq"]["hash"]):
+        return(False)
+    if (verbose):
+        print ("Unchanged sequence %s xsq=%s fseq=%s" % (fullsequence, xsq["hash"], fseq["hash"]))
+
+    return(True)
+
+###############################
+# recordRender                #
+###############################
+
+def recordRender(manifest, fullsequence):
+
+    # Hash after saveSequence, which rewrites the xsq
+    xsq = fileSignature(fullsequence, None)
+    fseq = fileSignature(fseqFileName(fullsequence), None)
+    with manifest["lock"]:
+        manifest["sequences"][fullsequence] = {"xsq": xsq, "fseq": fseq,
+            "layout": manifest["layouthashes"], "highdef": manifest["highdef"]}
+        # Save every RENDER_SAVE_EVERY sequences rather than rewriting the manifest after each one
+        manifest["unsaved"] += 1
+        if (manifest["unsaved"] >= RENDER_SAVE_EVERY):
+            saveRenderManifest(manifest)
+
+    return()
+
+###############################
+# renderWorker                #
+###############################
+
+def renderWorker(baseURL, seqQueue, highdef, manifest, stats, verbose):
+
+    # Take sequences from the shared queue until it is empty
+    while True:
+        try:
+            fullsequence = seqQueue.get_nowait()
+        except queue.Empty:
+            break
+        starttime = time.perf_counter()
+        try:
+            with traceSpan(os.path.basename(fullsequence), "sequence", {"sequence": fullsequence, "baseURL": baseURL}):
+                rendered = renderAll(baseURL, fullsequence, highdef, verbose)
+        except SystemExit as e:
+            # Request Error? Stop using this instance and hand the sequence back to the other instances, not a failed render
+            stats["requeued"] += 1
+            stats["busy"] += time.perf_counter() - starttime
+            print ("*** Render failed on xLights instance %s for sequence %s ret_code = %s" % (baseURL, fullsequence, e.code))
+            seqQueue.put(fullsequence)
+            break
+        stats["busy"] += time.perf_counter() - starttime
+        # HTTP Error? The instance still answers, keep it and leave the sequence out of the manifest
+        if not (rendered):
+            stats["failed"].append(fullsequence)
+            print ("*** Render failed on xLights instance %s for sequence %s" % (baseURL, fullsequence))
+            continue
+        recordRender(manifest, fullsequence)
+        stats["rendered"] += 1
+
+    return()
+
+###############################
+# renderPool                  #
+###############################
+
+def renderPool(baseURLList, SEQsel, highdef, manifest, verbose):
+
+    # Shared Sequence Queue
+    seqQueue = queue.Queue()
+    for fullsequence in SEQsel:
+        seqQueue.put(fullsequence)
+
+    # One worker thread per xLights instance
+    statsList = []
+    threads = []
+    starttime = time.perf_counter()
+    for baseURL in baseURLList:
+        stats = {"baseURL": baseURL, "rendered": 0, "failed": [], "requeued": 0, "busy": 0.0}
+        statsList.append(stats)
+        thread = threading.Thread(target=renderWorker, args=(baseURL, seqQueue, highdef, manifest, stats, verbose), name=baseURL)
+        threads.append(thread)
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - starttime
+
+    # Per Instance Throughput
+    print ("##### Render Pool Throughput")
+    totalrendered = 0
+    for stats in statsList:
+        totalrendered += stats["rendered"]
+        if (stats["busy"] > 0):
+            rate = stats["rendered"] * 60 / stats["busy"]
+        else:
+            rate = 0.0
+        print ("Instance %s rendered=%s failed=%s requeued=%s busy=%.1fs sequences/min=%.2f" % (stats["baseURL"], stats["rendered"], len(stats["failed"]),
+            stats["requeued"], stats["busy"], rate))
+        for fullsequence in stats["failed"]:
+            print ("   Failed: %s" % fullsequence)
+    if (elapsed > 0):
+        print ("Total rendered=%s of %s elapsed=%.1fs sequences/min=%.2f" % (totalrendered, len(SEQsel), elapsed, totalrendered * 60 / elapsed))
+    # Sequences left when every instance failed
+    while not seqQueue.empty():
+        print ("   Not Rendered: %s" % seqQueue.get_nowait())
+
+    return()
 
 ###############################
 # selectSequences             #
 ###############################
 
-def selectSequences(window, listSEQ, baseURL, xlightsshowfolder, highdef  , verbose):
+def selectSequences(SEQsel, baseURLList, xlightsshowfolder, highdef, manifest, force, verbose):
     if (verbose):
-        print(listSEQ)
-        print(baseURL)
-    seqSel = listSEQ.curselection()
-    for i in seqSel:
-        fullsequence = str(listSEQ.get(i))
-        # Package Sequence
-        renderAll(baseURL, fullsequence, highdef, verbose) 
-    # Close Window
-    window.quit()
+        print(SEQsel)
+        print(baseURLList)
+    SEQrender = []
+    skipped = 0
+    for fullsequence in SEQsel:
+        # Sequence, layout, highdef and fseq unchanged since the last render?
+        if (not force) and renderUnchanged(manifest, fullsequence, verbose):
+            print ("##### Skip unchanged sequence %s" % fullsequence)
+            skipped += 1
+        else:
+            SEQrender.append(fullsequence)
+    print ("##### Render %s sequences, %s unchanged skipped" % (len(SEQrender), skipped))
+    # Rendered sequences are saved to the manifest even when a request error ends the run
+    try:
+        # Worker Pool across xLights instances?
+        if (len(baseURLList) > 1):
+            renderPool(baseURLList, SEQrender, highdef, manifest, verbose)
+        else:
+            failed = []
+            for fullsequence in SEQrender:
+                # Render All Sequence
+                with traceSpan(os.path.basename(fullsequence), "sequence", {"sequence": fullsequence, "baseURL": baseURLList[0]}):
+                    rendered = renderAll(baseURLList[0], fullsequence, highdef, verbose)
+                if (rendered):
+                    recordRender(manifest, fullsequence)
+                else:
+                    failed.append(fullsequence)
+            # Failed sequences are rendered again on the next run
+            for fullsequence in failed:
+                print ("   Failed: %s" % fullsequence)
+    finally:
+        flushRenderManifest(manifest)
 ###############################
 # main                        #
 ###############################
@@ -290,18 +499,33 @@ def main():
     cli_parser.add_argument('-d', '--highdef', help = 'High Definition', default = "true", choices = ["true", "false"],
         required = False)
 
+    cli_parser.add_argument('-j', '--instances', help = 'Number of xLights instances to render with', type = int, default = 1,
+        required = False)
+
+    cli_parser.add_argument('-f', '--force', help = 'Render unchanged sequences', action='store_true',
+        required = False)
+
     cli_parser.add_argument('-c', '--closexlights' , help = 'Close xLights', action='store_true',
         required = False)
 
+    cli_parser.add_argument('-t', '--tracefile', help = 'Write a Chrome trace-event JSON timeline of the run', type = str, default = None,
+        required = False)
+
     cli_parser.add_argument('-v', '--verbose', help = 'Verbose Logging', action='store_true',
         required = False)
 
+    ### Selection Arguments
+    addSelectArguments(cli_parser)
+
     ### Get Arguments
     args = cli_parser.parse_args()
     
     xlightsshowfolder = os.path.abspath(args.xlightsshowfolder)
     highdef = args.highdef
+    instances = args.instances
+    force = args.force
     closexlights = args.closexlights
+    tracefile = args.tracefile
     verbose = args.verbose
 
     ### Current Working Directory
@@ -314,12 +538,21 @@ def main():
     ### Get xLights Parms
     xlightsipaddress = xlightsparms.get("xlightsipaddress")
     xlightsport = xlightsparms.get("xlightsport")
-    # Replace xlightsport with real port value
-    if (xlightsport == "A"):
-        xlightsport = "49913"
-    elif (xlightsport == "B"):
-        xlightsport = "49914"
+    # Replace xlightsport with real port values, one per xLights instance
+    xlightsports = getxLightsPorts(xlightsport)
+    xlightsport = xlightsports[0]
     xlightsprogram = xlightsparms.get("xlightsprogram")	
+    xlightsnetworksxmlfile = xlightsparms.get("xlightsnetworksxmlfile")
+    xlightsrgbeffectsxmlfile = xlightsparms.get("xlightsrgbeffectsxmlFile")
+    xlightspoolsize = xlightsparms.get("xlightspoolsize", DEFAULT_POOL_SIZE)
+    xlightsmetricsfolder = xlightsparms.get("xlightsmetricsfolder")
+    # Init xLights REST API Session, at least one connection per instance
+    if (instances < 1):
+        instances = 1
+    initSession(max(int(xlightspoolsize), instances), verbose)
+    # Write REST API Metrics at exit, only when xlightsparms.json has a metrics folder
+    if (xlightsmetricsfolder is not None):
+        startRequestMetrics(xlightsmetricsfolder, verbose)
 
     if (verbose):
         print ("xLights Show Folder = %s" % xlightsshowfolder)
@@ -327,7 +560,14 @@ def main():
         print ("xLights Port = %s" % xlightsport)
         print ("xLights Program = %s" % xlightsprogram)
         print ("High Definition = %s" % highdef)
+        print ("xLights Instances = %s" % instances)
+        print ("Force Render = %s" % force)
         print ("Close xLights = %s" % closexlights)
+        print ("Trace File = %s" % tracefile)
+
+    # Trace run -> sequence -> REST call spans
+    if (tracefile is not None):
+        startTrace(tracefile, "renderAll", verbose)
  
     # Base URL
     baseURL = "http://" + xlightsipaddress + ":" + xlightsport + "/"
@@ -349,113 +589,63 @@ def main():
         print("Error: xLights Program File not found %s" % xlightsprogram)
         sys.exit(-1)
 
-    # Start xLights
-    (ret_code, status_code, result) = startxLights(baseURL, xlightsprogram, verbose)
-    # xLights Start Error?
-    if (ret_code < 0):
-        print("Unable to connect to xLights REST API %s" % baseURL)
-        print ("ret_code = ", ret_code)
-        print ("result = ", result)
-        sys.exit(ret_code)    
-    
-    # Get Current Show Folder
-    request = baseURL + "getShowFolder"
-    if (verbose):
-        print ("##### Get Show Folder")
-        print ("request = ", request)    
-    (ret_code, status_code, result) = doRequestsGet(request, 30, verbose)
-    if (ret_code < 0):    
-        print("Unable to connect to xLights REST API %s" % baseURL)
-        print ("ret_code = ", ret_code)
-        print ("result = ", result)
+    # xLights Instance Base URLs
+    if (instances > len(xlightsports)):
+        print("Error: %s xLights instances requested but only %s xLights ports defined" % (instances, len(xlightsports)))
         sys.exit(-1)
+    baseURLList = []
+    for port in xlightsports[0:instances]:
+        baseURLList.append("http://" + xlightsipaddress + ":" + port + "/")
     if (verbose):
-        print ("status_code = ", status_code)
-        print ("result = ", result)
-    getshowfolder = os.path.abspath(result)
-    # Change Show Folder?
-    if (xlightsshowfolder != getshowfolder):
-        request = baseURL + "changeShowFolder?folder=" + re.sub(" ", r"%20", xlightsshowfolder)    
-        if (verbose):
-            print ("##### Change Show Folder")
-            print ("request = ", request)    
-        (ret_code, status_code, result) = doRequestsGet(request, 30, verbose)
-        if (ret_code < 0):    
-            print("Unable to connect to xLights REST API %s" % baseURL)
-            print ("ret_code = ", ret_code)
-            print ("result = ", result)
+        print ("xLights Instance Base URLs = %s" % baseURLList)
+
+    # xLights Instances that can be started or are running
+    if (len(baseURLList) > 1):
+        errors = verifyInstancePorts(baseURLList, verbose)
+        for error in errors:
+            print("Error: %s" % error)
+        if (len(errors) > 0):
             sys.exit(-1)
-        if (verbose):
-            print ("status_code = ", status_code)
-            print ("result = ", result)
-            
 
-    # Build Sequence List
-    SEQlist = []
-    ### OS Walk Show Folder Recursively
-    for root, dir, files in os.walk(xlightsshowfolder):
-        for file in files:
-            # xLights Sequence File?
-            if (file.endswith(".xsq")):
-                fullsequence = os.path.join(root, file)
-                found = fullsequence.find("Backup\\")
-                # xLights Sequence File not in the Backup folder?
-                if (found < 0):
-                    sequence = file
-                    if (verbose):
-                        print ("sequence = ", sequence)
-                        print ("fullsequence = ", fullsequence)
-                    SEQlist.append(fullsequence)
-
-    # Export Video Preview Selection Window
-    window = Tk()
-    window.title('Sequence Render All')
-    window.geometry("520x520")
-
-    Label(window, text="Select Sequences to Render All").pack()
-
-    frame = Frame(window)
-    frame.pack()
-
-    listSEQ = Listbox(frame, width=50, height=20, font=("Helvetica", 12), selectmode = "multiple")
-    listSEQ.pack(padx = 10, pady = 10, expand = YES, fill = "both")
-
-    # Vertical Scrollbar
-    scroll_V = Scrollbar(frame, orient="vertical")
-    scroll_V.config(command=listSEQ.yview)
-    scroll_V.pack(side="right", fill="y")
-    # Horizontal Scrollbar
-    scroll_H = Scrollbar(frame, orient="horizontal")
-    scroll_H.config(command=listSEQ.xview)
-    scroll_H.pack(side= BOTTOM, fill= "x")
-    # List Config
-    listSEQ.config(yscrollcommand=scroll_V.set, xscrollcommand=scroll_H.set)
-    
+    # Start xLights & Change Show Folder on each instance
+    for instanceURL in baseURLList:
+        startShowFolder(instanceURL, xlightsprogram, xlightsshowfolder, verbose)
 
-    
-    # Load Sequence List
-    for i in range(len(SEQlist)):
-        listSEQ.insert(END, SEQlist[i])
-    
-    allButton = Button(window, text="Select ALL", command = partial(selectAll, listSEQ)).pack(side = LEFT, padx=10)
-    clearButton = Button(window, text="Clear All", command = partial(clearAll, listSEQ)).pack(side = LEFT, padx=10)
-    renderButton = Button(window, text="Render All", command = lambda: selectSequences(window, listSEQ, baseURL, xlightsshowfolder, highdef  , verbose)).pack(side = LEFT, padx=10)
-    cancelButton = Button(window, text="Cancel", command = window.destroy).pack(side = LEFT, padx=10)
+    # Load Render Manifest
+    manifest = loadRenderManifest(xlightsshowfolder, [xlightsnetworksxmlfile, xlightsrgbeffectsxmlfile], highdef, verbose)
 
-    window.mainloop()
+    # Build Sequence List
+    SEQlist = getSequenceList(xlightsshowfolder, verbose)
+
+    # Sequence Selection, headless with --all/--select otherwise a selection window
+    if isHeadless(args):
+        SEQsel = selectMatching(SEQlist, [sequenceKeys(fullsequence, xlightsshowfolder) for fullsequence in SEQlist], args.all, args.select, verbose)
+    else:
+        SEQsel = selectListbox('Sequence Render All', "Select Sequences to Render All", "520x520", SEQlist, "Render All", verbose)
+    # Selection Cancelled?
+    if (SEQsel is not None):
+        selectSequences(SEQsel, baseURLList, xlightsshowfolder, highdef, manifest, force, verbose)
     ### Close xLights
     if (closexlights):
-        request = baseURL + "closexLights"
-        if (verbose):
-            print("##### closexLights")
-            print("request = ", request)
-        (ret_code, status_code, result) = doRequestsGet(request, 30, verbose)
-        if (ret_code < 0):
-            print("Unable to close xLights %s" % baseURL)
-            print("ret_code = ", ret_code)
-            print("result = ", result)
-            sys.exit(ret_code)
+        for instanceURL in baseURLList:
+            if instanceURL in supervisedURLs(verbose):
+                print ("##### xLights %s left running for the xLights Supervisor" % instanceURL)
+                continue
+            request = instanceURL + "closexLights"
+            if (verbose):
+                print("##### closexLights")
+                print("request = ", request)
+            (ret_code, status_code, result) = doRequestsGet(request, 30, verbose)
+            if (ret_code < 0):
+                print("Unable to close xLights %s" % instanceURL)
+                print("ret_code = ", ret_code)
+                print("result = ", result)
+                sys.exit(ret_code)
     
+    # REST API Timings
+    if (verbose):
+        printRequestTimings()
+
     print ("#" *5 + " renderAll End")
 if __name__ == "__main__":
     main()
\ No newline at end of file
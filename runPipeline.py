@@ -0,0 +1,352 @@
+#!/usr/bin/env python
+
+# Name: runPipeline.py
+# Purpose: Run cleanup, render, export, package, check and upload steps on selected sequences in one xLights session
+# Author: Bill Jenkins
+# Version: v2.1
+# Date: 08/24/2023
+
+###############################
+# Imports                     #
+###############################
+
+import argparse
+import sys
+import os
+import time
+import json
+
+###############################
+# From Imports                #
+###############################
+
+from xlclient import *
+from seqindex import getSequenceList
+from xlselect import *
+from renderAll import path_exists_case_sensitive, createParamsStr, startShowFolder, loadRenderManifest, renderUnchanged, recordRender, flushRenderManifest
+from checkSequences import checkSequence, loadCheckCache, flushCheckCache
+from exportVideoPreviews import exportVideoFile
+from uploadSequences import loadUploadParms, loadUploadManifest, uploadPool
+
+###############################
+# Pipeline Globals            #
+###############################
+
+# Pipeline Steps in run order when none are given
+PIPELINE_STEPS = ["cleanup", "render", "export", "package", "check", "upload"]
+# Steps run against the open sequence
+OPEN_STEPS = ["cleanup", "render", "export", "package"]
+# Steps that change the sequence and need a saveSequence
+SAVE_STEPS = ["cleanup", "render"]
+
+###############################
+# pipelineRequest             #
+###############################
+
+def pipelineRequest(baseURL, request, timeout, title, verbose):
+
+    if (verbose):
+        print ("##### %s" % title)
+        print ("request = ", request)
+    (ret_code, status_code, result) = doRequestsGet(request, timeout, verbose)
+    # Request Error?
+    if (ret_code < 0):
+        print("Unable to connect to xLights REST API %s" % baseURL)
+        print ("ret_code = ", ret_code)
+        print ("result = ", result)
+        sys.exit(ret_code)
+    if (verbose):
+        print ("status_code = ", status_code)
+        print ("result = ", result)
+    if (status_code != 200):
+        print ("*** %s failed status_code = %s result = %s" % (title, status_code, result))
+
+    return(status_code, result)
+
+###############################
+# pipelineSequence            #
+###############################
+
+def pipelineSequence(baseURL, fullsequence, xlightsshowfolder, steps, highdef, exportfolder, checkfolder, manifest, checkcache, force, verbose):
+
+    sequence = os.path.basename(fullsequence).split('/')[-1]
+    print ("##### Pipeline Sequence %s" % sequence)
+
+    # Steps against the open sequence, render skipped when unchanged since the last render
+    opensteps = [step for step in steps if step in OPEN_STEPS]
+    if ("render" in opensteps) and ("cleanup" not in opensteps) and (not force) and renderUnchanged(manifest, fullsequence, verbose):
+        print ("##### Skip render of unchanged sequence %s" % sequence)
+        opensteps.remove("render")
+
+    # Open sequence once for all steps
+    if (len(opensteps) > 0):
+        params_dict =  {"seq": fullsequence}
+        fppparams = createParamsStr(params_dict, verbose)
+        (status_code, result) = pipelineRequest(baseURL, baseURL + "openSequence/" + fppparams, 300, "Open Sequence %s" % sequence, verbose)
+        # Render recorded only when open, render, save and close all return status 200
+        rendered = (status_code == 200)
+        # Open failed? No steps and no save against whatever is open
+        if (status_code != 200):
+            opensteps = []
+
+        for step in opensteps:
+            if (step == "cleanup"):
+                # Clean Up File Locations
+                (status_code, result) = pipelineRequest(baseURL, baseURL + "cleanupFileLocations", 900, "Clean Up File Locations %s" % sequence, verbose)
+            elif (step == "render"):
+                # Render ALL sequence
+                params_dict =  {"highdef": highdef}
+                fppparams = createParamsStr(params_dict, verbose)
+                (status_code, result) = pipelineRequest(baseURL, baseURL + "renderAll/" + fppparams, 900, "Render ALL sequence %s" % sequence, verbose)
+                rendered = rendered and (status_code == 200)
+            elif (step == "export"):
+                # Export Video Preview
+                outputfile = exportVideoFile(fullsequence, xlightsshowfolder, exportfolder)
+                (status_code, result) = pipelineRequest(baseURL, baseURL + "exportVideoPreview?filename=" + outputfile, 900, "Export Video Preview %s" % sequence, verbose)
+            elif (step == "package"):
+                # Package Sequence
+                (status_code, result) = pipelineRequest(baseURL, baseURL + "packageSequence", 900, "Package Sequence %s" % sequence, verbose)
+            print ("%s %s result = %s" % (step, sequence, result))
+
+        # Save sequence once after the steps that change it
+        if any(step in SAVE_STEPS for step in opensteps):
+            (status_code, result) = pipelineRequest(baseURL, baseURL + "saveSequence", 30, "Save sequence %s" % sequence, verbose)
+            rendered = rendered and (status_code == 200)
+        # Close sequence
+        (status_code, result) = pipelineRequest(baseURL, baseURL + "closeSequence", 300, "Close sequence %s" % sequence, verbose)
+        rendered = rendered and (status_code == 200)
+        # Record Render after saveSequence, which rewrites the xsq, a failed render is rendered again next run
+        if ("render" in opensteps) and (rendered):
+            recordRender(manifest, fullsequence)
+
+    # Check Sequence
+    if ("check" in steps):
+        # Cached when the sequence and layout are unchanged since the last check
+        checkSequence(baseURL, fullsequence, xlightsshowfolder, checkfolder, False, checkcache, force, verbose)
+
+    return()
+
+###############################
+# selectSequences             #
+###############################
+
+def selectSequences(SEQsel, baseURL, xlightsshowfolder, steps, highdef, exportfolder, checkfolder, manifest, checkcache, force, uploadsequences, maxuploads, verbose):
+    if (verbose):
+        print(SEQsel)
+        print(baseURL)
+    # REST API calls of the pipeline, xlclient counts every call
+    startcounts = requestCounts()
+    starttime = time.perf_counter()
+    try:
+        for fullsequence in SEQsel:
+            pipelineSequence(baseURL, fullsequence, xlightsshowfolder, steps, highdef, exportfolder, checkfolder, manifest, checkcache, force, verbose)
+    finally:
+        flushRenderManifest(manifest)
+        flushCheckCache(checkcache)
+
+    # Save Layout once after cleanup of every sequence, as cleanupFileLocations does
+    if ("cleanup" in steps):
+        pipelineRequest(baseURL, baseURL + "saveLayout", 30, "Save Layout", verbose)
+
+    # Upload Sequences after every sequence is rendered
+    if ("upload" in steps):
+        uploadfileparms_list = loadUploadParms(baseURL, uploadsequences, verbose)
+        uploadmanifest = loadUploadManifest(xlightsshowfolder, verbose)
+        uploadPool(baseURL, SEQsel, uploadfileparms_list, maxuploads, uploadmanifest, force, verbose)
+    elapsed = time.perf_counter() - starttime
+    counts = requestCounts()
+
+    # Pipeline Summary
+    print ("##### Pipeline Summary")
+    print ("Steps = %s" % ",".join(steps))
+    print ("Sequences = %s elapsed = %.1fs" % (len(SEQsel), elapsed))
+    for endpoint in sorted(counts):
+        if (counts[endpoint] > startcounts.get(endpoint, 0)):
+            print ("%-22s calls = %s" % (endpoint, counts[endpoint] - startcounts.get(endpoint, 0)))
+
+    return()
+
+###############################
+# main                        #
+###############################
+
+def main():
+
+    print ("#" *5 + " runPipeline Begin")
+
+    cli_parser = argparse.ArgumentParser(prog = 'runPipeline',
+        description = '''%(prog)s is a tool to run several xLights steps on sequences in a show folder in one xLights session,''')
+
+    ### Define Arguments
+
+    cli_parser.add_argument('-s', '--xlightsshowfolder', help = 'xLights Show Folder',
+        required = True)
+
+    cli_parser.add_argument('-p', '--steps', help = 'Comma separated pipeline steps, ' + ",".join(PIPELINE_STEPS) + ', ' + ",".join(OPEN_STEPS) + ' run in the order given, check after them, upload last', default = ",".join(PIPELINE_STEPS),
+        required = False)
+
+    cli_parser.add_argument('-d', '--highdef', help = 'High Definition', default = "true", choices = ["true", "false"],
+        required = False)
+
+    cli_parser.add_argument('-e', '--exportfolder', help = 'Export Video Preview Output Folder', default = "DEFAULT",
+        required = False)
+
+    cli_parser.add_argument('-o', '--outputfolder', help = 'Check Sequence Output Folder', default = "NONE",
+        required = False)
+
+    cli_parser.add_argument('-j', '--maxuploads', help = 'Maximum concurrent uploads, one per player at most', type = int, default = 1,
+        required = False)
+
+    cli_parser.add_argument('-f', '--force', help = 'Render, check and upload unchanged sequences', action='store_true',
+        required = False)
+
+    cli_parser.add_argument('-c', '--closexlights' , help = 'Close xLights', action='store_true',
+        required = False)
+
+    cli_parser.add_argument('-v', '--verbose', help = 'Verbose Logging', action='store_true',
+        required = False)
+
+    ### Selection Arguments
+    addSelectArguments(cli_parser)
+
+    ### Get Arguments
+    args = cli_parser.parse_args()
+
+    xlightsshowfolder = os.path.abspath(args.xlightsshowfolder)
+    steps = [step.strip() for step in args.steps.split(",") if step.strip() != ""]
+    highdef = args.highdef
+    exportfolder = args.exportfolder
+    checkfolder = args.outputfolder
+    maxuploads = args.maxuploads
+    force = args.force
+    closexlights = args.closexlights
+    verbose = args.verbose
+
+    # Verify Steps
+    for step in steps:
+        if step not in PIPELINE_STEPS:
+            print("Error: Invalid pipeline step %s, valid steps are %s" % (step, ",".join(PIPELINE_STEPS)))
+            sys.exit(-1)
+        if (steps.count(step) > 1):
+            print("Error: Pipeline step %s given more than once" % step)
+            sys.exit(-1)
+    if (len(steps) == 0):
+        print("Error: No pipeline steps given")
+        sys.exit(-1)
+    # Verify Step Order, only the steps against the open sequence can be reordered
+    opensteps = [step for step in steps if step in OPEN_STEPS]
+    if ("check" in steps) and (len(opensteps) > 0) and (steps.index("check") < steps.index(opensteps[-1])):
+        print("Error: Pipeline step check must follow %s" % ",".join(opensteps))
+        sys.exit(-1)
+    if ("upload" in steps) and (steps[-1] != "upload"):
+        print("Error: Pipeline step upload must be the last step")
+        sys.exit(-1)
+
+    xlightsparmsfilename = "xlightsparms.json"
+    ### Load xLights Parms JSON
+    xlightsparmsfile = open(xlightsparmsfilename, "r+")
+    xlightsparms = json.load(xlightsparmsfile)
+    ### Get xLights Parms
+    xlightsipaddress = xlightsparms.get("xlightsipaddress")
+    xlightsport = xlightsparms.get("xlightsport")
+    # Replace xlightsport with real port value (first port of a list)
+    xlightsport = getxLightsPorts(xlightsport)[0]
+    xlightsprogram = xlightsparms.get("xlightsprogram")
+    xlightsnetworksxmlfile = xlightsparms.get("xlightsnetworksxmlfile")
+    xlightsrgbeffectsxmlfile = xlightsparms.get("xlightsrgbeffectsxmlFile")
+    xlightspoolsize = xlightsparms.get("xlightspoolsize", DEFAULT_POOL_SIZE)
+    xlightsmetricsfolder = xlightsparms.get("xlightsmetricsfolder")
+    # Init xLights REST API Session, one connection per concurrent upload
+    initSession(max(int(xlightspoolsize), maxuploads), verbose)
+    # Write REST API Metrics at exit, only when xlightsparms.json has a metrics folder
+    if (xlightsmetricsfolder is not None):
+        startRequestMetrics(xlightsmetricsfolder, verbose)
+
+    if (verbose):
+        print ("xLights Show Folder = %s" % xlightsshowfolder)
+        print ("xLights IP Address = %s" % xlightsipaddress)
+        print ("xLights Port = %s" % xlightsport)
+        print ("xLights Program = %s" % xlightsprogram)
+        print ("Pipeline Steps = %s" % steps)
+        print ("High Definition = %s" % highdef)
+        print ("Export Folder = %s" % exportfolder)
+        print ("Check Output Folder = %s" % checkfolder)
+        print ("Max Uploads = %s" % maxuploads)
+        print ("Force = %s" % force)
+        print ("Close xLights = %s" % closexlights)
+
+    # Upload Sequences Parms
+    uploadsequences = None
+    if ("upload" in steps):
+        uploadsequencesfilename = "uploadsequences.json"
+        # verify upload sequences json file exists
+        if not os.path.isfile(uploadsequencesfilename):
+            print("Error: Upload Sequences json file not found %s" % uploadsequencesfilename)
+            sys.exit(-1)
+        ### load uploadsequences json file
+        uploadsequencesfile = open(uploadsequencesfilename, "r+")
+        uploadsequences = json.load(uploadsequencesfile)
+
+    # Base URL
+    baseURL = "http://" + xlightsipaddress + ":" + xlightsport + "/"
+    if (verbose):
+        print ("Base URL = %s" % baseURL)
+
+    # Verify Show Folder
+    if not os.path.isdir(xlightsshowfolder):
+        print("Error: xLights Show Folder not found %s" % xlightsshowfolder)
+        sys.exit(-5)
+
+    # Path Case Sensitive Check
+    if not (path_exists_case_sensitive(xlightsshowfolder, verbose)):
+        print("Error: xLights Show Folder case does not match %s" % xlightsshowfolder)
+        sys.exit(-1)
+
+    # verify xlights program file exists
+    if not os.path.isfile(xlightsprogram):
+        print("Error: xLights Program File not found %s" % xlightsprogram)
+        sys.exit(-1)
+
+    # Start xLights & Change Show Folder once for every step
+    startShowFolder(baseURL, xlightsprogram, xlightsshowfolder, verbose)
+
+    # Load Render Manifest
+    manifest = loadRenderManifest(xlightsshowfolder, [xlightsnetworksxmlfile, xlightsrgbeffectsxmlfile], highdef, verbose)
+    # Load Check Cache
+    checkcache = loadCheckCache(xlightsshowfolder, [xlightsnetworksxmlfile, xlightsrgbeffectsxmlfile], verbose)
+
+    # Build Sequence List
+    SEQlist = getSequenceList(xlightsshowfolder, verbose)
+
+    # Sequence Selection, headless with --all/--select otherwise a selection window
+    if isHeadless(args):
+        SEQsel = selectMatching(SEQlist, [sequenceKeys(fullsequence, xlightsshowfolder) for fullsequence in SEQlist], args.all, args.select, verbose)
+    else:
+        SEQsel = selectListbox('Run Pipeline', "Select Sequences for %s" % ",".join(steps), "520x520", SEQlist, "Run", verbose)
+    # Selection Cancelled?
+    if (SEQsel is not None):
+        selectSequences(SEQsel, baseURL, xlightsshowfolder, steps, highdef, exportfolder, checkfolder, manifest, checkcache, force, uploadsequences, maxuploads, verbose)
+
+    ### Close xLights
+    if (closexlights) and (baseURL in supervisedURLs(verbose)):
+        print ("##### xLights %s left running for the xLights Supervisor" % baseURL)
+    elif (closexlights):
+        request = baseURL + "closexLights"
+        if (verbose):
+            print("##### closexLights")
+            print("request = ", request)
+        (ret_code, status_code, result) = doRequestsGet(request, 30, verbose)
+        if (ret_code < 0):
+            print("Unable to close xLights %s" % baseURL)
+            print("ret_code = ", ret_code)
+            print("result = ", result)
+            sys.exit(ret_code)
+
+    # REST API Timings
+    if (verbose):
+        printRequestTimings()
+
+    print ("#" *5 + " runPipeline End")
+
+if __name__ == "__main__":
+    main()
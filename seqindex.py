@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+
+# Name: seqindex.py
+# Purpose: Persistent index of the xLights sequences in a show folder and sub folders
+# Author: Bill Jenkins
+# Version: v2.1
+# Date: 08/24/2023
+
+###############################
+# Imports                     #
+###############################
+
+import os
+import json
+import hashlib
+import xml.etree.ElementTree as ET
+
+###############################
+# Sequence Index Globals      #
+###############################
+
+# Sequence Index File next to the scripts, outside the scanned show folder, %s is a hash of the show folder path
+SEQUENCE_INDEX = "xlightsauto_seqindex_%s.json"
+SEQUENCE_INDEX_VERSION = 1
+
+###############################
+# isBackupFolder              #
+###############################
+
+def isBackupFolder(name):
+
+    # Sequences in xLights Backup folders are never listed
+    return(name.endswith("Backup"))
+
+###############################
+# readSequenceType            #
+###############################
+
+def readSequenceType(fullsequence):
+
+    # Stream only as far as head/sequenceType
+    try:
+        for event, elem in ET.iterparse(fullsequence, events=("end",)):
+            if (elem.tag == "sequenceType"):
+                return(elem.text)
+            if (elem.tag == "head"):
+                break
+    except (ET.ParseError, OSError):
+        pass
+    return(None)
+
+###############################
+# scanFolder                  #
+###############################
+
+def scanFolder(folder, dirmtime, oldsequences, stats):
+
+    # List one folder, keeping cached sequence details when the file is unchanged
+    subdirs = []
+    sequences = {}
+    stats["listed"] += 1
+    with os.scandir(folder) as it:
+        for entry in it:
+            # Symlinked folders are not followed, a link back up the tree would recurse forever
+            if entry.is_dir(follow_symlinks=False):
+                if not isBackupFolder(entry.name):
+                    subdirs.append(entry.name)
+            elif entry.name.endswith(".xsq"):
+                st = entry.stat()
+                sequences[entry.name] = sequenceEntry(entry.path, st, oldsequences.get(entry.name), stats)
+    return({"mtime": dirmtime, "subdirs": subdirs, "sequences": sequences})
+
+###############################
+# sequenceEntry               #
+###############################
+
+def sequenceEntry(fullsequence, st, cached, stats):
+
+    if (cached is not None) and (cached.get("mtime") == st.st_mtime_ns) and (cached.get("size") == st.st_size):
+        return(cached)
+    stats["parsed"] += 1
+    return({"mtime": st.st_mtime_ns, "size": st.st_size, "sequenceType": readSequenceType(fullsequence)})
+
+###############################
+# refreshFolder               #
+###############################
+
+def refreshFolder(folder, olddirs, newdirs, stats):
+
+    try:
+        dirmtime = os.stat(folder).st_mtime_ns
+    except OSError:
+        return()
+    cached = olddirs.get(folder)
+    # Folder entries unchanged? Only the indexed sequence files need a stat
+    if (cached is not None) and (cached.get("mtime") == dirmtime):
+        sequences = {}
+        for name, seqentry in cached.get("sequences", {}).items():
+            fullsequence = os.path.join(folder, name)
+            try:
+                st = os.stat(fullsequence)
+            except OSError:
+                continue
+            sequences[name] = sequenceEntry(fullsequence, st, seqentry, stats)
+        folderentry = {"mtime": dirmtime, "subdirs": cached.get("subdirs", []), "sequences": sequences}
+    else:
+        folderentry = scanFolder(folder, dirmtime, {} if cached is None else cached.get("sequences", {}), stats)
+    newdirs[folder] = folderentry
+    # Sub Folders, top down like os.walk
+    for subdir in folderentry["subdirs"]:
+        refreshFolder(os.path.join(folder, subdir), olddirs, newdirs, stats)
+
+    return()
+
+###############################
+# saveSequenceIndex           #
+###############################
+
+def saveSequenceIndex(indexfile, newdirs):
+
+    # Write to a temporary file of this process first so an interrupted run never leaves a truncated index
+    # and two runs saving at once each replace the whole index
+    tmpfile = "%s.%s.tmp" % (indexfile, os.getpid())
+    try:
+        with open(tmpfile, "w") as f:
+            json.dump({"version": SEQUENCE_INDEX_VERSION, "dirs": newdirs}, f)
+        os.replace(tmpfile, indexfile)
+    except OSError as e:
+        print ("*** Unable to save sequence index %s: %s" % (indexfile, e))
+
+    return()
+
+###############################
+# sequenceIndexFile           #
+###############################
+
+def sequenceIndexFile(xlightsshowfolder):
+
+    # One index per show folder, writing it into the show folder would change the folder it indexes
+    showhash = hashlib.sha1(os.path.normcase(os.path.abspath(xlightsshowfolder)).encode("utf-8")).hexdigest()[:16]
+    return(os.path.join(os.path.dirname(os.path.abspath(__file__)), SEQUENCE_INDEX % showhash))
+
+###############################
+# getSequenceIndex            #
+###############################
+
+def getSequenceIndex(xlightsshowfolder, verbose):
+
+    # Load Sequence Index
+    indexfile = sequenceIndexFile(xlightsshowfolder)
+    olddirs = {}
+    if os.path.isfile(indexfile):
+        try:
+            with open(indexfile, "r") as f:
+                d1 = json.load(f)
+            if (d1.get("version") == SEQUENCE_INDEX_VERSION):
+                olddirs = d1.get("dirs", {})
+        except (OSError, ValueError) as e:
+            print ("*** Sequence index %s ignored: %s" % (indexfile, e))
+
+    # Refresh Sequence Index
+    stats = {"listed": 0, "parsed": 0}
+    newdirs = {}
+    refreshFolder(xlightsshowfolder, olddirs, newdirs, stats)
+
+    # Save Sequence Index when anything changed
+    if (newdirs != olddirs):
+        saveSequenceIndex(indexfile, newdirs)
+
+    # Sequence List
+    SEQindex = []
+    for folder, folderentry in newdirs.items():
+        for name, seqentry in folderentry["sequences"].items():
+            SEQindex.append({"path": os.path.join(folder, name), "mtime": seqentry["mtime"],
+                "size": seqentry["size"], "sequenceType": seqentry["sequenceType"]})
+    if (verbose):
+        print ("Sequence Index = %s folders = %s folders listed = %s sequences = %s sequences parsed = %s" % (indexfile, len(newdirs), stats["listed"], len(SEQindex), stats["parsed"]))
+
+    return(SEQindex)
+
+###############################
+# getSequenceList             #
+###############################
+
+def getSequenceList(xlightsshowfolder, verbose):
+
+    SEQlist = []
+    for seqentry in getSequenceIndex(xlightsshowfolder, verbose):
+        fullsequence = seqentry["path"]
+        if (verbose):
+            print ("sequence = ", os.path.basename(fullsequence))
+            print ("fullsequence = ", fullsequence)
+        SEQlist.append(fullsequence)
+
+    return(SEQlist)
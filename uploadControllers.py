@@ -12,20 +12,19 @@
 
 import argparse
 import sys
-import subprocess
 import os
 import time
 import re
-import requests
 import csv
 import ast
 import json
 ###########################
 # From Imports            #
 ###########################
-from functools import partial
-from tkinter import *
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from xlclient import *
+from xlselect import *
 
 ###############################
 # path_exists_case_sensitive  #
@@ -52,92 +51,6 @@ def path_exists_case_sensitive(path, verbose) -> bool:
             return False
         p = p.parent
 
-###############################
-# doRequestsGet               #
-###############################
-def doRequestsGet(request, timeout, verbose):
-
-    try:
-        r = requests.get(request, timeout=(timeout))
-        ret_code = 0
-        status_code = r.status_code
-        result = r.text
-
-    # HTTP Error?
-    except requests.exceptions.HTTPError as e:
-        ret_code = -1
-        status_code = ""
-        result = "##### Request HTTP Error: " + format(str(e))
-
-    # HTTP Connection Error?   
-    except requests.exceptions.ConnectionError as e:
-        ret_code = -2
-        status_code = ""
-        result = "##### Request Connection Error: " + format(str(e))
-
-    # HTTP Timeout?
-    except requests.exceptions.Timeout as e:
-        ret_code = -3
-        status_code = ""
-        result = "##### Request Timeout Error: " + format(str(e))
-    
-    # HTTP Other?
-    except requests.exceptions.RequestException as e:
-        ret_code = -4
-        status_code = ""
-        result = "##### Request Exception Error: " + format(str(e))
-
-    return(ret_code, status_code, result)
-
-###############################
-# startxLights                #
-###############################
-
-def startxLights(baseURL, xlightsprogram, verbose):
-
-    # xLights Running?
-    request = baseURL + "getVersion"
-    if (verbose):
-        print ("##### Get Version")
-        print ("request=", request)
-    startloop = True
-    started = False
-    retryctr = 0
-    while (startloop):
-        (ret_code, status_code, result) = doRequestsGet(request, 30, verbose)
-        match ret_code:
-            # REST API Connection Successful
-            case 0:
-                startloop = False
-                if (verbose):
-                    print ("ret_code = ", ret_code)
-                    print ("status_code = ", status_code)
-                    print ("result = ", result)
-            # REST API Connection Error?
-            case -2:
-                if (not started):
-                    # Start xLights
-                    cmd = "\"" + xlightsprogram + "\""
-                    if (verbose):
-                        print ("##### Start xLights")
-                        print ("cmd = ", cmd)
-                    try:
-                        cp = subprocess.Popen(cmd)
-                    except:
-                        sys.exit("*** Error in starting xLights %s" % sys.exc_info()[0])
-                
-                    started = True
-                    retryctr = retryctr + 1
-                    if (retryctr <= 10):
-                        time.sleep(3)
-                    else:
-                        startloop = False
-            # REST API Error?
-            case _:
-                startloop = False
-            
-    return(ret_code, status_code, result)
-
 import urllib.parse
 
 ###############################
@@ -173,61 +86,93 @@ def createParamsStr(params_dict, verbose):
     
     return(params_str)
     
+# Summary Status for doRequestsGet Error Codes
+UPLOAD_ERROR_STATUS = {-1: "HTTP ERROR", -2: "CONNECT", -3: "TIMEOUT", -4: "ERROR"}
+# Retry Backoff, first delay in seconds doubled for each retry up to the maximum
+RETRY_BACKOFF = 5
+RETRY_BACKOFF_MAX = 60
+
 ###############################
 # uploadController            #
 ###############################
-def uploadController(baseURL, uploadip, verbose):
+def uploadController(baseURL, uploadip, retries, verbose):
 
     params_dict =  {"ip": str(uploadip)}
     uploadparams = createParamsStr(params_dict, verbose)
     request = baseURL + "uploadController/" + uploadparams  
-    print ("Upload configuration to controller:%s" % (uploadip)) 
-    if (verbose):
-        print ("request = ", request)    
-    (ret_code, status_code, result) = doRequestsGet(request, 900, verbose)
-    # Request Error?
-    if (ret_code < 0):
-        print("Unable to connect to xLights REST API %s" % baseURL)
-        print ("ret_code = ", ret_code)
-        print ("result = ", result) 
-        sys.exit("*** Error in Request to Rest API")
-    # 
-    print ("status_code = ", status_code)
-    print ("result = ", result)
+    starttime = time.perf_counter()
+    attempt = 0
+    while True:
+        attempt += 1
+        print ("Upload configuration to controller:%s attempt:%s" % (uploadip, attempt)) 
+        if (verbose):
+            print ("request = ", request)    
+        (ret_code, status_code, result) = doRequestsGet(request, 900, verbose)
+        # Request Error?
+        if (ret_code < 0):
+            print("Unable to upload controller:%s through xLights REST API %s" % (uploadip, baseURL))
+            print ("ret_code = ", ret_code)
+            print ("result = ", result) 
+            uploadstatus = UPLOAD_ERROR_STATUS.get(ret_code, "ERROR %s" % ret_code)
+        elif (status_code != 200):
+            print ("controller:%s status_code = %s result = %s" % (uploadip, status_code, result))
+            uploadstatus = "HTTP %s" % status_code
+        else:
+            print ("controller:%s status_code = %s result = %s" % (uploadip, status_code, result))
+            uploadstatus = "OK"
+        # Done or out of retries? Otherwise back off before the next attempt
+        if (uploadstatus == "OK") or (attempt > retries):
+            break
+        backoff = min(RETRY_BACKOFF * 2 ** (attempt - 1), RETRY_BACKOFF_MAX)
+        print ("Retry controller:%s in %ss" % (uploadip, backoff))
+        time.sleep(backoff)
 
-    return()
+    return({"ip": uploadip, "status": uploadstatus, "attempts": attempt, "latency": time.perf_counter() - starttime})
 
 ###############################
-# selectAll                   #
+# printUploadSummary          #
 ###############################
 
-def selectAll(lb):
-    lb.select_set(0, END)
-
-###############################
-# clearAll                    #
-###############################
+def printUploadSummary(uploadresults, elapsed):
+
+    # Per Controller Results
+    print ("##### Upload Controllers Summary")
+    print ("%-16s %-12s %8s %10s" % ("Controller IP", "Status", "Attempts", "Latency"))
+    okctr = 0
+    latencies = []
+    for uploadresult in uploadresults:
+        print ("%-16s %-12s %8s %9.1fs" % (uploadresult["ip"], uploadresult["status"], uploadresult["attempts"], uploadresult["latency"]))
+        latencies.append(uploadresult["latency"])
+        if (uploadresult["status"] == "OK"):
+            okctr += 1
+    print ("Total controllers=%s ok=%s failed=%s elapsed=%.1fs" % (len(uploadresults), okctr, len(uploadresults) - okctr, elapsed))
+    if (len(latencies) > 0):
+        print ("Latency min=%.1fs avg=%.1fs max=%.1fs" % (min(latencies), sum(latencies) / len(latencies), max(latencies)))
+    for uploadresult in uploadresults:
+        if (uploadresult["status"] != "OK"):
+            print ("   Failed: %s %s" % (uploadresult["ip"], uploadresult["status"]))
 
-def clearAll(lb):
-    lb.select_clear(0, END)
+    return()
 
 ###############################
 # selectedControllers         #
 ###############################
-def selectedControllers(window, listCTL, baseURL, verbose):
+def selectedControllers(CTLsel, baseURL, workers, retries, verbose):
     #
     if (verbose):
-        print(listCTL)
+        print(CTLsel)
         print(baseURL)
     Controllers = []
-    ctlSel = listCTL.curselection()
-    for i in ctlSel:
-        s1 = str(listCTL.get(i))
+    for s1 in CTLsel:
         s2 = s1.split(" ")
         uploadIP = s2[0]
-        uploadController(baseURL, uploadIP, verbose)
-    # Close Window
-    window.quit()
+        Controllers.append(uploadIP)
+    # Upload Controllers, at most workers at a time, results in selection order
+    starttime = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [executor.submit(uploadController, baseURL, uploadIP, retries, verbose) for uploadIP in Controllers]
+        uploadresults = [future.result() for future in futures]
+    printUploadSummary(uploadresults, time.perf_counter() - starttime)
 
 ###############################
 # main                        #
@@ -246,14 +191,26 @@ def main():
 
     cli_parser.add_argument('-c', '--closexlights' , help = 'Close xLights', action='store_true',
         required = False)
+
+    cli_parser.add_argument('-j', '--workers', help = 'Number of controllers uploaded at the same time', type = int, default = 1,
+        required = False)
+
+    cli_parser.add_argument('-r', '--retries', help = 'Retries for each controller, with backoff', type = int, default = 2,
+        required = False)
+
     cli_parser.add_argument('-v', '--verbose', help = 'Verbose Logging', action='store_true',
         required = False)
 
+    ### Selection Arguments
+    addSelectArguments(cli_parser)
+
     ### Get Arguments
     args = cli_parser.parse_args()
     
     xlightsshowfolder = os.path.abspath(args.xlightsshowfolder)
     closexlights = args.closexlights
+    workers = args.workers
+    retries = args.retries
     verbose = args.verbose
 
         ### Current Working Directory
@@ -266,12 +223,16 @@ def main():
     ### Get xLights Parms
     xlightsipaddress = xlightsparms.get("xlightsipaddress")
     xlightsport = xlightsparms.get("xlightsport")
-    # Replace xlightsport with real port value
-    if (xlightsport == "A"):
-        xlightsport = "49913"
-    elif (xlightsport == "B"):
-        xlightsport = "49914"
+    # Replace xlightsport with real port value (first port of a list)
+    xlightsport = getxLightsPorts(xlightsport)[0]
     xlightsprogram = xlightsparms.get("xlightsprogram")
+    xlightspoolsize = xlightsparms.get("xlightspoolsize", DEFAULT_POOL_SIZE)
+    xlightsmetricsfolder = xlightsparms.get("xlightsmetricsfolder")
+    # Init xLights REST API Session, one connection per worker
+    initSession(max(int(xlightspoolsize), workers), verbose)
+    # Write REST API Metrics at exit, only when xlightsparms.json has a metrics folder
+    if (xlightsmetricsfolder is not None):
+        startRequestMetrics(xlightsmetricsfolder, verbose)
     
     if (verbose):
         print ("xLights Show Folder = %s" % xlightsshowfolder)
@@ -279,6 +240,8 @@ def main():
         print ("xLights Port = %s" % xlightsport)
         print ("xLights Program Folder = %s" % xlightsprogram)
         print ("Close xLights = %s" % closexlights)
+        print ("Workers = %s" % workers)
+        print ("Retries = %s" % retries)
         print ("CWD = %s" % CWD)
 
     # verify xlights show folder exists
@@ -357,42 +320,30 @@ def main():
         print ("status_code = ", status_code)
         print ("result = ", result)
     controllers = json.loads(result)
-    # Upload Controller Selection Window
-    window = Tk()
-    window.title('Upload Controllers')
-    window.geometry("400x520")
-
-    Label(window, text="Upload Controllers Configuration").pack()
-
-    frame = Frame(window)
-    frame.pack()
-
-    listCTL = Listbox(frame, width=50, height=20, font=("Helvetica", 12), selectmode = "multiple")
-    listCTL.pack(padx = 10, pady = 10, expand = YES, fill = "both")
-
-    scrollbar = Scrollbar(frame, orient="vertical")
-    scrollbar.config(command=listCTL.yview)
-    scrollbar.pack(side="right", fill="y")
-
-    listCTL.config(yscrollcommand=scrollbar.set)
-
+    # Controller List
+    CTLlist = []
+    CTLkeys = []
     for i in range(len(controllers)):
         dCtl = {}
         dCtl = controllers[i]
         nameCtl = dCtl.get('name')
         ipCtl = dCtl.get('ip')
-        listCTL.insert(END, ipCtl + "     " + nameCtl)
-
-
-    allButton = Button(window, text="Select ALL", command = partial(selectAll, listCTL)).pack(side = LEFT, padx=10)
-    clearButton = Button(window, text="Clear All", command = partial(clearAll, listCTL)).pack(side = LEFT, padx=10)
-    uploadButton = Button(window, text="Upload", command = lambda: selectedControllers(window, listCTL, baseURL, verbose)).pack(side = LEFT, padx=10)
-    cancelButton = Button(window, text="Cancel", command = window.destroy).pack(side = LEFT, padx=10)
-
-    window.mainloop()
+        CTLlist.append(ipCtl + "     " + nameCtl)
+        CTLkeys.append([ipCtl, nameCtl])
+
+    # Controller Selection, headless with --all/--select (IP or name) otherwise a selection window
+    if isHeadless(args):
+        CTLsel = selectMatching(CTLlist, CTLkeys, args.all, args.select, verbose)
+    else:
+        CTLsel = selectListbox('Upload Controllers', "Upload Controllers Configuration", "400x520", CTLlist, "Upload", verbose)
+    # Selection Cancelled?
+    if (CTLsel is not None):
+        selectedControllers(CTLsel, baseURL, workers, retries, verbose)
 
     ### Close xLights
-    if (closexlights):
+    if (closexlights) and (baseURL in supervisedURLs(verbose)):
+        print ("##### xLights %s left running for the xLights Supervisor" % baseURL)
+    elif (closexlights):
         request = baseURL + "closexLights"
         if (verbose):
             print("##### closexLights")
@@ -403,6 +354,10 @@ def main():
             print("ret_code = ", ret_code)
             print("result = ", result)
             sys.exit(ret_code)
+    # REST API Timings
+    if (verbose):
+        printRequestTimings()
+
     print ("#" *5 + " uploadControllers End")
 
 if __name__ == "__main__":
@@ -12,20 +12,18 @@
 
 import argparse
 import sys
-import subprocess
 import os
 import time
 import re
-import requests
 import json
 import ast
 ###########################
 # From Imports            #
 ###########################
-from functools import partial
-from tkinter import *
-from tkinter import ttk
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from xlclient import *
+from xlselect import *
 
 ###############################
 # path_exists_case_sensitive  #
@@ -53,91 +51,6 @@ def path_exists_case_sensitive(path, verbose) -> bool:
             return False
         p = p.parent
 
-###############################
-# doRequestsGet               #
-###############################
-def doRequestsGet(request, timeout, verbose):
-
-    try:
-        r = requests.get(request, timeout=(timeout))
-        ret_code = 0
-        status_code = r.status_code
-        result = r.text
-
-    # HTTP Error?
-    except requests.exceptions.HTTPError as e:
-        ret_code = -1
-        status_code = ""
-        result = "##### Request HTTP Error: " + format(str(e))
-
-    # HTTP Connection Error?   
-    except requests.exceptions.ConnectionError as e:
-        ret_code = -2
-        status_code = ""
-        result = "##### Request Connection Error: " + format(str(e))
-
-    # HTTP Timeout?
-    except requests.exceptions.Timeout as e:
-        ret_code = -3
-        status_code = ""
-        result = "##### Request Timeout Error: " + format(str(e))
-    
-    # HTTP Other?
-    except requests.exceptions.RequestException as e:
-        ret_code = -4
-        status_code = ""
-        result = "##### Request Exception Error: " + format(str(e))
-
-    return(ret_code, status_code, result)
-
-###############################
-# startxLights                  #
-###############################
-
-def startxLights(baseURL, xlightsprogram, verbose):
-
-    # xLights Running?
-    request = baseURL + "getVersion"
-    if (verbose):
-        print ("##### Get Version")
-        print ("request=", request)
-    startloop = True
-    started = False
-    retryctr = 0
-    while (startloop):
-        (ret_code, status_code, result) = doRequestsGet(request, 30, verbose)
-        match ret_code:
-            # REST API Connection Successful
-            case 0:
-                startloop = False
-                if (verbose):
-                    print ("status_code = ", status_code)
-                    print ("result = ", result)
-            # REST API Connection Error?
-            case -2:
-                if (not started):
-                    # Start xLights
-                    cmd = "\"" + xlightsprogram + "\""
-                    if (verbose):
-                        print ("##### Start xLights")
-                        print ("cmd = ", cmd)
-                    try:
-                        cp = subprocess.Popen(cmd)
-                    except:
-                        sys.exit("*** Error in starting xLights %s" % sys.exc_info()[0])
-                
-                    started = True
-                    retryctr = retryctr + 1
-                    if (retryctr <= 10):
-                        time.sleep(3)
-                    else:
-                        startloop = False
-            # REST API Error?
-            case _:
-                startloop = False
-            
-    return(ret_code, status_code, result)
-
 import urllib.parse
 
 ###############################
@@ -170,92 +83,70 @@ def createParamsStr(params_dict, verbose):
     
     return(params_str)
 
+# Results Table Status for doRequestsGet Error Codes
+FPP_ERROR_STATUS = {-1: "HTTP ERROR", -2: "CONNECT", -3: "TIMEOUT", -4: "ERROR"}
+
 ###############################
 # uploadFPPConfig              #
 ###############################
 
-def uploadFPPConfig(baseURL, fppip, fppudp, fppmodels, fppmap, verbose):
+def uploadFPPConfig(baseURL, fppip, fppudp, fppmodels, fppmap, fpptimeout, verbose):
 
     
     params_dict =  {"ip": fppip, "udp": fppudp, "models": fppmodels, "map": fppmap}
     fppparams = createParamsStr(params_dict, verbose)
     request = baseURL + "uploadFPPConfig/" + fppparams
-    ("Upload FPP Config to FPP IP:%s udp:%s models:%s map:%s" % (fppip, fppudp, fppmodels, fppmap))
+    print ("Upload FPP Config to FPP IP:%s udp:%s models:%s map:%s" % (fppip, fppudp, fppmodels, fppmap))
     if (verbose):
        print ("request = ", request)
-    (ret_code, status_code, result) = doRequestsGet(request, 900, verbose)
-    # Request Error?
+    starttime = time.perf_counter()
+    (ret_code, status_code, result) = doRequestsGet(request, fpptimeout, verbose)
+    latency = time.perf_counter() - starttime
+    # Request Error? Reported in the results table, the other controllers carry on
     if (ret_code < 0):
-       print("Unable to connect to xLights REST API %s" % baseURL)
+       print("Unable to upload FPP Config to FPP IP:%s through xLights REST API %s" % (fppip, baseURL))
        print ("ret_code = ", ret_code)
        print ("result = ", result) 
-       sys.exit("*** Error in Request to Rest API")       
-    # 
-    print ("status_code = ", status_code)
-    print ("result = ", result)
+       fppstatus = FPP_ERROR_STATUS.get(ret_code, "ERROR %s" % ret_code)
+    elif (status_code != 200):
+       print ("FPP IP:%s status_code = %s result = %s" % (fppip, status_code, result))
+       fppstatus = "HTTP %s" % status_code
+    else:
+       if (verbose):
+           print ("FPP IP:%s status_code = %s result = %s" % (fppip, status_code, result))
+       fppstatus = "OK"
 
-    return()
+    return({"ip": fppip, "status": fppstatus, "latency": latency, "ret_code": ret_code, "result": result})
 
 ###############################
-# selectAll                   #
+# printFPPResults             #
 ###############################
 
-def selectAll(tree):
-    # Iterate over all the root-level items in the treeview.
-    for item in tree.get_children():
-        select_children(tree, item)
-    
-def select_children(tree, item):
-    # Make sure the item is expanded so the user can see it.
-    tree.item(item, open=True)
-    
-    # Select the current item.
-    tree.selection_add(item)
-    
-    # Select all the children of the current item, if any.
-    item_children = tree.get_children(item)
-    if item_children:
-        for sub_item in item_children:
-            select_children(tree, sub_item)
-        
-###############################
-# removeAll                   #
-###############################
-def removeAll(tree):
-    # Iterate over all the root-level items in the treeview.
-    for item in tree.get_children():
-        remove_children(tree, item)
-    
-def remove_children(tree, item):
-    # Make sure the item is expanded so the user can see it.
-    tree.item(item, open=True)
-    
-    # Remove the current item.
-    tree.selection_remove(item)
-    
-    # Remove all the children of the current item, if any.
-    item_children = tree.get_children(item)
-    if item_children:
-        for sub_item in item_children:
-            remove_children(tree, sub_item)
-    
+def printFPPResults(fppresults, elapsed):
+
+    # Per Controller Results Table
+    print ("##### Upload FPP Config Results")
+    print ("%-16s %-12s %10s" % ("FPP IP", "Status", "Latency"))
+    okctr = 0
+    for fppresult in fppresults:
+        print ("%-16s %-12s %9.1fs" % (fppresult["ip"], fppresult["status"], fppresult["latency"]))
+        if (fppresult["status"] == "OK"):
+            okctr += 1
+    print ("Total controllers=%s ok=%s failed=%s elapsed=%.1fs" % (len(fppresults), okctr, len(fppresults) - okctr, elapsed))
+
+    return()
+
 #
 ###############################
 # selectedControllers         #
 ###############################
-def selectedControllers(window, tree, baseURL, verbose):
+def selectedControllers(FPPsel, baseURL, fpptimeouts, workers, verbose):
     #
-    selected_items = tree.selection()
     if (verbose):
         print(baseURL)
-        print (selected_items)
-    for i in range(len(selected_items)):
-        item_details = tree.item(selected_items[i])
-        if (verbose):
-            print (item_details)
-        item_details_values = item_details.get("values")
-        if (verbose):
-            print (item_details_values)
+        print (FPPsel)
+    fppjobs = []
+    for item_details_values in FPPsel:
     
         # Get Parms    
         fppip = item_details_values[0]
@@ -263,11 +154,16 @@ def selectedControllers(window, tree, baseURL, verbose):
         fppmodel = item_details_values[2]
         fppmap = item_details_values[3]
     
-        # Upload FPP Config
-        uploadFPPConfig(baseURL, fppip, fppudp, fppmodel, fppmap, verbose)
-    
-    # Close Window
-    window.quit()
+        # Upload FPP Config Job
+        fppjobs.append((fppip, fppudp, fppmodel, fppmap, fpptimeouts.get(fppip)))
+
+    # Upload FPP Configs, at most workers at a time, results in selection order
+    starttime = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [executor.submit(uploadFPPConfig, baseURL, fppip, fppudp, fppmodel, fppmap, fpptimeout, verbose)
+                   for (fppip, fppudp, fppmodel, fppmap, fpptimeout) in fppjobs]
+        fppresults = [future.result() for future in futures]
+    printFPPResults(fppresults, time.perf_counter() - starttime)
 
 ###############################
 # main                        #
@@ -287,14 +183,25 @@ def main():
     cli_parser.add_argument('-c', '--closexlights' , help = 'Close xLights', action='store_true',
         required = False)
 
+    cli_parser.add_argument('-j', '--workers', help = 'Number of FPP configs uploaded at the same time', type = int, default = 1,
+        required = False)
+
+    cli_parser.add_argument('-t', '--timeout', help = 'Upload timeout in seconds for each controller', type = int, default = 900,
+        required = False)
+
     cli_parser.add_argument('-v', '--verbose', help = 'Verbose Logging', action='store_true',
         required = False)
 
+    ### Selection Arguments
+    addSelectArguments(cli_parser)
+
     ### Get Arguments
     args = cli_parser.parse_args()
     
     xlightsshowfolder = os.path.abspath(args.xlightsshowfolder)
     closexlights = args.closexlights
+    workers = args.workers
+    timeout = args.timeout
     verbose = args.verbose
 
     ### Current Working Directory
@@ -307,12 +214,16 @@ def main():
     ### Get xLights Parms
     xlightsipaddress = xlightsparms.get("xlightsipaddress")
     xlightsport = xlightsparms.get("xlightsport")
-    # Replace xlightsport with real port value
-    if (xlightsport == "A"):
-        xlightsport = "49913"
-    elif (xlightsport == "B"):
-        xlightsport = "49914"
+    # Replace xlightsport with real port value (first port of a list)
+    xlightsport = getxLightsPorts(xlightsport)[0]
     xlightsprogram = xlightsparms.get("xlightsprogram")
+    xlightspoolsize = xlightsparms.get("xlightspoolsize", DEFAULT_POOL_SIZE)
+    xlightsmetricsfolder = xlightsparms.get("xlightsmetricsfolder")
+    # Init xLights REST API Session, one connection per worker
+    initSession(max(int(xlightspoolsize), workers), verbose)
+    # Write REST API Metrics at exit, only when xlightsparms.json has a metrics folder
+    if (xlightsmetricsfolder is not None):
+        startRequestMetrics(xlightsmetricsfolder, verbose)
 	   
     if (verbose):
         print ("xLights Show Folder = %s" % xlightsshowfolder)
@@ -320,6 +231,8 @@ def main():
         print ("xLights Port = %s" % xlightsport)
         print ("xLights Program Folder = %s" % xlightsprogram)
         print ("Close xLights = %s" % closexlights)
+        print ("Workers = %s" % workers)
+        print ("Timeout = %s" % timeout)
         print ("CWD = %s" % CWD)
     
     uploadfppconfigsfilename = "uploadfppconfigs.json"
@@ -413,6 +326,7 @@ def main():
 
     # Load fpp upload config parms into list
     fppparms_list = []
+    fpptimeouts = {}
     fppctllist = uploadfppconfigs.get('controllers')
     if (verbose):
         print (fppctllist)
@@ -437,56 +351,26 @@ def main():
         if fppmap not in ["true", "false"]:
             print ("*** Map parm %s invalid on %s changed to default of \"false\"" % (fppmap, fppip))
         fppparms_list.append([fppip, fppudp, fppmodels, fppmap])    
-
-    # Upload FPP Configurations Selection Window
-    window = Tk()
-    window.title('Upload FPP Configurations')
-    window.geometry("425x425")
-
-    Label(window, text="Select FPP Configurations to Upload").pack()
-
-    frame = Frame(window)
-    frame.pack()
-    bottomframe = Frame(window)
-    bottomframe.pack( side = BOTTOM )
-
-        # Set Style Theme
-    s = ttk.Style()
-    s.theme_use('clam')
-
-    # Add a Treeview widget
-    tree = ttk.Treeview(window, column=("IP", "udp", "models", "map"), show='headings', height=10)
-    tree.pack(side ="left")
-    
-    tree.column("# 1", width = 100, anchor=CENTER)
-    tree.heading("# 1", text= "IP")
-    tree.column("# 2", width = 100, anchor=CENTER)
-    tree.heading("# 2", text="udp")
-    tree.column("# 3", width = 100, anchor=CENTER)
-    tree.heading("# 3", text="models")
-    tree.column("# 4", width = 100, anchor=CENTER)
-    tree.heading("# 4", text="maps")
-
-    # add a scrollbar
-    vscrollbar = ttk.Scrollbar(orient=VERTICAL, command=tree.yview)
-    tree.configure(yscroll=vscrollbar.set)
-    vscrollbar.pack(side ='right', fill ='x')
-
-    # Get data
-    for ctl_fppparms in fppparms_list:
-        tree.insert('', END, values=ctl_fppparms)   
-    tree.pack()
-
-    # define buttons
-    allButton = Button(bottomframe, text="Select ALL", command = partial(selectAll, tree)).pack(side = LEFT, padx=10)
-    clearButton = Button(bottomframe, text="Clear All", command = partial(removeAll, tree)).pack(side = LEFT, padx=10)
-    fppuploadButton = Button(bottomframe, text="FPP Upload", command = lambda: selectedControllers(window, tree, baseURL, verbose)).pack(side = LEFT, padx=10)
-    cancelButton = Button(bottomframe, text="Cancel", command = window.destroy).pack(side = LEFT, padx=10)
-    
-    window.mainloop()
+        # Per Controller Timeout, defaults to --timeout
+        fpptimeout = fppctl.get("timeout", timeout)
+        if not isinstance(fpptimeout, (int, float)) or (fpptimeout <= 0):
+            print ("*** Timeout parm %s invalid on %s changed to default of %s" % (fpptimeout, fppip, timeout))
+            fpptimeout = timeout
+        fpptimeouts[fppip] = fpptimeout
+
+    # FPP Configuration Selection, headless with --all/--select (IP) otherwise a selection window
+    if isHeadless(args):
+        FPPsel = selectMatching(fppparms_list, [[fppparms[0]] for fppparms in fppparms_list], args.all, args.select, verbose)
+    else:
+        FPPsel = selectTreeview('Upload FPP Configurations', "Select FPP Configurations to Upload", "425x425", ["IP", "udp", "models", "maps"], fppparms_list, "FPP Upload", verbose)
+    # Selection Cancelled?
+    if (FPPsel is not None):
+        selectedControllers(FPPsel, baseURL, fpptimeouts, workers, verbose)
     
     ### Close xLights
-    if (closexlights):
+    if (closexlights) and (baseURL in supervisedURLs(verbose)):
+        print ("##### xLights %s left running for the xLights Supervisor" % baseURL)
+    elif (closexlights):
         request = baseURL + "closexLights"
         if (verbose):
             print("##### closexLights")
@@ -497,6 +381,10 @@ def main():
             print("ret_code = ", ret_code)
             print("result = ", result)
             sys.exit(ret_code)
+    # REST API Timings
+    if (verbose):
+        printRequestTimings()
+
     print ("#" *5 + " uploadFPPConfigs End")
 
 if __name__ == "__main__":
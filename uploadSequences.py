@@ -12,21 +12,25 @@
 
 import argparse
 import sys
-import subprocess
 import os
 import time
 import re
-import requests
 import json
 import urllib.parse
+import threading
+import queue
+import hashlib
+import xml.etree.ElementTree as ET
 
 ###########################
 # From Imports            #
 ###########################
 
 from functools import partial
-from tkinter import *
 from pathlib import Path
+from xlclient import *
+from seqindex import getSequenceList
+from xlselect import *
 
 ###############################
 # path_exists_case_sensitive  #
@@ -53,93 +57,6 @@ def path_exists_case_sensitive(path, verbose) -> bool:
             return False
         p = p.parent
         
-###############################
-# doRequestsGet               #
-###############################
-
-def doRequestsGet(request, timeout, verbose):
-
-    try:
-        r = requests.get(request, timeout=(timeout))
-        ret_code = 0
-        status_code = r.status_code
-        result = r.text
-
-    # HTTP Error?
-    except requests.exceptions.HTTPError as e:
-        ret_code = -1
-        status_code = ""
-        result = "##### Request HTTP Error: " + format(str(e))
-
-    # HTTP Connection Error?   
-    except requests.exceptions.ConnectionError as e:
-        ret_code = -2
-        status_code = ""
-        result = "##### Request Connection Error: " + format(str(e))
-
-    # HTTP Timeout?
-    except requests.exceptions.Timeout as e:
-        ret_code = -3
-        status_code = ""
-        result = "##### Request Timeout Error: " + format(str(e))
-    
-    # HTTP Other?
-    except requests.exceptions.RequestException as e:
-        ret_code = -4
-        status_code = ""
-        result = "##### Request Exception Error: " + format(str(e))
-
-    return(ret_code, status_code, result)
-
-###############################
-# startxLights                #
-###############################
-
-def startxLights(baseURL, xlightsprogram, verbose):
-
-    # xLights Running?
-    request = baseURL + "getVersion"
-    if (verbose):
-        print ("##### Get Version")
-        print ("request=", request)
-    startloop = True
-    started = False
-    retryctr = 0
-    while (startloop):
-        (ret_code, status_code, result) = doRequestsGet(request, 30, verbose)
-        match ret_code:
-            # REST API Connection Successful
-            case 0:
-                startloop = False
-                if (verbose):
-                    print ("ret_code = ", ret_code)
-                    print ("status_code = ", status_code)
-                    print ("result = ", result)
-            # REST API Connection Error?
-            case -2:
-                if (not started):
-                    # Start xLights
-                    cmd = "\"" + xlightsprogram + "\""
-                    if (verbose):
-                        print ("##### Start xLights")
-                        print ("cmd = ", cmd)
-                    try:
-                        cp = subprocess.Popen(cmd)
-                    except:
-                        sys.exit("*** Error in starting xLights %s" % sys.exc_info()[0])
-                
-                    started = True
-                    retryctr = retryctr + 1
-                    if (retryctr <= 10):
-                        time.sleep(3)
-                    else:
-                        startloop = False
-            # REST API Error?
-            case _:
-                startloop = False
-            
-    return(ret_code, status_code, result)
-
 ###############################
 # createParamsStr             #
 ###############################
@@ -198,41 +115,404 @@ def uploadSequence(baseURL, uploadip, uploadmedia, uploadformat, uploadseq, verb
     print ("status_code = ", status_code)
     print ("result = ", result)
 
+    return(status_code)
+
+###############################
+# fseqFileName                #
+###############################
+
+def fseqFileName(fullsequence):
+
+    return(os.path.splitext(fullsequence)[0] + ".fseq")
+
+###############################
+# sequenceMediaFile           #
+###############################
+
+def sequenceMediaFile(fullsequence):
+
+    # Stream only as far as head/mediaFile
+    try:
+        for event, elem in ET.iterparse(fullsequence, events=("end",)):
+            if (elem.tag == "mediaFile"):
+                return(elem.text)
+            if (elem.tag == "head"):
+                break
+    except (ET.ParseError, OSError):
+        pass
+    return(None)
+
+###############################
+# uploadBytes                 #
+###############################
+
+def uploadBytes(fullsequence, uploadmedia):
+
+    # Bytes pushed to the player, the fseq plus the media file when media is uploaded
+    uploadbytes = 0
+    fseqfile = fseqFileName(fullsequence)
+    if os.path.isfile(fseqfile):
+        uploadbytes += os.path.getsize(fseqfile)
+    if (uploadmedia == "true"):
+        mediafile = sequenceMediaFile(fullsequence)
+        if (mediafile is not None) and os.path.isfile(mediafile):
+            uploadbytes += os.path.getsize(mediafile)
+
+    return(uploadbytes)
+
+###############################
+# Upload Manifest             #
+###############################
+
+# Upload Manifest File in the Show Folder
+UPLOAD_MANIFEST = "uploadSequences_manifest.json"
+# Uploads recorded between manifest saves, the rest are saved at the end of the run
+UPLOAD_SAVE_EVERY = 10
+
+###############################
+# fileSignature               #
+###############################
+
+def fileSignature(filename, cached):
+
+    # File Missing?
+    if (filename is None) or not os.path.isfile(filename):
+        return(None)
+    st = os.stat(filename)
+    # Size & Modified Time unchanged? Reuse cached content hash
+    if (cached is not None) and (cached.get("size") == st.st_size) and (cached.get("mtime") == st.st_mtime_ns):
+        return(cached)
+    # Content Hash
+    sha = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for chunk in iter(partial(f.read, 1024 * 1024), b""):
+            sha.update(chunk)
+    return({"hash": sha.hexdigest(), "size": st.st_size, "mtime": st.st_mtime_ns})
+
+###############################
+# loadUploadManifest          #
+###############################
+
+def loadUploadManifest(xlightsshowfolder, verbose):
+
+    manifestfile = os.path.join(xlightsshowfolder, UPLOAD_MANIFEST)
+    controllers = {}
+    if os.path.isfile(manifestfile):
+        try:
+            with open(manifestfile, "r") as f:
+                d1 = json.load(f)
+            controllers = d1.get("controllers", {})
+        except (OSError, ValueError) as e:
+            print ("*** Upload manifest %s ignored: %s" % (manifestfile, e))
+    if (verbose):
+        print ("Upload Manifest = %s" % manifestfile)
+
+    return({"file": manifestfile, "lock": threading.Lock(), "controllers": controllers, "unsaved": 0})
+
+###############################
+# saveUploadManifest          #
+###############################
+
+def saveUploadManifest(manifest):
+
+    # Called with the manifest lock held
+    # Write to a temporary file first so an interrupted run keeps the old manifest
+    tmpfile = manifest["file"] + ".tmp"
+    with open(tmpfile, "w") as f:
+        json.dump({"controllers": manifest["controllers"]}, f, indent=2)
+    os.replace(tmpfile, manifest["file"])
+    manifest["unsaved"] = 0
+
+###############################
+# flushUploadManifest         #
+###############################
+
+def flushUploadManifest(manifest):
+
+    # Save the uploads recorded since the last save
+    with manifest["lock"]:
+        if (manifest["unsaved"] > 0):
+            saveUploadManifest(manifest)
+
+    return()
+
+###############################
+# uploadSignature             #
+###############################
+
+def uploadSignature(uploadseq, uploadmedia, uploadformat, cached, filesigs):
+
+    # fseq hash, media hash when media is uploaded, and format
+    # filesigs {filename: signature} is shared by the controllers of a run so each file is hashed once
+    if (cached is None):
+        cached = {}
+    fseqfile = fseqFileName(uploadseq)
+    fseq = fileSignature(fseqfile, filesigs.get(fseqfile) or cached.get("fseq"))
+    filesigs[fseqfile] = fseq
+    media = None
+    mediafile = None
+    if (uploadmedia == "true"):
+        mediafile = sequenceMediaFile(uploadseq)
+        media = fileSignature(mediafile, filesigs.get(mediafile) or cached.get("media"))
+        filesigs[mediafile] = media
+
+    return({"fseq": fseq, "media": media, "mediafile": mediafile, "format": uploadformat})
+
+###############################
+# uploadUnchanged             #
+###############################
+
+def uploadUnchanged(manifest, uploadseq, uploadip, uploadmedia, uploadformat, filesigs, verbose):
+
+    # Returns the signature too, recordUpload stores it after the upload without hashing again
+    entry = manifest["controllers"].get(uploadip, {}).get(uploadseq)
+    sig = uploadSignature(uploadseq, uploadmedia, uploadformat, entry, filesigs)
+    if (entry is None) or (entry.get("fseq") is None):
+        return(False, sig)
+    # fseq missing or changed?
+    if (sig["fseq"] is None) or (sig["fseq"]["hash"] != entry["fseq"]["hash"]):
+        return(False, sig)
+    # Format changed?
+    if (sig["format"] != entry.get("format")):
+        return(False, sig)
+    # Media uploaded and changed? Sequences without media have nothing to compare
+    if (uploadmedia == "true"):
+        if (sig["mediafile"] != entry.get("mediafile")):
+            return(False, sig)
+        if (sig["mediafile"] is not None):
+            if (sig["media"] is None) or (entry.get("media") is None) or (sig["media"]["hash"] != entry["media"]["hash"]):
+                return(False, sig)
+    if (verbose):
+        print ("Unchanged upload %s Player IP:%s fseq=%s" % (uploadseq, uploadip, sig["fseq"]["hash"]))
+
+    return(True, sig)
+
+###############################
+# recordUpload                #
+###############################
+
+def recordUpload(manifest, uploadseq, uploadip, sig):
+
+    with manifest["lock"]:
+        manifest["controllers"].setdefault(uploadip, {})[uploadseq] = sig
+        # Save every UPLOAD_SAVE_EVERY uploads rather than rewriting the manifest after each one
+        manifest["unsaved"] += 1
+        if (manifest["unsaved"] >= UPLOAD_SAVE_EVERY):
+            saveUploadManifest(manifest)
+
+    return()
+
+###############################
+# fppFileNames                #
+###############################
+
+def fppFileNames(fppURL, fppdir, verbose):
+
+    # FPP API file list, {"files": [{"name": ...}, ...]}
+    request = fppURL + "api/files/" + fppdir
+    if (verbose):
+        print ("request = ", request)
+    (ret_code, status_code, result) = doRequestsGet(request, 30, verbose)
+    if (ret_code < 0) or (status_code != 200):
+        print ("*** Unable to list %s on FPP %s: %s %s" % (fppdir, fppURL, status_code, result))
+        return(None)
+    try:
+        files = json.loads(result).get("files", [])
+    except (ValueError, AttributeError):
+        print ("*** Invalid %s file list from FPP %s" % (fppdir, fppURL))
+        return(None)
+    names = set()
+    for file in files:
+        if isinstance(file, dict):
+            names.add(file.get("name"))
+        else:
+            names.add(file)
+
+    return(names)
+
+###############################
+# verifyUploadManifest        #
+###############################
+
+def verifyUploadManifest(manifest, uploadfileparms_list, verbose):
+
+    # Drop manifest entries whose fseq or media is no longer on the player
+    print ("##### Verify Upload Manifest")
+    for (uploadip, uploadmedia, uploadformat, fppURL) in uploadfileparms_list:
+        entries = manifest["controllers"].get(uploadip, {})
+        if (len(entries) == 0):
+            continue
+        sequences = fppFileNames(fppURL, "sequences", verbose)
+        music = None
+        if any(entry.get("mediafile") for entry in entries.values()):
+            music = fppFileNames(fppURL, "music", verbose)
+        verified = {}
+        for uploadseq, entry in entries.items():
+            # Player not reachable? Upload again
+            if (sequences is None):
+                continue
+            if (os.path.basename(fseqFileName(uploadseq)) not in sequences):
+                continue
+            mediafile = entry.get("mediafile")
+            if (mediafile):
+                if (music is None) or (os.path.basename(mediafile.replace("\\", "/")) not in music):
+                    continue
+            verified[uploadseq] = entry
+        print ("Player IP %s manifest=%s verified=%s dropped=%s" % (uploadip, len(entries), len(verified), len(entries) - len(verified)))
+        manifest["controllers"][uploadip] = verified
+    with manifest["lock"]:
+        saveUploadManifest(manifest)
+
+    return()
+
+###############################
+# uploadWorker                #
+###############################
+
+def uploadWorker(baseURL, uploadQueue, uploadSlots, manifest, stats, verbose):
+
+    # One worker per controller IP, so at most one upload is in flight per player
+    while True:
+        try:
+            (uploadseq, uploadip, uploadmedia, uploadformat, sig) = uploadQueue.get_nowait()
+        except queue.Empty:
+            break
+        # Global Upload Cap
+        with uploadSlots:
+            starttime = time.perf_counter()
+            try:
+                status_code = uploadSequence(baseURL, uploadip, uploadmedia, uploadformat, uploadseq, verbose)
+            except SystemExit as e:
+                # Request Error? Carry on with the next sequence for this player
+                stats["failed"].append(uploadseq)
+                stats["busy"] += time.perf_counter() - starttime
+                print ("*** Upload failed to Player IP:%s for sequence %s: %s" % (uploadip, uploadseq, e.code))
+                continue
+            stats["busy"] += time.perf_counter() - starttime
+        # Upload Rejected?
+        if (status_code != 200):
+            stats["failed"].append(uploadseq)
+            continue
+        recordUpload(manifest, uploadseq, uploadip, sig)
+        stats["uploaded"] += 1
+        stats["bytes"] += uploadBytes(uploadseq, uploadmedia)
+
     return()
 
 ###############################
-# selectAll                   #
+# uploadPool                  #
 ###############################
 
-def selectAll(lb):
-    lb.select_set(0, END)
+def uploadPool(baseURL, SEQsel, uploadfileparms_list, maxuploads, manifest, force, verbose):
+
+    # Upload Queue per Controller IP, sequences in selection order, unchanged uploads skipped
+    uploadQueues = {}
+    skipped = 0
+    filesigs = {}
+    for uploadseq in SEQsel:
+        for (uploadip, uploadmedia, uploadformat, fppURL) in uploadfileparms_list:
+            (unchanged, sig) = uploadUnchanged(manifest, uploadseq, uploadip, uploadmedia, uploadformat, filesigs, verbose)
+            if (not force) and (unchanged):
+                print ("Unchanged Sequence:%s on Player IP:%s skipped" % (uploadseq, uploadip))
+                skipped += 1
+                continue
+            uploadQueues.setdefault(uploadip, queue.Queue()).put((uploadseq, uploadip, uploadmedia, uploadformat, sig))
+    uploadSlots = threading.BoundedSemaphore(max(1, maxuploads))
+
+    # One worker thread per Controller IP
+    statsList = []
+    threads = []
+    starttime = time.perf_counter()
+    for uploadip, uploadQueue in uploadQueues.items():
+        stats = {"ip": uploadip, "uploaded": 0, "failed": [], "bytes": 0, "busy": 0.0}
+        statsList.append(stats)
+        thread = threading.Thread(target=uploadWorker, args=(baseURL, uploadQueue, uploadSlots, manifest, stats, verbose))
+        threads.append(thread)
+        thread.start()
+    # Uploads recorded so far are saved even when the run is interrupted
+    try:
+        for thread in threads:
+            thread.join()
+    finally:
+        flushUploadManifest(manifest)
+    elapsed = time.perf_counter() - starttime
+
+    # Throughput Summary
+    print ("##### Upload Throughput")
+    totaluploaded = 0
+    totalbytes = 0
+    for stats in statsList:
+        totaluploaded += stats["uploaded"]
+        totalbytes += stats["bytes"]
+        print ("Player IP %s uploaded=%s failed=%s MB=%.1f busy=%.1fs" % (stats["ip"], stats["uploaded"], len(stats["failed"]), stats["bytes"] / 1048576, stats["busy"]))
+        for uploadseq in stats["failed"]:
+            print ("   Failed: %s" % uploadseq)
+    if (elapsed > 0):
+        print ("Total uploaded=%s skipped=%s MB=%.1f elapsed=%.1fs sequences/min=%.2f MB/min=%.2f" % (totaluploaded, skipped, totalbytes / 1048576, elapsed, totaluploaded * 60 / elapsed, totalbytes / 1048576 * 60 / elapsed))
+
+    return()
 
 ###############################
-# clearAll                    #
+# loadUploadParms             #
 ###############################
 
-def clearAll(lb):
-    lb.select_clear(0, END)
+def loadUploadParms(baseURL, uploadsequences, verbose):
+
+    # Get Controller IPs 
+    request = baseURL + "getControllerIPs" 
+    if (verbose):
+        print ("##### Get Controller IP Address")
+        print ("request = ", request)    
+    (ret_code, status_code, result) = doRequestsGet(request, 30, verbose)
+    if (ret_code < 0):    
+        print("Unable to connect to xLights REST API %s" % baseURL)
+        print ("ret_code = ", ret_code)
+        print ("result = ", result)
+        sys.exit(ret_code)    
+    if (verbose):
+        print ("status_code = ", status_code)
+        print ("result = ", result)    
+    controllerIPs = result
+    
+    # Compile Searches
+    p1 = re.compile(r"^((25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])\.){3}(25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])$")
+    
+    # Load sequences upload config parms into list
+    uploadfileparms_list = []
+    uploadseqlist = uploadsequences.get('controllers')
+    for i in range(len(uploadseqlist)):
+        uploadctl = uploadseqlist[i]
+        uploadip = uploadctl.get("ip")
+        if (uploadip != None):
+            s1 = p1.search(uploadip)
+            if (not s1):
+                sys.exit("*** ERROR Invalid IPv4 Address %s" % uploadip)
+            if uploadip not in controllerIPs:
+                sys.exit("*** ERROR Controller IP %s not defined in Xlights" % uploadip)
+        else:
+            sys.exit("*** ERROR Controller IP %s not found" % uploadip)
+        uploadmedia = uploadctl.get("media", "false")
+        if uploadmedia not in ["true","false"]:
+           print ("*** Media parm %s invalid on %s changed to default of \"false\"" % uploadip)     
+        uploadformat = uploadctl.get("format", "v2std")
+        if uploadformat not in ["v1", "v2std", "v2zlib", "v2uncompressedsparse", "v2uncompressed", "v2stdsparse", "v2zlibsparse"]:
+           print ("*** Format parm invalid on %s changed to default of \"v2std\"" % uploadip)
+        # FPP API URL, a local FPP stand-in may be given for --verify
+        fppURL = uploadctl.get("fppurl", "http://" + uploadip + "/")
+        uploadfileparms_list.append([uploadip, uploadmedia, uploadformat, fppURL])
+
+    return(uploadfileparms_list)
 
 ###############################
 # selectSequences             #
 ###############################
 
-def selectSequences(window, listSEQ, baseURL, uploadfileparms_list, verbose):
+def selectSequences(SEQsel, baseURL, uploadfileparms_list, maxuploads, manifest, force, verbose):
     if (verbose):
-        print(listSEQ)
+        print(SEQsel)
         print(baseURL)
-    seqSel = listSEQ.curselection()
-    for i in seqSel:
-        uploadseq = str(listSEQ.get(i))
-        for j in range(len(uploadfileparms_list)):
-            uploadip = uploadfileparms_list[j][0]
-            uploadmedia = uploadfileparms_list[j][1]
-            uploadformat = uploadfileparms_list[j][2]
-            # Upload Sequence
-            uploadSequence(baseURL, uploadip, uploadmedia, uploadformat, uploadseq, verbose) 
-    # Close Window
-    window.quit()
+    # Upload Sequences, one upload in flight per player and at most maxuploads in total
+    uploadPool(baseURL, SEQsel, uploadfileparms_list, maxuploads, manifest, force, verbose)
     
 ###############################
 # main                        #
@@ -252,14 +532,29 @@ def main():
     cli_parser.add_argument('-c', '--closexlights' , help = 'Close xLights', action='store_true',
         required = False)
 
+    cli_parser.add_argument('-j', '--maxuploads', help = 'Maximum concurrent uploads, one per player at most', type = int, default = 1,
+        required = False)
+
+    cli_parser.add_argument('-f', '--force', help = 'Upload even when the player already has an identical fseq', action='store_true',
+        required = False)
+
+    cli_parser.add_argument('--verify', help = 'Verify the upload manifest against the FPP file lists before uploading', action='store_true',
+        required = False)
+
     cli_parser.add_argument('-v', '--verbose', help = 'Verbose Logging', action='store_true',
         required = False)
 
+    ### Selection Arguments
+    addSelectArguments(cli_parser)
+
     ### Get Arguments
     args = cli_parser.parse_args()
     
     xlightsshowfolder = os.path.abspath(args.xlightsshowfolder)
     closexlights = args.closexlights
+    maxuploads = args.maxuploads
+    force = args.force
+    verify = args.verify
     verbose = args.verbose
 
     ### Current Working Directory
@@ -272,12 +567,16 @@ def main():
     ### Get xLights Parms
     xlightsipaddress = xlightsparms.get("xlightsipaddress")
     xlightsport = xlightsparms.get("xlightsport")
-    # Replace xlightsport with real port value
-    if (xlightsport == "A"):
-        xlightsport = "49913"
-    elif (xlightsport == "B"):
-        xlightsport = "49914"
+    # Replace xlightsport with real port value (first port of a list)
+    xlightsport = getxLightsPorts(xlightsport)[0]
     xlightsprogram = xlightsparms.get("xlightsprogram")
+    xlightspoolsize = xlightsparms.get("xlightspoolsize", DEFAULT_POOL_SIZE)
+    xlightsmetricsfolder = xlightsparms.get("xlightsmetricsfolder")
+    # Init xLights REST API Session, one connection per concurrent upload
+    initSession(max(int(xlightspoolsize), maxuploads), verbose)
+    # Write REST API Metrics at exit, only when xlightsparms.json has a metrics folder
+    if (xlightsmetricsfolder is not None):
+        startRequestMetrics(xlightsmetricsfolder, verbose)
 
     if (verbose):
         print ("Upload Sequence CSV File = %s" % uploadcsvfile)
@@ -286,6 +585,9 @@ def main():
         print ("xLights Port = %s" % xlightsport)
         print ("xLights Program Folder = %s" % xlightsprogram)
         print ("Close xLights = %s" % closexlights)
+        print ("Max Uploads = %s" % maxuploads)
+        print ("Force = %s" % force)
+        print ("Verify = %s" % verify)
     
     uploadsequencesfilename = "uploadsequences.json"
     # verify upload seuqences json file exists
@@ -361,100 +663,30 @@ def main():
             print ("status_code = ", status_code)
             print ("result = ", result)
             
-    # Get Controller IPs 
-    request = baseURL + "getControllerIPs" 
-    if (verbose):
-        print ("##### Get Controller IP Address")
-        print ("request = ", request)    
-    (ret_code, status_code, result) = doRequestsGet(request, 30, verbose)
-    if (ret_code < 0):    
-        print("Unable to connect to xLights REST API %s" % baseURL)
-        print ("ret_code = ", ret_code)
-        print ("result = ", result)
-        sys.exit(ret_code)    
-    if (verbose):
-        print ("status_code = ", status_code)
-        print ("result = ", result)    
-    controllerIPs = result
-    
-    # Compile Searches
-    p1 = re.compile(r"^((25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])\.){3}(25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])$")
-    
     # Load sequences upload config parms into list
-    uploadfileparms_list = []
-    uploadseqlist = uploadsequences.get('controllers')
-    for i in range(len(uploadseqlist)):
-        uploadctl = uploadseqlist[i]
-        uploadip = uploadctl.get("ip")
-        if (uploadip != None):
-            s1 = p1.search(uploadip)
-            if (not s1):
-                sys.exit("*** ERROR Invalid IPv4 Address %s" % uploadip)
-            if uploadip not in controllerIPs:
-                sys.exit("*** ERROR Controller IP %s not defined in Xlights" % uploadip)
-        else:
-            sys.exit("*** ERROR Controller IP %s not found" % uploadip)
-        uploadmedia = uploadctl.get("media", "false")
-        if uploadmedia not in ["true","false"]:
-           print ("*** Media parm %s invalid on %s changed to default of \"false\"" % uploadip)     
-        uploadformat = uploadctl.get("format", "v2std")
-        if uploadformat not in ["v1", "v2std", "v2zlib", "v2uncompressedsparse", "v2uncompressed", "v2stdsparse", "v2zlibsparse"]:
-           print ("*** Format parm invalid on %s changed to default of \"v2std\"" % uploadip)
-        uploadfileparms_list.append([uploadip, uploadmedia, uploadformat])
+    uploadfileparms_list = loadUploadParms(baseURL, uploadsequences, verbose)
+
+    # Load Upload Manifest
+    manifest = loadUploadManifest(xlightsshowfolder, verbose)
+    if (verify):
+        verifyUploadManifest(manifest, uploadfileparms_list, verbose)
 
     # Build Sequence List
-    SEQlist = []
-    ### OS Walk Show Folder Recursively
-    for root, dir, files in os.walk(xlightsshowfolder):
-        for file in files:
-            # xLights Sequence File?
-            if (file.endswith(".xsq")):
-                fullsequence = os.path.join(root, file)
-                found = fullsequence.find("Backup\\")
-                # xLights Sequence File not in the Backup folder?
-                if (found < 0):
-                    sequence = file
-                    if (verbose):
-                        print ("sequence = ", sequence)
-                        print ("fullsequence = ", fullsequence)
-                    SEQlist.append(fullsequence)
-
-    # Upload Sequences Selection Window
-    window = Tk()
-    window.title('Upload Sequences')
-    window.geometry("520x520")
-
-    Label(window, text="Select Sequences to Upload").pack()
-
-    frame = Frame(window)
-    frame.pack()
-
-    listSEQ = Listbox(frame, width=50, height=20, font=("Helvetica", 12), selectmode = "multiple")
-    listSEQ.pack(padx = 10, pady = 10, expand = YES, fill = "both")
-
-    # Vertical Scrollbar
-    scroll_V = Scrollbar(frame, orient="vertical")
-    scroll_V.config(command=listSEQ.yview)
-    scroll_V.pack(side="right", fill="y")
-    # Horizontal Scrollbar
-    scroll_H = Scrollbar(frame, orient="horizontal")
-    scroll_H.config(command=listSEQ.xview)
-    scroll_H.pack(side= BOTTOM, fill= "x")
-    # List Config
-    listSEQ.config(yscrollcommand=scroll_V.set, xscrollcommand=scroll_H.set)
-    # Load Sequence List
-    for i in range(len(SEQlist)):
-        listSEQ.insert(END, SEQlist[i])
-    
-    allButton = Button(window, text="Select All", command = partial(selectAll, listSEQ)).pack(side = LEFT, padx=10)
-    clearButton = Button(window, text="Clear All", command = partial(clearAll, listSEQ)).pack(side = LEFT, padx=10)
-    uploadButton = Button(window, text="Upload", command = lambda: selectSequences(window, listSEQ, baseURL, uploadfileparms_list, verbose)).pack(side = LEFT, padx=10)
-    cancelButton = Button(window, text="Cancel", command = window.destroy).pack(side = LEFT, padx=10)
+    SEQlist = getSequenceList(xlightsshowfolder, verbose)
 
-    window.mainloop()
+    # Sequence Selection, headless with --all/--select otherwise a selection window
+    if isHeadless(args):
+        SEQsel = selectMatching(SEQlist, [sequenceKeys(fullsequence, xlightsshowfolder) for fullsequence in SEQlist], args.all, args.select, verbose)
+    else:
+        SEQsel = selectListbox('Upload Sequences', "Select Sequences to Upload", "520x520", SEQlist, "Upload", verbose)
+    # Selection Cancelled?
+    if (SEQsel is not None):
+        selectSequences(SEQsel, baseURL, uploadfileparms_list, maxuploads, manifest, force, verbose)
 
     ### Close xLights
-    if (closexlights):
+    if (closexlights) and (baseURL in supervisedURLs(verbose)):
+        print ("##### xLights %s left running for the xLights Supervisor" % baseURL)
+    elif (closexlights):
         request = baseURL + "closexLights"
         if (verbose):
             print("##### closexLights")
@@ -466,6 +698,10 @@ def main():
             print("result = ", result)
             sys.exit(ret_code)
 
+    # REST API Timings
+    if (verbose):
+        printRequestTimings()
+
     print ("#" *5 + " uploadSequences End")
 
 if __name__ == "__main__":
@@ -0,0 +1,501 @@
+#!/usr/bin/env python
+
+# Name: xlMockServer.py
+# Purpose: Local stand-in for the xLights REST API, for benchmarks and offline testing of the scripts
+# Author: Bill Jenkins
+# Version: v2.1
+# Date: 08/24/2023
+
+###############################
+# Imports                     #
+###############################
+
+import argparse
+import sys
+import os
+import time
+import json
+import random
+import threading
+import tempfile
+import zlib
+import urllib.parse
+import http.server
+import xml.etree.ElementTree as ET
+
+###############################
+# From Imports                #
+###############################
+
+from xlclient import getxLightsPorts
+
+###############################
+# Mock Globals                #
+###############################
+
+MOCK_VERSION = "2023.14 (xlMockServer)"
+
+# Endpoints that need an open sequence
+SEQUENCE_ENDPOINTS = ["saveSequence", "closeSequence", "renderAll", "cleanupFileLocations", "exportVideoPreview", "packageSequence"]
+
+# Latency Distributions, times in milliseconds
+LATENCY_DISTRIBUTIONS = ["fixed", "uniform", "normal", "lognormal", "exponential"]
+
+# Mock State shared by the request threads
+mockState = {"lock": threading.Lock(), "showfolder": None, "networksxmlfile": None, "sequence": None,
+             "controllers": [], "controllerIPs": [], "config": {}, "scale": 1.0, "fseqbytes": 0,
+             "outputfolder": None, "random": random.Random(), "seed": 0, "stats": {}, "server": None, "verbose": False,
+             "players": {}}
+
+###############################
+# loadMockConfig              #
+###############################
+
+def loadMockConfig(configfile, verbose):
+
+    # No Config? No latency and no failures
+    if (configfile == "NONE"):
+        return({})
+    if not os.path.isfile(configfile):
+        print("Error: Mock config json file not found %s" % configfile)
+        sys.exit(-1)
+    with open(configfile, "r") as f:
+        config = json.load(f)
+    # Verify Latency Distributions
+    endpoints = dict(config.get("endpoints", {}))
+    endpoints["default"] = config.get("default", {})
+    for endpoint, endpointconfig in endpoints.items():
+        dist = endpointconfig.get("latency", {}).get("dist", "fixed")
+        if dist not in LATENCY_DISTRIBUTIONS:
+            print("Error: Invalid latency distribution %s for %s, valid values are %s" % (dist, endpoint, LATENCY_DISTRIBUTIONS))
+            sys.exit(-1)
+    if (verbose):
+        print ("Mock Config = %s" % config)
+
+    return(config)
+
+###############################
+# endpointConfig              #
+###############################
+
+def endpointConfig(config, endpoint):
+
+    # Endpoint settings over the default settings
+    endpointconfig = dict(config.get("default", {}))
+    endpointconfig.update(config.get("endpoints", {}).get(endpoint, {}))
+    return(endpointconfig)
+
+###############################
+# sampleLatency               #
+###############################
+
+def sampleLatency(latency, rnd, scale):
+
+    # Seconds to wait before answering
+    dist = latency.get("dist", "fixed")
+    if (dist == "uniform"):
+        ms = rnd.uniform(latency.get("min_ms", 0), latency.get("max_ms", 0))
+    elif (dist == "normal"):
+        ms = rnd.gauss(latency.get("mean_ms", 0), latency.get("sd_ms", 0))
+    elif (dist == "lognormal"):
+        # Median and sigma of the underlying normal, a long right tail like renderAll
+        ms = latency.get("median_ms", 0) * rnd.lognormvariate(0, latency.get("sigma", 0))
+    elif (dist == "exponential"):
+        mean = latency.get("mean_ms", 0)
+        ms = rnd.expovariate(1 / mean) if (mean > 0) else 0
+    else:
+        ms = latency.get("ms", 0)
+    return(max(0, ms) * scale / 1000)
+
+###############################
+# loadNetworks                #
+###############################
+
+def loadNetworks(networksxmlfile, verbose):
+
+    # Canned getControllers & getControllerIPs payloads from xlights_networks.xml
+    controllers = []
+    controllerIPs = []
+    if (networksxmlfile is None) or not os.path.isfile(networksxmlfile):
+        print ("*** Networks XML file not found %s, no controllers" % networksxmlfile)
+        return(controllers, controllerIPs)
+    xmlNetRoot = ET.parse(networksxmlfile).getroot()
+    for Controller in xmlNetRoot.findall('Controller'):
+        networks = Controller.findall('network')
+        channels = 0
+        for network in networks:
+            try:
+                channels += int(network.get("MaxChannels", "0"))
+            except ValueError:
+                pass
+        ip = Controller.get("IP", "")
+        controllers.append({"name": Controller.get("Name", ""), "desc": Controller.get("Description", ""),
+            "type": Controller.get("Type", ""), "vendor": Controller.get("Vendor", ""), "model": Controller.get("Model", ""),
+            "variant": Controller.get("Variant", ""), "protocol": Controller.get("Protocol", ""), "id": Controller.get("Id", ""),
+            "ip": ip, "active": (Controller.get("Active", "1") == "1"), "autosize": (Controller.get("AutoSize", "0") == "1"),
+            "channels": channels, "universes": len(networks)})
+        if (ip != ""):
+            controllerIPs.append(ip)
+    if (verbose):
+        print ("Networks XML File = %s controllers = %s" % (networksxmlfile, len(controllers)))
+
+    return(controllers, controllerIPs)
+
+###############################
+# changeShowFolder            #
+###############################
+
+def changeShowFolder(showfolder, verbose):
+
+    # Networks XML file name relative to the show folder unless it is a full path
+    networksxmlfile = os.path.join(showfolder, mockState["networksxmlfile"])
+    (controllers, controllerIPs) = loadNetworks(networksxmlfile, verbose)
+    with mockState["lock"]:
+        mockState["showfolder"] = showfolder
+        mockState["sequence"] = None
+        mockState["controllers"] = controllers
+        mockState["controllerIPs"] = controllerIPs
+
+    return()
+
+###############################
+# writeCheckOutput            #
+###############################
+
+def writeCheckOutput(fullsequence):
+
+    # Check Sequence output with a repeatable number of errors and warnings per sequence
+    rnd = random.Random(zlib.crc32(fullsequence.encode()) + mockState["seed"])
+    errors = rnd.choice([0, 0, 0, 1, 2])
+    warnings = rnd.randint(0, 5)
+    lines = ["Checking sequence file: %s" % fullsequence, "Show folder: %s" % mockState["showfolder"],
+             "Sequence: %s" % fullsequence, "", "Checking models"]
+    for i in range(errors):
+        lines.append("    ERR: Model group 'Group%s' refers to non existent model 'Model%s'." % (i, rnd.randint(0, 999)))
+    lines.append("Checking effects")
+    for i in range(warnings):
+        lines.append("    WARN: Effect on model 'Model%s' references file 'image%s.png' which does not exist." % (rnd.randint(0, 999), i))
+    lines.append("Errors: %s. Warnings: %s" % (errors, warnings))
+    outputfile = os.path.join(mockState["outputfolder"], "CheckSequence_%08x.txt" % zlib.crc32(fullsequence.encode()))
+    with open(outputfile, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+    return(outputfile)
+
+###############################
+# sequenceMediaName           #
+###############################
+
+def sequenceMediaName(fullsequence):
+
+    # Media file name from the sequence head, as the player stores it in its music folder
+    try:
+        for event, elem in ET.iterparse(fullsequence, events=("end",)):
+            if (elem.tag == "mediaFile"):
+                return(os.path.basename(elem.text.replace("\\", "/")) if (elem.text) else None)
+            if (elem.tag == "head"):
+                break
+    except (ET.ParseError, OSError):
+        pass
+    return(None)
+
+###############################
+# recordPlayerFiles           #
+###############################
+
+def recordPlayerFiles(query):
+
+    # Files an uploadSequence leaves on the player, listed by the FPP api/files stand-in
+    param = lambda key: query.get(key, [""])[0]
+    fullsequence = param("seq")
+    with mockState["lock"]:
+        player = mockState["players"].setdefault(param("ip"), {"sequences": {}, "music": {}})
+        fseqfile = os.path.splitext(fullsequence)[0] + ".fseq"
+        player["sequences"][os.path.basename(fseqfile.replace("\\", "/"))] = os.path.getsize(fseqfile) if os.path.isfile(fseqfile) else 0
+        if (param("media") == "true"):
+            mediaName = sequenceMediaName(fullsequence)
+            if (mediaName is not None):
+                player["music"][mediaName] = 0
+
+    return()
+
+###############################
+# playerFiles                 #
+###############################
+
+def playerFiles(path):
+
+    # FPP API file list, /fpp/<ip>/api/files/<dir> for one player, /api/files/<dir> for every player
+    parts = path.strip("/").split("/")
+    if (parts[0] == "fpp") and (len(parts) == 5):
+        players = [mockState["players"].get(parts[1], {})]
+        parts = parts[2:]
+    else:
+        players = list(mockState["players"].values())
+    if (len(parts) != 3) or (parts[0:2] != ["api", "files"]) or (parts[2] not in ["sequences", "music"]):
+        return(404, json.dumps({"status": "ERROR", "message": "Unknown FPP API %s" % path}))
+    files = {}
+    with mockState["lock"]:
+        for player in players:
+            files.update(player.get(parts[2], {}))
+    return(200, json.dumps({"status": "OK", "files": [{"name": name, "sizeBytes": size} for (name, size) in sorted(files.items())]}))
+
+###############################
+# mockResponse                #
+###############################
+
+def mockResponse(endpoint, query, path):
+
+    # Status code and body for one REST API call
+    param = lambda key: query.get(key, [""])[0]
+    ok = json.dumps({"res": 200, "msg": "%s done (mock)" % endpoint})
+
+    if (endpoint in SEQUENCE_ENDPOINTS) and (mockState["sequence"] is None):
+        return(503, json.dumps({"res": 503, "msg": "No sequence open"}))
+    if (endpoint == "getVersion"):
+        return(200, MOCK_VERSION)
+    elif (endpoint == "getShowFolder"):
+        return(200, mockState["showfolder"])
+    elif (endpoint == "changeShowFolder"):
+        showfolder = param("folder")
+        if not os.path.isdir(showfolder):
+            return(404, json.dumps({"res": 404, "msg": "Show folder not found %s" % showfolder}))
+        changeShowFolder(showfolder, mockState["verbose"])
+        return(200, ok)
+    elif (endpoint == "openSequence"):
+        fullsequence = param("seq")
+        if not os.path.isfile(fullsequence):
+            return(404, json.dumps({"res": 404, "msg": "Sequence not found %s" % fullsequence}))
+        mockState["sequence"] = fullsequence
+        return(200, ok)
+    elif (endpoint == "closeSequence"):
+        mockState["sequence"] = None
+        return(200, ok)
+    elif (endpoint == "renderAll"):
+        # Rendered fseq written only when asked for, e.g. to exercise the renderAll manifest
+        if (mockState["fseqbytes"] > 0):
+            with open(os.path.splitext(mockState["sequence"])[0] + ".fseq", "wb") as f:
+                f.write(b"PSEQ" + os.urandom(mockState["fseqbytes"]))
+        return(200, ok)
+    elif (endpoint == "checkSequence"):
+        fullsequence = param("seq")
+        if not os.path.isfile(fullsequence):
+            return(404, json.dumps({"res": 404, "msg": "Sequence not found %s" % fullsequence}))
+        return(200, json.dumps({"res": 200, "output": writeCheckOutput(fullsequence)}))
+    elif (endpoint == "getControllers"):
+        return(200, json.dumps(mockState["controllers"]))
+    elif (endpoint == "getControllerIPs"):
+        return(200, json.dumps(mockState["controllerIPs"]))
+    elif (endpoint in ["uploadSequence", "uploadController", "uploadFPPConfig"]):
+        if param("ip") not in mockState["controllerIPs"]:
+            return(503, json.dumps({"res": 503, "msg": "Controller %s not found" % param("ip")}))
+        if (endpoint == "uploadSequence"):
+            recordPlayerFiles(query)
+        return(200, ok)
+    elif (endpoint in ["api", "fpp"]):
+        return(playerFiles(path))
+    elif (endpoint in ["saveSequence", "cleanupFileLocations", "exportVideoPreview", "packageSequence", "exportModelsCSV", "saveLayout", "closexLights"]):
+        return(200, ok)
+    elif (endpoint == "mockStats"):
+        with mockState["lock"]:
+            return(200, json.dumps(mockState["stats"]))
+    elif (endpoint == "mockReset"):
+        with mockState["lock"]:
+            mockState["stats"] = {}
+        return(200, ok)
+
+    return(404, json.dumps({"res": 404, "msg": "Unknown endpoint %s" % endpoint}))
+
+###############################
+# recordCall                  #
+###############################
+
+def recordCall(endpoint, outcome, latency, nbytes):
+
+    # Mock statistics calls are not counted
+    if (endpoint in ["mockStats", "mockReset"]):
+        return()
+    with mockState["lock"]:
+        stats = mockState["stats"].setdefault(endpoint, {"calls": 0, "latency": 0.0, "bytes": 0})
+        stats["calls"] += 1
+        stats["latency"] += latency
+        stats["bytes"] += nbytes
+        stats[outcome] = stats.get(outcome, 0) + 1
+
+    return()
+
+###############################
+# MockHandler                 #
+###############################
+
+class MockHandler(http.server.BaseHTTPRequestHandler):
+
+    # Keep-alive like xLights, the scripts share one pooled session
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+
+        url = urllib.parse.urlsplit(self.path)
+        endpoint = url.path.strip("/").split("/")[0]
+        query = urllib.parse.parse_qs(url.query)
+        endpointconfig = endpointConfig(mockState["config"], endpoint)
+        with mockState["lock"]:
+            latency = sampleLatency(endpointconfig.get("latency", {}), mockState["random"], mockState["scale"])
+            failure = mockState["random"].random()
+        if (mockState["verbose"]):
+            print ("%s latency = %.3fs" % (self.path, latency))
+        time.sleep(latency)
+
+        # Failure Injection, crash, dropped connection, hang or HTTP 500
+        rate = 0.0
+        for outcome in ["crash", "drop", "hang", "error"]:
+            rate += endpointconfig.get(outcome + "_rate", 0.0)
+            if (failure < rate):
+                break
+        else:
+            outcome = "ok"
+        if (outcome == "crash"):
+            print ("*** Injected crash in %s" % endpoint)
+            os._exit(3)
+        if (outcome == "drop"):
+            recordCall(endpoint, outcome, latency, 0)
+            self.close_connection = True
+            return
+        if (outcome == "hang"):
+            time.sleep(endpointconfig.get("hang_s", 60))
+        if (outcome == "error"):
+            (status, body) = (500, json.dumps({"res": 500, "msg": "Injected error in %s" % endpoint}))
+        else:
+            (status, body) = mockResponse(endpoint, query, url.path)
+            if (status != 200):
+                outcome = "http%s" % status
+
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json" if body.startswith(("{", "[")) else "text/plain")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        recordCall(endpoint, outcome, latency, len(data))
+
+        # Close xLights? Stop after the answer like xLights does
+        if (endpoint == "closexLights") and (outcome == "ok"):
+            threading.Thread(target=mockState["server"].shutdown).start()
+
+    def log_message(self, format, *args):
+        pass
+
+###############################
+# printMockStats              #
+###############################
+
+def printMockStats():
+
+    print ("##### Mock REST API Calls")
+    for endpoint in sorted(mockState["stats"]):
+        stats = mockState["stats"][endpoint]
+        outcomes = ", ".join("%s=%s" % (key, value) for key, value in sorted(stats.items()) if key not in ["calls", "latency", "bytes"])
+        print ("%-24s calls=%-6s latency=%9.3fs bytes=%-9s %s" % (endpoint, stats["calls"], stats["latency"], stats["bytes"], outcomes))
+
+    return()
+
+###############################
+# main                        #
+###############################
+
+def main():
+
+    print ("#" *5 + " xlMockServer Begin")
+
+    cli_parser = argparse.ArgumentParser(prog = 'xlMockServer',
+        description = '''%(prog)s is a local stand-in for the xLights REST API used by the scripts,''')
+
+    ### Define Arguments
+
+    cli_parser.add_argument('-s', '--xlightsshowfolder', help = 'Initial xLights Show Folder', default = ".",
+        required = False)
+
+    cli_parser.add_argument('-p', '--port', help = 'REST API Port, default first xlightsparms.json port', default = "NONE",
+        required = False)
+
+    cli_parser.add_argument('-n', '--networksxmlfile', help = 'Networks XML File in the Show Folder', default = "xlights_networks.xml",
+        required = False)
+
+    cli_parser.add_argument('-l', '--latencyconfig', help = 'Latency & Failure Injection json file', default = "NONE",
+        required = False)
+
+    cli_parser.add_argument('-x', '--scale', help = 'Latency scale, 0 for no latency', type = float, default = 1.0,
+        required = False)
+
+    cli_parser.add_argument('-b', '--fseqbytes', help = 'renderAll writes an fseq of this many bytes, 0 for none', type = int, default = 0,
+        required = False)
+
+    cli_parser.add_argument('--seed', help = 'Random seed', type = int, default = 2023,
+        required = False)
+
+    cli_parser.add_argument('-v', '--verbose', help = 'Verbose Logging', action='store_true',
+        required = False)
+
+    ### Get Arguments
+    args = cli_parser.parse_args()
+
+    xlightsshowfolder = os.path.abspath(args.xlightsshowfolder)
+    port = args.port
+    verbose = args.verbose
+
+    # Port from xlightsparms.json?
+    if (port == "NONE"):
+        xlightsparmsfilename = "xlightsparms.json"
+        if os.path.isfile(xlightsparmsfilename):
+            with open(xlightsparmsfilename, "r") as xlightsparmsfile:
+                xlightsparms = json.load(xlightsparmsfile)
+            port = getxLightsPorts(xlightsparms.get("xlightsport", "A"))[0]
+        else:
+            port = getxLightsPorts("A")[0]
+    else:
+        port = getxLightsPorts(port)[0]
+
+    # Verify Show Folder
+    if not os.path.isdir(xlightsshowfolder):
+        print("Error: xLights Show Folder not found %s" % xlightsshowfolder)
+        sys.exit(-1)
+
+    mockState["config"] = loadMockConfig(args.latencyconfig, verbose)
+    mockState["scale"] = args.scale
+    mockState["fseqbytes"] = args.fseqbytes
+    mockState["seed"] = args.seed
+    mockState["random"] = random.Random(args.seed)
+    mockState["networksxmlfile"] = args.networksxmlfile
+    mockState["verbose"] = verbose
+    # Check Sequence output files
+    mockState["outputfolder"] = os.path.join(tempfile.gettempdir(), "xlMockServer")
+    os.makedirs(mockState["outputfolder"], exist_ok = True)
+    changeShowFolder(xlightsshowfolder, verbose)
+
+    if (verbose):
+        print ("xLights Show Folder = %s" % xlightsshowfolder)
+        print ("Port = %s" % port)
+        print ("Latency Config = %s" % args.latencyconfig)
+        print ("Latency Scale = %s" % args.scale)
+        print ("fseq Bytes = %s" % args.fseqbytes)
+        print ("Check Output Folder = %s" % mockState["outputfolder"])
+
+    try:
+        mockState["server"] = http.server.ThreadingHTTPServer(("127.0.0.1", int(port)), MockHandler)
+    except OSError as e:
+        print("Error: Unable to listen on port %s: %s" % (port, e))
+        sys.exit(-1)
+    mockState["server"].daemon_threads = True
+    print ("##### xLights mock REST API on http://127.0.0.1:%s/" % port)
+    try:
+        mockState["server"].serve_forever()
+    except KeyboardInterrupt:
+        print ("##### xlMockServer interrupted")
+    mockState["server"].server_close()
+
+    printMockStats()
+
+    print ("#" *5 + " xlMockServer End")
+
+if __name__ == "__main__":
+    main()
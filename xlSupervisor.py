@@ -0,0 +1,345 @@
+#!/usr/bin/env python
+
+# Name: xlSupervisor.py
+# Purpose: Keep warm xLights instances running for the other scripts, health check and restart them
+# Author: Bill Jenkins
+# Version: v2.1
+# Date: 08/24/2023
+
+###############################
+# Imports                     #
+###############################
+
+import argparse
+import sys
+import os
+import time
+import json
+import datetime
+import subprocess
+import threading
+
+###############################
+# From Imports                #
+###############################
+
+from xlclient import *
+
+###############################
+# Supervisor Globals          #
+###############################
+
+# Seconds to wait for an instance to stop before it is killed
+STOP_TIMEOUT = 10
+# Lock file written by the health check loop and the heartbeat thread
+supervisorLockLock = threading.Lock()
+
+###############################
+# writeSupervisorLock         #
+###############################
+
+def writeSupervisorLock(instances, interval, started):
+
+    # Scripts read the base URLs from the lock file, a fresh heartbeat means the supervisor is alive
+    d1 = {"pid": os.getpid(), "started": started, "interval": interval, "heartbeat": time.time(),
+          "instances": [{"baseURL": instance["baseURL"], "status": instance["status"], "pid": instance["pid"],
+                         "restarts": instance["restarts"], "lastcheck": instance["lastcheck"],
+                         "startup": instance["startup"]} for instance in instances]}
+    # Write to a temporary file first so a script never reads half a lock file
+    tmpfile = SUPERVISOR_LOCK + ".tmp"
+    with supervisorLockLock:
+        with open(tmpfile, "w") as f:
+            json.dump(d1, f, indent=2)
+        os.replace(tmpfile, SUPERVISOR_LOCK)
+
+    return()
+
+###############################
+# heartbeatThread             #
+###############################
+
+def heartbeatThread(instances, interval, started, stopevent):
+
+    # Heartbeat every interval, also while a restart waits up to READY_DEADLINE for xLights to be ready
+    while not stopevent.wait(interval):
+        writeSupervisorLock(instances, interval, started)
+
+    return()
+
+###############################
+# stopInstance                #
+###############################
+
+def stopInstance(instance, verbose):
+
+    # Only instances started by the supervisor can be stopped, an adopted instance is left alone
+    process = instance["process"]
+    if (process is None) or (process.poll() is not None):
+        return()
+    if (verbose):
+        print ("##### Stop xLights %s pid = %s" % (instance["baseURL"], process.pid))
+    process.terminate()
+    try:
+        process.wait(STOP_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+    return()
+
+###############################
+# startInstance               #
+###############################
+
+def startInstance(instance, xlightsprogram, deadline, verbose):
+
+    # Running already? Adopt it
+    if portOpen(instance["baseURL"], READY_PROBE_TIMEOUT):
+        (ret_code, status_code, result) = doRequestsGet(instance["baseURL"] + "getVersion", 30, verbose)
+        if (ret_code == 0):
+            print ("##### xLights %s already running" % instance["baseURL"])
+            instance["status"] = "ready"
+            instance["failures"] = 0
+            return()
+    instance["process"] = launchxLights(xlightsprogram, verbose)
+    instance["pid"] = instance["process"].pid
+    instance["status"] = "starting"
+    (ret_code, status_code, result, elapsed) = waitxLightsReady(instance["baseURL"], deadline, verbose)
+    recordStartupTime(instance["baseURL"], xlightsprogram, elapsed, ret_code, verbose)
+    instance["startup"] = round(elapsed, 3)
+    if (ret_code == 0):
+        instance["status"] = "ready"
+        instance["failures"] = 0
+    else:
+        print ("*** xLights %s not ready: %s" % (instance["baseURL"], result))
+        instance["status"] = "failed"
+
+    return()
+
+###############################
+# checkInstance               #
+###############################
+
+def checkInstance(instance, healthtimeout, maxfailures, xlightsprogram, deadline, verbose):
+
+    instance["lastcheck"] = datetime.datetime.now().isoformat(timespec="seconds")
+    # Process started by the supervisor ended? e.g. xLights crashed in packageSequence
+    process = instance["process"]
+    if (process is not None) and (process.poll() is not None):
+        print ("*** xLights %s pid = %s exited with %s" % (instance["baseURL"], process.pid, process.returncode))
+        instance["failures"] = maxfailures
+    else:
+        (ret_code, status_code, result) = doRequestsGet(instance["baseURL"] + "getVersion", healthtimeout, verbose)
+        if (ret_code == 0):
+            if (instance["status"] != "ready") and (verbose):
+                print ("##### xLights %s ready" % instance["baseURL"])
+            instance["status"] = "ready"
+            instance["failures"] = 0
+            return()
+        instance["failures"] += 1
+        print ("*** xLights %s health check %s of %s failed: %s" % (instance["baseURL"], instance["failures"], maxfailures, result))
+        instance["status"] = "unhealthy"
+
+    # Restart after maxfailures health checks in a row
+    if (instance["failures"] >= maxfailures):
+        print ("##### Restart xLights %s" % instance["baseURL"])
+        stopInstance(instance, verbose)
+        instance["process"] = None
+        instance["pid"] = None
+        instance["restarts"] += 1
+        startInstance(instance, xlightsprogram, deadline, verbose)
+
+    return()
+
+###############################
+# superviseInstances          #
+###############################
+
+def superviseInstances(baseURLList, xlightsprogram, interval, healthtimeout, maxfailures, deadline, closexlights, verbose):
+
+    started = datetime.datetime.now().isoformat(timespec="seconds")
+    instances = []
+    for baseURL in baseURLList:
+        instances.append({"baseURL": baseURL, "process": None, "pid": None, "status": "starting",
+                          "restarts": 0, "failures": 0, "lastcheck": None, "startup": None})
+
+    # Start xLights Instances
+    writeSupervisorLock(instances, interval, started)
+    # Heartbeat Thread, a start or restart blocks the health check loop longer than the 3 intervals of a stale lock
+    stopevent = threading.Event()
+    heartbeat = threading.Thread(target=heartbeatThread, args=(instances, interval, started, stopevent), daemon=True)
+    heartbeat.start()
+    try:
+        for instance in instances:
+            startInstance(instance, xlightsprogram, deadline, verbose)
+            writeSupervisorLock(instances, interval, started)
+        print ("##### xLights Supervisor ready %s" % [instance["baseURL"] for instance in instances if instance["status"] == "ready"])
+
+        # Health Check until interrupted
+        while True:
+            time.sleep(interval)
+            for instance in instances:
+                checkInstance(instance, healthtimeout, maxfailures, xlightsprogram, deadline, verbose)
+            writeSupervisorLock(instances, interval, started)
+            if (verbose):
+                print ("%s %s" % (datetime.datetime.now().isoformat(timespec="seconds"),
+                    ", ".join("%s %s restarts=%s" % (instance["baseURL"], instance["status"], instance["restarts"]) for instance in instances)))
+    except KeyboardInterrupt:
+        print ("##### xLights Supervisor interrupted")
+    stopevent.set()
+    heartbeat.join()
+
+    # Remove the lock first so scripts stop handing out the instances
+    if os.path.isfile(SUPERVISOR_LOCK):
+        os.remove(SUPERVISOR_LOCK)
+    ### Close xLights
+    if (closexlights):
+        for instance in instances:
+            request = instance["baseURL"] + "closexLights"
+            if (verbose):
+                print("##### closexLights")
+                print("request = ", request)
+            (ret_code, status_code, result) = doRequestsGet(request, 30, verbose)
+            if (ret_code < 0):
+                print("Unable to close xLights %s" % instance["baseURL"])
+                print("ret_code = ", ret_code)
+                print("result = ", result)
+                stopInstance(instance, verbose)
+
+    return()
+
+###############################
+# printSupervisorStatus       #
+###############################
+
+def printSupervisorStatus():
+
+    if not os.path.isfile(SUPERVISOR_LOCK):
+        print ("xLights Supervisor not running, no %s" % SUPERVISOR_LOCK)
+        return()
+    with open(SUPERVISOR_LOCK, "r") as f:
+        d1 = json.load(f)
+    age = time.time() - d1.get("heartbeat", 0)
+    print ("xLights Supervisor pid = %s started = %s heartbeat = %.0fs ago%s" % (d1.get("pid"), d1.get("started"), age,
+        " (stale)" if age > 3 * d1.get("interval", 0) else ""))
+    for instance in d1.get("instances", []):
+        print ("%-28s status = %-9s pid = %-7s restarts = %-3s startup = %ss lastcheck = %s" % (instance["baseURL"], instance["status"],
+            instance["pid"], instance["restarts"], instance["startup"], instance["lastcheck"]))
+
+    return()
+
+###############################
+# main                        #
+###############################
+
+def main():
+
+    print ("#" *5 + " xlSupervisor Begin")
+
+    cli_parser = argparse.ArgumentParser(prog = 'xlSupervisor',
+        description = '''%(prog)s is a tool to keep warm xLights instances running for the other scripts,''')
+
+    ### Define Arguments
+
+    cli_parser.add_argument('-j', '--instances', help = 'Number of xLights instances to supervise', type = int, default = 1,
+        required = False)
+
+    cli_parser.add_argument('-i', '--interval', help = 'Seconds between health checks', type = int, default = 30,
+        required = False)
+
+    cli_parser.add_argument('-t', '--timeout', help = 'Health check getVersion timeout in seconds', type = int, default = 10,
+        required = False)
+
+    cli_parser.add_argument('-r', '--failures', help = 'Failed health checks in a row before a restart', type = int, default = 2,
+        required = False)
+
+    cli_parser.add_argument('-c', '--closexlights' , help = 'Close xLights when the supervisor is stopped', action='store_true',
+        required = False)
+
+    cli_parser.add_argument('--status', help = 'Print the status of a running supervisor and exit', action='store_true',
+        required = False)
+
+    cli_parser.add_argument('-v', '--verbose', help = 'Verbose Logging', action='store_true',
+        required = False)
+
+    ### Get Arguments
+    args = cli_parser.parse_args()
+
+    instances = args.instances
+    interval = args.interval
+    healthtimeout = args.timeout
+    maxfailures = args.failures
+    closexlights = args.closexlights
+    verbose = args.verbose
+
+    # Status Only?
+    if (args.status):
+        printSupervisorStatus()
+        sys.exit(0)
+
+    xlightsparmsfilename = "xlightsparms.json"
+    ### Load xLights Parms JSON
+    xlightsparmsfile = open(xlightsparmsfilename, "r+")
+    xlightsparms = json.load(xlightsparmsfile)
+    ### Get xLights Parms
+    xlightsipaddress = xlightsparms.get("xlightsipaddress")
+    xlightsport = xlightsparms.get("xlightsport")
+    # Replace xlightsport with real port values, one per xLights instance
+    xlightsports = getxLightsPorts(xlightsport)
+    xlightsprogram = xlightsparms.get("xlightsprogram")
+    xlightspoolsize = xlightsparms.get("xlightspoolsize", DEFAULT_POOL_SIZE)
+    xlightsmetricsfolder = xlightsparms.get("xlightsmetricsfolder")
+    # Init xLights REST API Session
+    if (instances < 1):
+        instances = 1
+    if (interval < 1):
+        interval = 1
+    initSession(max(int(xlightspoolsize), instances), verbose)
+    # Write REST API Metrics at exit, only when xlightsparms.json has a metrics folder
+    if (xlightsmetricsfolder is not None):
+        startRequestMetrics(xlightsmetricsfolder, verbose)
+
+    if (verbose):
+        print ("xLights IP Address = %s" % xlightsipaddress)
+        print ("xLights Ports = %s" % xlightsports)
+        print ("xLights Program = %s" % xlightsprogram)
+        print ("xLights Instances = %s" % instances)
+        print ("Health Check Interval = %s" % interval)
+        print ("Health Check Timeout = %s" % healthtimeout)
+        print ("Failures before Restart = %s" % maxfailures)
+        print ("Close xLights = %s" % closexlights)
+
+    # verify xlights program file exists
+    if not os.path.isfile(xlightsprogram):
+        print("Error: xLights Program File not found %s" % xlightsprogram)
+        sys.exit(-1)
+
+    # Another Supervisor running?
+    if (len(supervisedURLs(verbose)) > 0):
+        print("Error: xLights Supervisor already running, see %s" % SUPERVISOR_LOCK)
+        sys.exit(-1)
+
+    # xLights Instance Base URLs
+    if (instances > len(xlightsports)):
+        print("Error: %s xLights instances requested but only %s xLights ports defined" % (instances, len(xlightsports)))
+        sys.exit(-1)
+    baseURLList = []
+    for port in xlightsports[0:instances]:
+        baseURLList.append("http://" + xlightsipaddress + ":" + port + "/")
+    if (verbose):
+        print ("xLights Instance Base URLs = %s" % baseURLList)
+
+    # xLights Instances that can be started or are running
+    if (len(baseURLList) > 1):
+        errors = verifyInstancePorts(baseURLList, verbose)
+        for error in errors:
+            print("Error: %s" % error)
+        if (len(errors) > 0):
+            sys.exit(-1)
+
+    superviseInstances(baseURLList, xlightsprogram, interval, healthtimeout, maxfailures, READY_DEADLINE, closexlights, verbose)
+
+    print ("#" *5 + " xlSupervisor End")
+
+if __name__ == "__main__":
+    main()
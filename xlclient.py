@@ -0,0 +1,750 @@
+#!/usr/bin/env python
+
+# Name: xlclient.py
+# Purpose: Shared xLights REST API client using a pooled keep-alive requests session
+# Author: Bill Jenkins
+# Version: v2.1
+# Date: 08/24/2023
+
+###############################
+# Imports                     #
+###############################
+
+import sys
+import os
+import math
+import bisect
+import time
+import json
+import atexit
+import datetime
+import random
+import socket
+import subprocess
+import threading
+import contextlib
+import urllib.parse
+import requests
+
+###########################
+# From Imports            #
+###########################
+
+from requests.adapters import HTTPAdapter
+
+###############################
+# Session Globals             #
+###############################
+
+# Default Connection Pool Size
+DEFAULT_POOL_SIZE = 10
+
+xlSession = None
+xlSessionLock = threading.Lock()
+xlPoolSize = DEFAULT_POOL_SIZE
+
+# Per Endpoint & Outcome Timings {(endpoint, outcome): stats}, aggregates so a long running script stays bounded
+requestTimings = {}
+# Per Sequence Timings {sequence: stats with the total elapsed per endpoint}
+sequenceTimings = {}
+requestTimingsLock = threading.Lock()
+# Sequence open per xLights instance, calls without a seq parameter are charged to it
+openSequences = {}
+
+###############################
+# Metrics Globals             #
+###############################
+
+# Metrics Files in the metrics folder, %s is the script name, written at exit
+METRICS_PROM = "xlightsauto_requests_%s.prom"
+METRICS_JSON = "xlightsauto_requests_%s.json"
+# Latency Histogram Bucket upper bounds in seconds
+METRICS_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 900]
+# Percentiles in the JSON summary
+METRICS_PERCENTILES = [50, 95, 99]
+# Metrics Folder, None until startRequestMetrics is called and no metrics are written
+metricsFolder = None
+
+###############################
+# Readiness Globals           #
+###############################
+
+# Seconds to wait for a started xLights to answer getVersion
+READY_DEADLINE = 180
+# Backoff between readiness probes, doubled each probe up to the cap
+READY_BACKOFF = 0.25
+READY_BACKOFF_MAX = 2
+# TCP connect timeout of a readiness probe
+READY_PROBE_TIMEOUT = 1
+# Startup Time History in the working directory, last READY_HISTORY_MAX starts
+READY_HISTORY = "xlightsauto_startup.json"
+READY_HISTORY_MAX = 100
+# Ports xLights listens on, A for the first instance and B when A is taken, there is no option to start it on another port
+XLIGHTS_PORTS = ["49913", "49914"]
+# Supervisor Lock File in the working directory, written by xlSupervisor
+SUPERVISOR_LOCK = "xlightsauto_supervisor.json"
+
+###############################
+# Trace Globals               #
+###############################
+
+# Chrome trace events of the run, None until startTrace is called
+traceEvents = None
+traceLock = threading.Lock()
+traceFile = None
+traceRun = None
+# perf_counter at startTrace, trace timestamps are microseconds since then
+traceOrigin = 0.0
+traceStarted = None
+# Small trace thread ids, {threading ident: tid}
+traceThreads = {}
+
+###############################
+# getxLightsPorts             #
+###############################
+
+def getxLightsPorts(xlightsport):
+
+    # xlightsport may be a single port or a list of ports
+    if isinstance(xlightsport, list):
+        portlist = xlightsport
+    else:
+        portlist = [xlightsport]
+
+    # Replace A/B with real port value
+    ports = []
+    for port in portlist:
+        port = str(port)
+        if (port == "A"):
+            port = "49913"
+        elif (port == "B"):
+            port = "49914"
+        ports.append(port)
+
+    return(ports)
+
+###############################
+# initSession                 #
+###############################
+
+def initSession(poolsize, verbose):
+
+    global xlSession, xlPoolSize
+
+    # Pool Size Valid?
+    try:
+        poolsize = int(poolsize)
+    except (TypeError, ValueError):
+        poolsize = DEFAULT_POOL_SIZE
+    if (poolsize < 1):
+        poolsize = DEFAULT_POOL_SIZE
+
+    with xlSessionLock:
+        # Close Previous Session
+        if (xlSession is not None):
+            xlSession.close()
+        xlPoolSize = poolsize
+        xlSession = requests.Session()
+        adapter = HTTPAdapter(pool_connections=poolsize, pool_maxsize=poolsize)
+        xlSession.mount("http://", adapter)
+        xlSession.mount("https://", adapter)
+
+    if (verbose):
+        print ("xLights Session Pool Size = %s" % poolsize)
+
+    return(xlSession)
+
+###############################
+# getSession                  #
+###############################
+
+def getSession():
+
+    # Create Default Session on First Use
+    if (xlSession is None):
+        initSession(xlPoolSize, False)
+    return(xlSession)
+
+###############################
+# closeSession                #
+###############################
+
+def closeSession():
+
+    global xlSession
+
+    with xlSessionLock:
+        if (xlSession is not None):
+            xlSession.close()
+            xlSession = None
+
+###############################
+# requestEndpoint             #
+###############################
+
+def requestEndpoint(request):
+
+    # First path segment of the request URL, e.g. "openSequence"
+    path = urllib.parse.urlsplit(request).path
+    return(path.strip("/").split("/")[0])
+
+###############################
+# requestSequence             #
+###############################
+
+def requestSequence(request, endpoint):
+
+    # Sequence of a call, the seq parameter, the openSequence path or the sequence open on the instance
+    parts = urllib.parse.urlsplit(request)
+    seq = urllib.parse.parse_qs(parts.query).get("seq")
+    if (seq):
+        sequence = seq[0]
+    elif (endpoint == "openSequence") and ("/openSequence/" in parts.path):
+        sequence = urllib.parse.unquote(parts.path.split("/openSequence/", 1)[1])
+    else:
+        sequence = openSequences.get(parts.netloc)
+    if (endpoint == "openSequence") and (sequence):
+        openSequences[parts.netloc] = sequence
+    elif (endpoint == "closeSequence"):
+        openSequences.pop(parts.netloc, None)
+
+    return(sequence)
+
+###############################
+# doRequestsGet               #
+###############################
+
+def doRequestsGet(request, timeout, verbose):
+
+    session = getSession()
+    starttime = time.perf_counter()
+    nbytes = 0
+    try:
+        r = session.get(request, timeout=(timeout))
+        ret_code = 0
+        status_code = r.status_code
+        result = r.text
+        nbytes = len(r.content)
+        outcome = "ok" if (status_code < 400) else "http_error"
+
+    # HTTP Error?
+    except requests.exceptions.HTTPError as e:
+        ret_code = -1
+        status_code = ""
+        result = "##### Request HTTP Error: " + format(str(e))
+        outcome = "http_error"
+
+    # HTTP Connection Error?
+    except requests.exceptions.ConnectionError as e:
+        ret_code = -2
+        status_code = ""
+        result = "##### Request Connection Error: " + format(str(e))
+        outcome = "connection_error"
+
+    # HTTP Timeout?
+    except requests.exceptions.Timeout as e:
+        ret_code = -3
+        status_code = ""
+        result = "##### Request Timeout Error: " + format(str(e))
+        outcome = "timeout"
+
+    # HTTP Other?
+    except requests.exceptions.RequestException as e:
+        ret_code = -4
+        status_code = ""
+        result = "##### Request Exception Error: " + format(str(e))
+        outcome = "error"
+
+    elapsed = time.perf_counter() - starttime
+    endpoint = requestEndpoint(request)
+    with requestTimingsLock:
+        sequence = requestSequence(request, endpoint)
+        addStats(requestTimings.setdefault((endpoint, outcome), newStats()), elapsed, nbytes, outcome)
+        if (sequence is not None):
+            stats = sequenceTimings.setdefault(sequence, newStats())
+            addStats(stats, elapsed, nbytes, outcome)
+            stats["endpoints"][endpoint] = stats["endpoints"].get(endpoint, 0) + elapsed
+    traceEvent(endpoint, "rest", starttime, elapsed, {"sequence": sequence, "status_code": status_code,
+        "outcome": outcome, "bytes": nbytes})
+    if (verbose):
+        print ("elapsed = %.3f %s" % (elapsed, endpoint))
+
+    return(ret_code, status_code, result)
+
+###############################
+# newStats                    #
+###############################
+
+def newStats():
+
+    # Calls, errors, bytes, total & max elapsed and a count per METRICS_BUCKETS bucket, slower calls are only in calls
+    return({"calls": 0, "errors": 0, "bytes": 0, "total": 0.0, "max": 0.0, "buckets": [0] * len(METRICS_BUCKETS), "endpoints": {}})
+
+###############################
+# addStats                    #
+###############################
+
+def addStats(stats, elapsed, nbytes, outcome):
+
+    stats["calls"] += 1
+    if (outcome != "ok"):
+        stats["errors"] += 1
+    stats["bytes"] += nbytes
+    stats["total"] += elapsed
+    stats["max"] = max(stats["max"], elapsed)
+    # First bucket with an upper bound >= elapsed
+    bucket = bisect.bisect_left(METRICS_BUCKETS, elapsed)
+    if (bucket < len(METRICS_BUCKETS)):
+        stats["buckets"][bucket] += 1
+
+    return()
+
+###############################
+# mergeStats                  #
+###############################
+
+def mergeStats(statsList):
+
+    merged = newStats()
+    for stats in statsList:
+        for key in ["calls", "errors", "bytes", "total"]:
+            merged[key] += stats[key]
+        merged["max"] = max(merged["max"], stats["max"])
+        merged["buckets"] = [count + other for (count, other) in zip(merged["buckets"], stats["buckets"])]
+
+    return(merged)
+
+###############################
+# percentile                  #
+###############################
+
+def percentile(stats, pct):
+
+    # Nearest rank percentile estimated from the buckets, the upper bound of the bucket holding the rank
+    if (stats["calls"] == 0):
+        return(None)
+    rank = max(1, math.ceil(pct / 100 * stats["calls"]))
+    cumulative = 0
+    for (bucket, count) in zip(METRICS_BUCKETS, stats["buckets"]):
+        cumulative += count
+        if (cumulative >= rank):
+            return(min(bucket, stats["max"]))
+    return(stats["max"])
+
+###############################
+# summarizeTimings            #
+###############################
+
+def summarizeTimings(stats):
+
+    # Calls, errors, bytes, total & percentiles of a stats aggregate
+    summary = {"calls": stats["calls"], "errors": stats["errors"], "bytes": stats["bytes"], "total": round(stats["total"], 6),
+               "max": round(stats["max"], 6) if (stats["calls"] > 0) else None}
+    for pct in METRICS_PERCENTILES:
+        value = percentile(stats, pct)
+        summary["p%s" % pct] = round(value, 6) if (value is not None) else None
+
+    return(summary)
+
+###############################
+# requestCounts               #
+###############################
+
+def requestCounts():
+
+    # Calls per endpoint so far, callers diff two of these to count the calls of one phase
+    counts = {}
+    with requestTimingsLock:
+        for (endpoint, outcome), stats in requestTimings.items():
+            counts[endpoint] = counts.get(endpoint, 0) + stats["calls"]
+
+    return(counts)
+
+###############################
+# endpointTimings             #
+###############################
+
+def endpointTimings():
+
+    # Copy of the timings per endpoint & outcome and per endpoint, taken under the lock
+    with requestTimingsLock:
+        byOutcome = {key: mergeStats([stats]) for key, stats in requestTimings.items()}
+    byEndpoint = {}
+    for (endpoint, outcome), stats in byOutcome.items():
+        byEndpoint[endpoint] = mergeStats([byEndpoint.get(endpoint, newStats()), stats])
+
+    return(byOutcome, byEndpoint)
+
+###############################
+# printRequestTimings         #
+###############################
+
+def printRequestTimings():
+
+    # Summarize per endpoint
+    (byOutcome, byEndpoint) = endpointTimings()
+
+    print ("##### REST API Timings")
+    for endpoint in sorted(byEndpoint):
+        summary = summarizeTimings(byEndpoint[endpoint])
+        print ("%-24s calls=%-5s total=%9.3fs avg=%8.3fs p95=%8.3fs max=%8.3fs errors=%s" % (endpoint, summary["calls"],
+            summary["total"], summary["total"] / summary["calls"], summary["p95"], summary["max"], summary["errors"]))
+
+###############################
+# startRequestMetrics         #
+###############################
+
+def startRequestMetrics(metricsfolder, verbose):
+
+    global metricsFolder
+
+    # Metrics are written at exit so sys.exit runs are measured too
+    metricsFolder = metricsfolder
+    atexit.register(writeRequestMetrics)
+    if (verbose):
+        print ("Metrics Folder = %s" % metricsfolder)
+
+    return()
+
+###############################
+# writeRequestMetrics         #
+###############################
+
+def writeRequestMetrics():
+
+    # Registered with atexit by startRequestMetrics, every exit, sys.exit included, writes the metrics of its calls
+    if (metricsFolder is None):
+        return()
+    (byOutcome, byEndpoint) = endpointTimings()
+    if (len(byOutcome) == 0):
+        return()
+    script = os.path.splitext(os.path.basename(sys.argv[0]))[0] or "python"
+    with requestTimingsLock:
+        bySequence = {}
+        for sequence, stats in sequenceTimings.items():
+            bySequence[sequence] = mergeStats([stats])
+            bySequence[sequence]["endpoints"] = dict(stats["endpoints"])
+
+    # JSON Summary, p50/p95/p99 per endpoint & per sequence estimated from the latency buckets
+    d1 = {"script": script, "written": datetime.datetime.now().isoformat(timespec="seconds"),
+          "pid": os.getpid(), "total": summarizeTimings(mergeStats(byEndpoint.values())),
+          "endpoints": {endpoint: summarizeTimings(byEndpoint[endpoint]) for endpoint in sorted(byEndpoint)},
+          "sequences": {}}
+    for sequence in sorted(bySequence):
+        d1["sequences"][sequence] = summarizeTimings(bySequence[sequence])
+        d1["sequences"][sequence]["endpoints"] = {endpoint: round(elapsed, 6) for endpoint, elapsed in bySequence[sequence]["endpoints"].items()}
+
+    # Prometheus Textfile, a latency histogram per endpoint & outcome
+    lines = ["# HELP xlightsauto_request_duration_seconds xLights REST API call duration",
+             "# TYPE xlightsauto_request_duration_seconds histogram"]
+    for (endpoint, outcome) in sorted(byOutcome):
+        stats = byOutcome[(endpoint, outcome)]
+        labels = 'script="%s",endpoint="%s",outcome="%s"' % (script, endpoint, outcome)
+        cumulative = 0
+        for (bucket, count) in zip(METRICS_BUCKETS, stats["buckets"]):
+            cumulative += count
+            lines.append('xlightsauto_request_duration_seconds_bucket{%s,le="%s"} %s' % (labels, bucket, cumulative))
+        lines.append('xlightsauto_request_duration_seconds_bucket{%s,le="+Inf"} %s' % (labels, stats["calls"]))
+        lines.append('xlightsauto_request_duration_seconds_sum{%s} %.6f' % (labels, stats["total"]))
+        lines.append('xlightsauto_request_duration_seconds_count{%s} %s' % (labels, stats["calls"]))
+    lines.append("# HELP xlightsauto_request_response_bytes_total xLights REST API response bytes")
+    lines.append("# TYPE xlightsauto_request_response_bytes_total counter")
+    for endpoint in sorted(byEndpoint):
+        lines.append('xlightsauto_request_response_bytes_total{script="%s",endpoint="%s"} %s' % (script, endpoint,
+            byEndpoint[endpoint]["bytes"]))
+    lines.append("# HELP xlightsauto_request_metrics_written_seconds Time the metrics were written")
+    lines.append("# TYPE xlightsauto_request_metrics_written_seconds gauge")
+    lines.append('xlightsauto_request_metrics_written_seconds{script="%s"} %.3f' % (script, time.time()))
+
+    # Write to temporary files first so a collector never reads half a file
+    try:
+        os.makedirs(metricsFolder, exist_ok=True)
+        for (filename, content) in [(METRICS_JSON % script, json.dumps(d1, indent=2)), (METRICS_PROM % script, "\n".join(lines) + "\n")]:
+            filename = os.path.join(metricsFolder, filename)
+            with open(filename + ".tmp", "w") as f:
+                f.write(content)
+            os.replace(filename + ".tmp", filename)
+    except OSError as e:
+        print ("*** Unable to write REST API metrics: %s" % e)
+
+    return()
+
+###############################
+# startTrace                  #
+###############################
+
+def startTrace(tracefile, run, verbose):
+
+    global traceEvents, traceFile, traceRun, traceOrigin, traceStarted
+
+    # The run span covers startTrace to exit, the trace is written at exit so sys.exit runs are traced too
+    with traceLock:
+        traceEvents = []
+        traceFile = tracefile
+        traceRun = run
+        traceOrigin = time.perf_counter()
+        traceStarted = datetime.datetime.now().isoformat(timespec="seconds")
+    atexit.register(writeTrace)
+    if (verbose):
+        print ("Trace File = %s" % tracefile)
+
+    return()
+
+###############################
+# traceThread                 #
+###############################
+
+def traceThread():
+
+    # Called with traceLock held, names each thread once so the viewer shows e.g. one row per instance
+    ident = threading.get_ident()
+    if ident not in traceThreads:
+        traceThreads[ident] = len(traceThreads) + 1
+        traceEvents.append({"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": traceThreads[ident],
+                            "args": {"name": threading.current_thread().name}})
+    return(traceThreads[ident])
+
+###############################
+# traceEvent                  #
+###############################
+
+def traceEvent(name, category, starttime, elapsed, args):
+
+    # Chrome trace complete event, starttime is a perf_counter value
+    if (traceEvents is None):
+        return()
+    with traceLock:
+        traceEvents.append({"name": name, "cat": category, "ph": "X", "pid": os.getpid(), "tid": traceThread(),
+                            "ts": round((starttime - traceOrigin) * 1000000, 1), "dur": round(elapsed * 1000000, 1),
+                            "args": args})
+
+    return()
+
+###############################
+# traceSpan                   #
+###############################
+
+@contextlib.contextmanager
+def traceSpan(name, category, args = None):
+
+    # REST calls made inside the span nest under it in the timeline
+    starttime = time.perf_counter()
+    try:
+        yield
+    finally:
+        traceEvent(name, category, starttime, time.perf_counter() - starttime, args or {})
+
+###############################
+# writeTrace                  #
+###############################
+
+def writeTrace():
+
+    if (traceEvents is None):
+        return()
+    traceEvent(traceRun, "run", traceOrigin, time.perf_counter() - traceOrigin, {"started": traceStarted, "argv": sys.argv})
+    events = list(traceEvents)
+
+    # Idle gaps between the REST calls of each thread
+    restEvents = {}
+    for event in events:
+        if (event.get("cat") == "rest"):
+            restEvents.setdefault(event["tid"], []).append(event)
+    idle = 0.0
+    largestgap = 0.0
+    for tidEvents in restEvents.values():
+        tidEvents.sort(key=lambda event: event["ts"])
+        for (previous, event) in zip(tidEvents, tidEvents[1:]):
+            gap = max(0.0, event["ts"] - (previous["ts"] + previous["dur"])) / 1000000
+            idle += gap
+            largestgap = max(largestgap, gap)
+
+    d1 = {"traceEvents": events, "displayTimeUnit": "ms",
+          "otherData": {"run": traceRun, "started": traceStarted, "idle": round(idle, 3), "largestgap": round(largestgap, 3)}}
+    # Write to a temporary file first so a viewer never reads half a trace
+    try:
+        with open(traceFile + ".tmp", "w") as f:
+            json.dump(d1, f)
+        os.replace(traceFile + ".tmp", traceFile)
+    except OSError as e:
+        print ("*** Unable to write trace file %s: %s" % (traceFile, e))
+        return()
+    print ("Trace File = %s events = %s idle between REST calls = %.1fs largest gap = %.1fs" % (traceFile, len(events), idle, largestgap))
+
+    return()
+
+###############################
+# portOpen                    #
+###############################
+
+def portOpen(baseURL, timeout):
+
+    # TCP connect only, fails fast while xLights is not listening
+    url = urllib.parse.urlsplit(baseURL)
+    try:
+        with socket.create_connection((url.hostname, url.port or 80), timeout=timeout):
+            return(True)
+    except OSError:
+        return(False)
+
+###############################
+# waitxLightsReady            #
+###############################
+
+def waitxLightsReady(baseURL, deadline, verbose):
+
+    # Probe the port, then getVersion, with capped exponential backoff and jitter until the deadline
+    request = baseURL + "getVersion"
+    starttime = time.perf_counter()
+    probes = 0
+    while True:
+        probes += 1
+        if portOpen(baseURL, READY_PROBE_TIMEOUT):
+            remaining = deadline - (time.perf_counter() - starttime)
+            (ret_code, status_code, result) = doRequestsGet(request, max(1, min(30, remaining)), verbose)
+            # REST API Ready, or an error other than not yet answering?
+            if (ret_code not in [-2, -3]):
+                break
+        else:
+            (ret_code, status_code, result) = (-2, "", "##### xLights port not open " + baseURL)
+        elapsed = time.perf_counter() - starttime
+        if (elapsed >= deadline):
+            result = "##### xLights not ready after %.1fs %s probes: %s" % (elapsed, probes, result)
+            break
+        backoff = min(READY_BACKOFF_MAX, READY_BACKOFF * (2 ** (probes - 1)))
+        time.sleep(min(random.uniform(backoff / 2, backoff), deadline - elapsed))
+    elapsed = time.perf_counter() - starttime
+    if (verbose):
+        print ("xLights ready probes = %s elapsed = %.3fs ret_code = %s" % (probes, elapsed, ret_code))
+
+    return(ret_code, status_code, result, elapsed)
+
+###############################
+# recordStartupTime           #
+###############################
+
+def recordStartupTime(baseURL, xlightsprogram, elapsed, ret_code, verbose):
+
+    # Append to the Startup Time History for trend reporting
+    history = []
+    if os.path.isfile(READY_HISTORY):
+        try:
+            with open(READY_HISTORY, "r") as f:
+                history = json.load(f)
+        except (OSError, ValueError) as e:
+            print ("*** Startup history %s ignored: %s" % (READY_HISTORY, e))
+    history.append({"date": datetime.datetime.now().isoformat(timespec="seconds"), "baseURL": baseURL,
+        "program": xlightsprogram, "seconds": round(elapsed, 3), "ready": (ret_code == 0)})
+    history = history[-READY_HISTORY_MAX:]
+    try:
+        with open(READY_HISTORY, "w") as f:
+            json.dump(history, f, indent=2)
+    except OSError as e:
+        print ("*** Unable to save startup history %s: %s" % (READY_HISTORY, e))
+
+    ready = [entry["seconds"] for entry in history if entry.get("ready")]
+    print ("xLights startup time = %.1fs" % elapsed)
+    if (verbose) and (len(ready) > 0):
+        print ("xLights startup history starts = %s min = %.1fs avg = %.1fs max = %.1fs" % (len(ready), min(ready), sum(ready) / len(ready), max(ready)))
+
+    return()
+
+###############################
+# verifyInstancePorts         #
+###############################
+
+def verifyInstancePorts(baseURLList, verbose):
+
+    # Instances not already running are started with xLights and can only come up on A, then B
+    errors = []
+    running = [baseURL for baseURL in baseURLList if portOpen(baseURL, READY_PROBE_TIMEOUT) or (baseURL in supervisedURLs(verbose))]
+    launched = []
+    for baseURL in baseURLList:
+        if (baseURL in running):
+            continue
+        port = str(urllib.parse.urlsplit(baseURL).port)
+        if (port not in XLIGHTS_PORTS):
+            errors.append("xLights %s not running and xLights can only be started on port A (%s) or B (%s)" % (baseURL, XLIGHTS_PORTS[0], XLIGHTS_PORTS[1]))
+        elif (port == XLIGHTS_PORTS[1]) and not any(urllib.parse.urlsplit(url).port == int(XLIGHTS_PORTS[0]) for url in running + launched):
+            errors.append("xLights %s not running and xLights only starts on port B (%s) while port A (%s) is in use" % (baseURL, XLIGHTS_PORTS[1], XLIGHTS_PORTS[0]))
+        launched.append(baseURL)
+    if (verbose):
+        print ("xLights Instances running = %s started = %s" % (running, launched))
+
+    return(errors)
+
+###############################
+# launchxLights               #
+###############################
+
+def launchxLights(xlightsprogram, verbose):
+
+    if (verbose):
+        print ("##### Start xLights")
+        print ("cmd = ", xlightsprogram)
+    try:
+        cp = subprocess.Popen([xlightsprogram])
+    except:
+        sys.exit("*** Error in starting xLights %s" % sys.exc_info()[0])
+
+    return(cp)
+
+###############################
+# supervisedURLs              #
+###############################
+
+def supervisedURLs(verbose):
+
+    # Base URLs of a running xLights Supervisor, none when its heartbeat is stale
+    if not os.path.isfile(SUPERVISOR_LOCK):
+        return([])
+    try:
+        with open(SUPERVISOR_LOCK, "r") as f:
+            d1 = json.load(f)
+    except (OSError, ValueError):
+        return([])
+    if (time.time() - d1.get("heartbeat", 0)) > (3 * d1.get("interval", 0)):
+        if (verbose):
+            print ("xLights Supervisor lock %s is stale" % SUPERVISOR_LOCK)
+        return([])
+    baseURLs = [instance["baseURL"] for instance in d1.get("instances", [])]
+    if (verbose):
+        print ("xLights Supervisor pid = %s instances = %s" % (d1.get("pid"), baseURLs))
+
+    return(baseURLs)
+
+###############################
+# startxLights                #
+###############################
+
+def startxLights(baseURL, xlightsprogram, verbose, deadline = READY_DEADLINE):
+
+    # xLights Running?
+    request = baseURL + "getVersion"
+    if (verbose):
+        print ("##### Get Version")
+        print ("request=", request)
+    if portOpen(baseURL, READY_PROBE_TIMEOUT):
+        (ret_code, status_code, result) = doRequestsGet(request, 30, verbose)
+        if (verbose):
+            print ("status_code = ", status_code)
+            print ("result = ", result)
+        # REST API Connection Successful, or an error other than not answering?
+        if (ret_code not in [-2, -3]):
+            return(ret_code, status_code, result)
+    elif baseURL in supervisedURLs(verbose):
+        # xLights Supervisor restarts its own instances
+        print ("##### Waiting for supervised xLights %s" % baseURL)
+    else:
+        # Start xLights
+        launchxLights(xlightsprogram, verbose)
+
+    # Wait for xLights REST API
+    (ret_code, status_code, result, elapsed) = waitxLightsReady(baseURL, deadline, verbose)
+    recordStartupTime(baseURL, xlightsprogram, elapsed, ret_code, verbose)
+    traceEvent("startxLights", "startup", time.perf_counter() - elapsed, elapsed, {"baseURL": baseURL, "ret_code": ret_code})
+    if (verbose):
+        print ("status_code = ", status_code)
+        print ("result = ", result)
+
+    return(ret_code, status_code, result)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+
+# Name: xlselect.py
+# Purpose: Shared sequence and controller selection, headless --all/--select or a Tk selection window
+# Author: Bill Jenkins
+# Version: v2.1
+# Date: 08/24/2023
+
+###############################
+# Imports                     #
+###############################
+
+import os
+import fnmatch
+
+###############################
+# addSelectArguments          #
+###############################
+
+def addSelectArguments(cli_parser):
+
+    cli_parser.add_argument('--all', help = 'Select everything, no selection window', action='store_true',
+        required = False)
+
+    cli_parser.add_argument('--select', help = 'Select items matching a glob pattern, no selection window, repeatable', action = 'append', default = [],
+        required = False)
+
+###############################
+# isHeadless                  #
+###############################
+
+def isHeadless(args):
+
+    return(args.all or (len(args.select) > 0))
+
+###############################
+# sequenceKeys                #
+###############################
+
+def sequenceKeys(fullsequence, xlightsshowfolder):
+
+    # Patterns may match the full path, the file name or the path relative to the show folder
+    relsequence = os.path.relpath(fullsequence, xlightsshowfolder)
+    return([fullsequence, os.path.basename(fullsequence), relsequence, relsequence.replace("\\", "/")])
+
+###############################
+# selectMatching              #
+###############################
+
+def selectMatching(items, keys, selectall, patterns, verbose):
+
+    # Items in list order, every item with --all otherwise those with a key matching any pattern
+    selected = []
+    for i in range(len(items)):
+        if (selectall) or any(fnmatch.fnmatch(key, pattern) for key in keys[i] for pattern in patterns):
+            selected.append(items[i])
+    if (verbose):
+        print ("Selected %s of %s: %s" % (len(selected), len(items), selected))
+    if (len(selected) == 0):
+        print ("*** No items match %s" % patterns)
+
+    return(selected)
+
+###############################
+# selectListbox               #
+###############################
+
+def selectListbox(title, label, geometry, items, buttontext, verbose):
+
+    # tkinter only imported when the selection window is needed
+    from tkinter import Tk, Label, Frame, Listbox, Scrollbar, Button, YES, LEFT, BOTTOM, END
+
+    window = Tk()
+    window.title(title)
+    window.geometry(geometry)
+
+    Label(window, text=label).pack()
+
+    frame = Frame(window)
+    frame.pack()
+
+    listbox = Listbox(frame, width=50, height=20, font=("Helvetica", 12), selectmode = "multiple")
+    listbox.pack(padx = 10, pady = 10, expand = YES, fill = "both")
+
+    # Vertical Scrollbar
+    scroll_V = Scrollbar(frame, orient="vertical")
+    scroll_V.config(command=listbox.yview)
+    scroll_V.pack(side="right", fill="y")
+    # Horizontal Scrollbar
+    scroll_H = Scrollbar(frame, orient="horizontal")
+    scroll_H.config(command=listbox.xview)
+    scroll_H.pack(side= BOTTOM, fill= "x")
+    # List Config
+    listbox.config(yscrollcommand=scroll_V.set, xscrollcommand=scroll_H.set)
+    # Load List
+    for item in items:
+        listbox.insert(END, item)
+
+    # Selection, None when cancelled
+    selection = {"items": None}
+
+    def selectDone():
+        selection["items"] = [items[i] for i in listbox.curselection()]
+        if (verbose):
+            print (selection["items"])
+        window.destroy()
+
+    Button(window, text="Select All", command = lambda: listbox.select_set(0, END)).pack(side = LEFT, padx=10)
+    Button(window, text="Clear All", command = lambda: listbox.select_clear(0, END)).pack(side = LEFT, padx=10)
+    Button(window, text=buttontext, command = selectDone).pack(side = LEFT, padx=10)
+    Button(window, text="Cancel", command = window.destroy).pack(side = LEFT, padx=10)
+
+    window.mainloop()
+
+    return(selection["items"])
+
+###############################
+# selectTreeview              #
+###############################
+
+def selectTreeview(title, label, geometry, headings, rows, buttontext, verbose):
+
+    # tkinter only imported when the selection window is needed
+    from tkinter import Tk, Label, Frame, Button, LEFT, BOTTOM, CENTER, END, VERTICAL
+    from tkinter import ttk
+
+    window = Tk()
+    window.title(title)
+    window.geometry(geometry)
+
+    Label(window, text=label).pack()
+
+    frame = Frame(window)
+    frame.pack()
+    bottomframe = Frame(window)
+    bottomframe.pack( side = BOTTOM )
+
+    # Set Style Theme
+    s = ttk.Style()
+    s.theme_use('clam')
+
+    # Add a Treeview widget
+    tree = ttk.Treeview(window, column=tuple(headings), show='headings', height=10)
+    tree.pack(side ="left")
+    for i in range(len(headings)):
+        tree.column("# %s" % (i + 1), width = 100, anchor=CENTER)
+        tree.heading("# %s" % (i + 1), text=headings[i])
+
+    # add a scrollbar
+    vscrollbar = ttk.Scrollbar(orient=VERTICAL, command=tree.yview)
+    tree.configure(yscroll=vscrollbar.set)
+    vscrollbar.pack(side ='right', fill ='x')
+
+    # Get data, remember the row behind each tree item
+    rowitems = {}
+    for row in rows:
+        rowitems[tree.insert('', END, values=row)] = row
+    tree.pack()
+
+    # Selection, None when cancelled
+    selection = {"rows": None}
+
+    def selectDone():
+        selection["rows"] = [rowitems[item] for item in tree.selection()]
+        if (verbose):
+            print (selection["rows"])
+        window.destroy()
+
+    Button(bottomframe, text="Select ALL", command = lambda: tree.selection_set(tree.get_children())).pack(side = LEFT, padx=10)
+    Button(bottomframe, text="Clear All", command = lambda: tree.selection_remove(tree.get_children())).pack(side = LEFT, padx=10)
+    Button(bottomframe, text=buttontext, command = selectDone).pack(side = LEFT, padx=10)
+    Button(bottomframe, text="Cancel", command = window.destroy).pack(side = LEFT, padx=10)
+
+    window.mainloop()
+
+    return(selection["rows"])